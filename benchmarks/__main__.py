@@ -0,0 +1,52 @@
+"""
+Runs the benchmarks and compares them with the stored baseline.
+
+    python -m benchmarks                 # run all, flag the regressions against benchmarks/baseline.json
+    python -m benchmarks --save          # run all and store the results as the new baseline
+    python -m benchmarks -k tools -t 0.3 # run the tool loop benchmarks only, 30% tolerance
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.harness import DEFAULT_BASELINE_PATH, BenchmarkReport, compare, run
+import benchmarks.agent_benchmarks  # registers the benchmarks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of the just-agents hot paths")
+    parser.add_argument("-k", "--filter", default=None, help="Run only the benchmarks whose name contains this")
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2, help="Slowdown over the baseline flagged as a regression")
+    parser.add_argument("-b", "--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="Baseline results file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline = BenchmarkReport.load(args.baseline)
+    report = run(args.filter, rounds=args.rounds)
+    print(f"{'benchmark':<40}{'median':>12}{'best':>12}{'baseline':>12}{'change':>9}")
+    for name, result in report.results.items():
+        reference = baseline.results.get(name) if baseline else None
+        change = f"{result.median / reference.median - 1:+.0%}" if reference else ""
+        reference_median = f"{reference.median * 1e6:.1f}us" if reference else "-"
+        print(f"{name:<40}{result.median * 1e6:>10.1f}us{result.best * 1e6:>10.1f}us{reference_median:>12}{change:>9}")
+
+    if args.save:
+        if baseline is not None and args.filter:
+            baseline.results.update(report.results)  # a partial run only replaces its own results
+            report = baseline
+        report.save(args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --save to store one")
+        return 0
+    regressions = compare(report, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression.name}: {regression.baseline * 1e6:.1f}us -> {regression.current * 1e6:.1f}us "
+              f"({regression.ratio - 1:+.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
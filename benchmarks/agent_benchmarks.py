@@ -0,0 +1,158 @@
+"""
+Benchmarks of the agent hot paths. Completions are answered by the offline echo adapter without delays,
+so the timings are the overhead just-agents adds on top of the provider.
+"""
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+from just_agents.base_agent import BaseAgent
+from just_agents.base_memory import BaseMemory
+from just_agents.context_window import ContextWindow, ContextWindowOptions
+from just_agents.just_bus import JustEventBus
+from just_agents.just_tool import JustToolFactory
+from just_agents.protocols.protocol_factory import StreamingMode
+
+from benchmarks.harness import benchmark
+
+TOOL_COUNTS = (1, 10, 100)
+HISTORY_LENGTH = 2000
+SUBSCRIBERS = 100
+
+
+def _make_tool(index: int) -> Callable[[str], str]:
+    def tool(query: str) -> str:
+        return f"result {index} for {query}"
+    tool.__name__ = tool.__qualname__ = f"bench_tool_{index}"
+    tool.__doc__ = f"""
+    Benchmark tool number {index}
+
+    Args:
+        query: The query to answer
+    """
+    setattr(sys.modules[__name__], tool.__name__, tool)  # importable by the tool loader, as real tools are
+    return tool
+
+
+def make_tools(count: int) -> List[Callable[[str], str]]:
+    return [_make_tool(index) for index in range(count)]
+
+
+def echo_agent(tools: List[Callable] = None, **echo) -> BaseAgent:
+    return BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo", "echo": echo},
+        system_prompt="You are a benchmark agent",
+        tools=tools,
+        remember_query=False,
+    )
+
+
+@benchmark("agent")
+def query():
+    agent = echo_agent()
+    return lambda: agent.query("hello")
+
+
+@benchmark("agent")
+def stream():
+    agent = echo_agent()
+    return lambda: list(agent.stream("hello there, how are you doing today?"))
+
+
+def _tool_loop(count: int):
+    def setup():
+        agent = echo_agent(make_tools(count), rules=[
+            {"role": "user", "response": {"tool_calls": [{"name": "bench_tool_0", "arguments": {"query": "q"}}]}},
+            {"role": "tool", "response": {"content": "done"}},
+        ])
+        return lambda: agent.query("call the tool")
+    setup.__name__ = f"tool_loop_{count}"
+    return setup
+
+
+for _count in TOOL_COUNTS:
+    benchmark("tools", number=20 if _count == 100 else 100)(_tool_loop(_count))
+
+
+class Extraction(BaseModel):
+    name: str
+    tags: List[str] = []
+    score: Optional[float] = None
+
+
+@benchmark("agent")
+def query_structural():
+    agent = echo_agent()
+    payload = Extraction(name="benchmark", tags=["a", "b"], score=0.5).model_dump_json()
+    return lambda: agent.query_structural(payload, parser=Extraction, enforce_validation=True)
+
+
+@benchmark("agent")
+def prepare_options():
+    agent = echo_agent(make_tools(10))
+    return lambda: agent._prepare_options(agent.llm_options)
+
+
+@benchmark("memory")
+def fork_commit_long_history():
+    agent = echo_agent()
+    agent.memory.add_system_message(agent.system_prompt)
+    for index in range(HISTORY_LENGTH // 2):
+        agent.memory.add_user_message(f"question {index}")
+        agent.memory.add_message({"role": "assistant", "content": f"answer {index}"})
+    history = agent.memory.fork()
+
+    def fork_commit():
+        context = agent._preprocess_input("one more question")
+        context.memory.add_message({"role": "assistant", "content": "one more answer"})
+        agent._postprocess_query(context, remember_query=True)
+        agent.memory.replace_messages(history)  # keep the history length constant between the calls
+    return fork_commit
+
+
+@benchmark("memory")
+def fork_long_history():
+    memory = BaseMemory()
+    for index in range(HISTORY_LENGTH):
+        memory.add_user_message(f"message {index}")
+    return lambda: memory.fork().add_user_message("one more")
+
+
+@benchmark("memory")
+def context_window_long_history():
+    memory = BaseMemory()
+    memory.add_system_message("You are a benchmark agent")
+    for index in range(HISTORY_LENGTH):
+        memory.add_user_message(f"message {index}")
+    window = ContextWindow(ContextWindowOptions(max_tokens=4000))
+    window.fit(memory.messages, "gpt-4.1-nano")  # token counts are cached per message, as between the steps of a query
+    return lambda: window.fit(memory.messages, "gpt-4.1-nano")
+
+
+@benchmark("bus", number=1000)
+def publish_fan_out():
+    bus = JustEventBus()
+    received: List[int] = []
+    for index in range(SUBSCRIBERS):
+        bus.subscribe("benchmark.fan_out.*", lambda event_name, *args, _index=index, **kwargs: received.append(_index))
+    return lambda: (bus.publish("benchmark.fan_out.event", "payload"), received.clear())
+
+
+@benchmark("profiles", number=20)
+def yaml_profile_loading():
+    directory = Path(tempfile.mkdtemp(prefix="just_agents_bench_"))
+    tools = make_tools(10)
+    profile = echo_agent(tools)
+    config_path = directory / "agent_profiles.yaml"
+    profile.save_to_yaml("BenchmarkAgent", file_path=config_path)
+    return lambda: BaseAgent.from_yaml("BenchmarkAgent", file_path=config_path)
+
+
+@benchmark("profiles")
+def create_tools_dict():
+    tools = make_tools(10)
+    return lambda: JustToolFactory.create_tools_dict(tools)
@@ -0,0 +1,132 @@
+import gc
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+BenchmarkSetup = Callable[[], Callable[[], object]]
+"""Prepares the state of a benchmark outside of the timing, returns the measured call."""
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+class Benchmark(BaseModel):
+    """
+    A registered benchmark: the setup is run once, the call it returns is timed.
+    """
+    name: str = Field(..., description="Unique name, used as the key of the baseline")
+    group: str = Field(..., description="Hot path the benchmark belongs to")
+    setup: BenchmarkSetup = Field(..., description="Returns the call to time")
+    number: int = Field(100, ge=1, description="Calls per timed round")
+
+
+class BenchmarkResult(BaseModel):
+    """
+    Timings of a benchmark, in seconds per call.
+    """
+    name: str
+    group: str
+    rounds: int
+    number: int
+    median: float
+    best: float
+    stdev: float
+
+
+class BenchmarkReport(BaseModel):
+    """
+    Results of a run with the environment they were measured in, stored as the baseline.
+    """
+    python: str = Field(default_factory=platform.python_version)
+    machine: str = Field(default_factory=platform.machine)
+    created: float = Field(default_factory=time.time)
+    results: Dict[str, BenchmarkResult] = Field(default_factory=dict)
+
+    def save(self, path: Path = DEFAULT_BASELINE_PATH) -> None:
+        Path(path).write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_BASELINE_PATH) -> Optional['BenchmarkReport']:
+        path = Path(path)
+        if not path.exists():
+            return None
+        return cls.model_validate(json.loads(path.read_text()))
+
+
+class Regression(BaseModel):
+    """
+    A benchmark slower than its baseline by more than the threshold.
+    """
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(group: str, name: Optional[str] = None, number: int = 100) -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """Registers a benchmark setup function under the given group."""
+    def register(setup: BenchmarkSetup) -> BenchmarkSetup:
+        benchmark_name = name or f"{group}.{setup.__name__}"
+        if benchmark_name in BENCHMARKS:
+            raise ValueError(f"Benchmark '{benchmark_name}' is already registered")
+        BENCHMARKS[benchmark_name] = Benchmark(name=benchmark_name, group=group, setup=setup, number=number)
+        return setup
+    return register
+
+
+def measure(bench: Benchmark, rounds: int = 5, warmup: int = 1) -> BenchmarkResult:
+    """Times rounds of bench.number calls with the garbage collector off, the median round is the result."""
+    call = bench.setup()
+    for _ in range(warmup):
+        call()
+    timings: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(bench.number):
+                call()
+            timings.append((time.perf_counter() - start) / bench.number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return BenchmarkResult(
+        name=bench.name,
+        group=bench.group,
+        rounds=rounds,
+        number=bench.number,
+        median=statistics.median(timings),
+        best=min(timings),
+        stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    )
+
+
+def run(pattern: Optional[str] = None, rounds: int = 5) -> BenchmarkReport:
+    """Runs the registered benchmarks whose name contains the pattern."""
+    report = BenchmarkReport()
+    for name, bench in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        report.results[name] = measure(bench, rounds=rounds)
+    return report
+
+
+def compare(report: BenchmarkReport, baseline: BenchmarkReport, threshold: float = 0.2) -> List[Regression]:
+    """Returns the benchmarks whose median is slower than the baseline median by more than threshold."""
+    regressions = []
+    for name, result in report.results.items():
+        reference = baseline.results.get(name)
+        if reference is not None and result.median > reference.median * (1 + threshold):
+            regressions.append(Regression(name=name, baseline=reference.median, current=result.median))
+    return regressions
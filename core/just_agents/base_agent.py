@@ -1,8 +1,13 @@
+import asyncio
+import contextvars
 import copy
+import threading
+import time
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-from pydantic import Field, PrivateAttr, computed_field, BaseModel, field_serializer, field_validator, model_validator
-from typing import Optional, List, Union, Any, Generator, Dict, ClassVar, Protocol, Type, Callable, AsyncGenerator, get_args
+from pydantic import Field, PrivateAttr, computed_field, BaseModel, ConfigDict, SkipValidation, field_serializer, field_validator, model_validator
+from typing import Optional, List, Union, Any, Generator, Dict, ClassVar, Protocol, Type, Callable, AsyncGenerator, AsyncIterator, Iterable, Iterator, Tuple, get_args
 from functools import partial
 from pydantic_core import PydanticSerializationUnexpectedValue
 from just_agents.data_classes import FinishReason, ToolCall, Message, Role, ReasoningEffort, GoogleBuiltInTools
@@ -10,18 +15,128 @@ from just_agents.types import MessageDict, SupportedMessages
 
 from just_agents.llm_options import LLMOptions
 from just_agents.interfaces.function_call import IFunctionCall
-from just_agents.interfaces.protocol_adapter import IProtocolAdapter, BaseModelResponse
+from just_agents.interfaces.protocol_adapter import IProtocolAdapter, IStreamAccumulator, BaseModelResponse
 from just_agents.interfaces.agent import IAgentWithInterceptors, QueryListener, ResponseListener, VariArgs
 
 from just_agents.base_memory import IBaseMemory, BaseMemory, OnToolCallable, OnMessageCallable
 from just_agents.just_profile import JustAgentProfile, JustAgentProfileChatMixin, JustAgentProfileToolsetMixin
-from just_agents.rotate_keys import RotateKeys
-from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
+from just_agents.key_pool import KeyPool, KeyPoolExhausted, KeySelection
+from just_agents.completion_cache import CompletionCache, CompletionCacheOptions
+from just_agents.context_window import ContextWindow, ContextWindowOptions, TokenCounter
+from just_agents.batch import BatchResult, run_batch, arun_batch, run_stream_batch
+from just_agents.protocols.sse_streaming import ChunkPassthroughEncoder, SSEStreamEncoder
 from just_agents.protocols.protocol_factory import StreamingMode, ProtocolAdapterFactory
-from just_agents.just_tool import SubscriberCallback, GOOGLE_BUILTIN_SEARCH, GOOGLE_BUILTIN_CODE
+from just_agents.just_tool import SubscriberCallback, GOOGLE_BUILTIN_SEARCH, GOOGLE_BUILTIN_CODE, tool_calls_scope
+from just_agents.tool_executors import ToolExecutors
 from just_agents.just_bus import JustLogBus
 from just_agents.just_locator import JustAgentsLocator
-from just_agents.just_schema import ModelHelper
+from just_agents.just_metrics import JustMetrics
+from just_agents.just_schema import ModelHelper, PartialOutputParser, compile_parser
+
+HEDGE_MAX_THREADS = 16
+"""Size of the thread pool of the hedged completion attempts."""
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def hedge_pool() -> ThreadPoolExecutor:
+    """
+    Process-wide thread pool of the hedged completion attempts, created on first use.
+    It is kept apart from the tool pool, which hung tools or agents used as tools can fill up.
+    """
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(HEDGE_MAX_THREADS, thread_name_prefix="just_hedge")
+        return _hedge_pool
+
+
+class QueryContext(BaseModel):
+    """
+    Per-invocation execution state of a query or stream call.
+    Created by _preprocess_input and threaded through the completion and tool loop,
+    so that one agent instance can serve concurrent requests.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    memory: IBaseMemory = Field(..., description="Ephemeral memory forked from the agent memory for this call")
+    base_messages: SkipValidation[List[MessageDict]] = Field(
+        default_factory=list,
+        description="Agent memory messages list at the moment of the fork, used to detect concurrent commits")
+    base_history_length: int = Field(0, description="Number of non-system messages the fork inherited from the agent memory")
+    tool_fuse_broken: bool = Field(False, description="Fuse to prevent tool loops, strips tools from the final attempt")
+    stream_accumulator: Optional[IStreamAccumulator] = Field(None, description="Assembles the message of the streamed completion in progress")
+    tool_calls_made: Dict[int, int] = Field(default_factory=dict, description="Per-call tool counters, keyed by id of the tool")
+
+
+class HedgeStats(BaseModel):
+    """
+    Outcomes of the hedged completions of an agent, for tuning hedge_after.
+    Time to first token is measured from the start of each request.
+    """
+    calls: int = Field(0, description="Completions made in the hedging mode")
+    hedged: int = Field(0, description="Completions for which the backup request was fired")
+    wins: List[int] = Field(default_factory=lambda: [0, 0], description="Completions answered first by the primary and by the backup options")
+    ttft_sum: List[float] = Field(default_factory=lambda: [0.0, 0.0], description="Summed time to first token of the winning primary and backup requests")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def record(self, winner: int, ttft: float, hedged: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.hedged += int(hedged)
+            self.wins[winner] += 1
+            self.ttft_sum[winner] += ttft
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            calls = max(self.calls, 1)
+            return {
+                "calls": self.calls,
+                "hedge_rate": self.hedged / calls,
+                "primary_win_rate": self.wins[0] / calls,
+                "backup_win_rate": self.wins[1] / calls,
+                "primary_mean_ttft": self.ttft_sum[0] / max(self.wins[0], 1),
+                "backup_mean_ttft": self.ttft_sum[1] / max(self.wins[1], 1),
+            }
+
+
+class PromptCacheStats(BaseModel):
+    """
+    Prompt tokens served from the prompt cache of the provider, as reported in the usage of the completions.
+    """
+    completions: int = Field(0, description="Completions that reported their usage")
+    prompt_tokens: int = Field(0, description="Prompt tokens of these completions")
+    cached_tokens: int = Field(0, description="Prompt tokens read from the prompt cache")
+    cache_write_tokens: int = Field(0, description="Prompt tokens written to the prompt cache, reported by the providers with explicit caching")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @staticmethod
+    def _tokens(usage: Any, name: str) -> int:
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        return value if isinstance(value, int) else 0
+
+    def record(self, usage: Any) -> None:
+        if usage is None:
+            return
+        details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+        with self._lock:
+            self.completions += 1
+            self.prompt_tokens += self._tokens(usage, "prompt_tokens")
+            self.cached_tokens += self._tokens(details, "cached_tokens") if details is not None else 0
+            self.cache_write_tokens += self._tokens(usage, "cache_creation_input_tokens")
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "completions": self.completions,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cache_write_tokens": self.cache_write_tokens,
+                "cache_hit_rate": self.cached_tokens / max(self.prompt_tokens, 1),
+            }
 
 
 class BaseAgent(
@@ -90,7 +205,7 @@ class BaseAgent(
     # API key management settings
     completion_remove_key_on_error: bool = Field(
         default=True,
-        description="In case of using list of keys removing key from the list after error call with this key")
+        description="In case of using list of keys, do not retry the call with a key that already failed it")
     completion_max_tries: Optional[int]  = Field(
         2, ge=0,
         description="Maximum retry attempts before failing or falling back to backup_options")
@@ -115,6 +230,29 @@ class BaseAgent(
         exclude=True,
         description="Environment variable name containing comma-separated API keys")
 
+    key_selection: KeySelection = Field(
+        default="lru",
+        exclude=True,
+        description="How keys are picked from the shared key pool: least-recently-used ('lru') or 'least_in_flight'. The pool keeps the selection of the first agent using the key source")
+
+    key_rpm_limit: Optional[int] = Field(
+        default=None,
+        ge=1,
+        exclude=True,
+        description="Client-side budget of requests per minute per key of the key pool. Agents sharing the key source are held to the strictest budget set")
+
+    key_tpm_limit: Optional[int] = Field(
+        default=None,
+        ge=1,
+        exclude=True,
+        description="Client-side budget of tokens per minute per key of the key pool, counted from the reported usage. Agents sharing the key source are held to the strictest budget set")
+
+    key_max_wait: float = Field(
+        default=0.0,
+        ge=0,
+        exclude=True,
+        description="Seconds to wait for a key to come off cooldown or budget before failing the attempt")
+
     reasoning_effort: Optional[ReasoningEffort] = Field(
         default=None,
         description="The effort level for reasoning. One of: 'low', 'medium', 'high'")
@@ -128,10 +266,32 @@ class BaseAgent(
         default=50,
         description="Controls the number of LLM interaction cycles for tool usage.\n- Without `backup_options`: The agent attempts tool resolution up to `max_tool_calls` times using the primary LLM. The final attempt is tool-less if prior attempts continued to request tools.\n- With `backup_options`:\n    - If `max_tool_calls` is 1: Two attempts are made, both using the backup LLM (first with tools, second tool-less if needed).\n    - If `max_tool_calls` > 1: The agent makes `max_tool_calls - 1` attempts with the primary LLM. If tools are still needed, two further attempts are made with the backup LLM (first with tools, second tool-less if needed).\nThis results in `max_tool_calls` iterations if no backup, or `max_tool_calls + 1` iterations if backup is active (for `max_tool_calls >= 1`). Prevents tool call loops.")
 
+    max_parallel_tools: int = Field(
+        ge=1,
+        default=1,
+        description="Maximum number of tool calls from a single LLM response executed concurrently, serial execution in the order of the calls by default. Raise only for tools that are safe to run at once: sync tools run in the shared thread pool of the tools, async and MCP tools are gathered. Results are added to memory in the order of the calls. Also bounds the concurrent prompt tool calls.")
+
     raise_on_completion_status_errors: bool = Field(
         default=True,
         description="Raise an exception on completion status 4xx and 5xx errors")
 
+    hedge_after: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Seconds to wait for the first token of the primary llm_options before firing the same request with backup_options in parallel. The first one to answer is used, the other one is cancelled. Disabled if not set")
+
+    completion_cache: Optional[CompletionCacheOptions] = Field(
+        default=None,
+        description="Opt-in cache of completion responses keyed by the messages and options, replayed for both query and stream. Requires raise_on_completion_status_errors, so that error responses are never cached")
+
+    context_window: Optional[ContextWindowOptions] = Field(
+        default=None,
+        description="Opt-in token budget of the messages sent with each completion. The oldest turns are left out of the request when the history is over budget, the memory keeps them. System prompts are always sent and tool calls are never separated from their results")
+
+    prompt_caching: bool = Field(
+        default=False,
+        description="Keep the request prefix stable for the prompt cache of the provider: the static system prompt goes first and the prompt tool outputs follow it in their own system message, tools are sent sorted by name. Cache breakpoints are added for the providers that need them, e.g. Anthropic. Cached tokens are counted in prompt_cache_stats")
+
     send_system_prompt: bool = Field(
         default=True,
         description="When set, system prompt is used in query. ")
@@ -218,12 +378,18 @@ class BaseAgent(
 
     # Private attributes for internal state management
     _protocol: Optional[IProtocolAdapter] = PrivateAttr(None)  # Handles LLM-specific message formatting
-    _partial_streaming_chunks: List[BaseModelResponse] = PrivateAttr(
-        default_factory=list)  # Buffers streaming responses
-    _key_getter: Optional[RotateKeys] = PrivateAttr(None)  # Manages API key rotation
-    _tool_fuse_broken: bool = PrivateAttr(False) #Fuse to prevent tool loops
+    _key_pool: Optional[KeyPool] = PrivateAttr(None)  # Process-wide pool of API keys, shared by the agents with the same key source
+    _hedge_stats: HedgeStats = PrivateAttr(default_factory=HedgeStats)  # Outcomes of the hedged completions
+    _prompt_cache_stats: PromptCacheStats = PrivateAttr(default_factory=PromptCacheStats)  # Cached prompt tokens reported by the provider
+    _completion_cache: Optional[CompletionCache] = PrivateAttr(None)  # Process-wide completion cache, shared by the agents with the same cache path
+    _context_window: Optional[ContextWindow] = PrivateAttr(None)  # Fits the completion messages into the token budget, with cached per-message token counts
+    _token_counter: Optional[TokenCounter] = PrivateAttr(None)  # Estimates the tokens of the streams reporting no usage without a context window
+    _memory_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)  # Guards memory commits of concurrent calls
+    _tool_schemas: Dict[str, tuple] = PrivateAttr(default_factory=dict)  # Cached tool schemas by tool name: (tool, use_litellm, schema)
+    _tools_payload: tuple = PrivateAttr(default=(None, None))  # Last assembled tools payload: (eligibility key, schemas list)
 
     _locator: JustAgentsLocator = PrivateAttr(default_factory=lambda: JustAgentsLocator())
+    _metrics: JustMetrics = PrivateAttr(default_factory=lambda: JustMetrics())  # Process-wide metrics, recorded only when enabled
 
     #@computed_field
     @property
@@ -246,10 +412,11 @@ class BaseAgent(
     def dynamic_prompt(self, prompt: str) -> str:
         extended_prompt = prompt
         if self.prompt_tools:
+            tool_outputs = self.prompt_tools.call_all(max_workers=self.max_parallel_tools)
             for tool_name, tool in self.prompt_tools.items():
                 tool_input = tool.call_arguments
                 tool_description = tool.description
-                tool_output = tool.get_callable()(**tool_input)
+                tool_output = tool_outputs[tool_name]
                 call_string = f'Result of {str(tool_name)}({str(tool_input)}) tool execution:\n'
                 call_string += f"{str(tool_output)}\n"
                 if tool_description:
@@ -263,6 +430,14 @@ class BaseAgent(
         if not memory:
             memory = self.memory
 
+        if dynamic_prompt and self.prompt_caching:
+            # the static prompt stays a byte-stable cacheable prefix, the prompt tool outputs follow it
+            if prompt:
+                memory.add_system_message(prompt)
+            tool_outputs = self.dynamic_prompt("").strip()
+            if tool_outputs:
+                memory.add_system_message(tool_outputs)
+            return
         if dynamic_prompt:
             prompt = self.dynamic_prompt(prompt)
         if prompt:
@@ -290,6 +465,15 @@ class BaseAgent(
         if value:
             self._protocol.enable_debug()
 
+    @property
+    def hedge_stats(self) -> Dict[str, float]:
+        """Win rates and mean time to first token of the hedged completions."""
+        return self._hedge_stats.summary()
+
+    @property
+    def prompt_cache_stats(self) -> Dict[str, float]:
+        """Prompt tokens read from and written to the prompt cache of the provider, with the cache hit rate."""
+        return self._prompt_cache_stats.summary()
 
     def model_post_init(self, __context: Any) -> None:
         # Call parent class's post_init first (from JustAgentProfile)
@@ -311,13 +495,19 @@ class BaseAgent(
         #         self.llm_options["tool_choice"] = "auto"
 
         # Set up API key rotation based on file or environment variable
+        key_pool_options = dict(selection=self.key_selection, rpm_limit=self.key_rpm_limit, tpm_limit=self.key_tpm_limit)
         if self.key_list_path is not None:
-            self._key_getter = RotateKeys.from_path(self.key_list_path)
+            self._key_pool = KeyPool.from_path(self.key_list_path, **key_pool_options)
         elif self.key_list_env is not None:
-            self._key_getter = RotateKeys.from_env(self.key_list_env)
+            self._key_pool = KeyPool.from_env(self.key_list_env, **key_pool_options)
             
+        if self.completion_cache is not None:
+            self._completion_cache = CompletionCache.shared(self.completion_cache)
+        if self.context_window is not None:
+            self._context_window = ContextWindow(self.context_window)
+
         # Warn if both direct API key and key rotation are configured
-        if (self._key_getter is not None) and (self.llm_options.get("api_key", None) is not None):
+        if (self._key_pool is not None) and (self.llm_options.get("api_key", None) is not None):
             print("Warning api_key will be rewritten by key_getter. Both are present in llm_options.")
 
         self._protocol.set_logging(enable=self.observability)
@@ -329,15 +519,7 @@ class BaseAgent(
             self._protocol.enable_debug()
 
     def _fork_memory(self, copy_values: bool) -> IBaseMemory:
-        new_memory : IBaseMemory
-        if copy_values:
-            new_memory = self.memory.deepcopy()
-        else:
-            #new_memory = type(self.memory)()  # Call the default constructor of same class
-            new_memory = self.memory.deepcopy()
-            new_memory.messages.clear()
-
-        return new_memory
+        return self.memory.fork(copy_values=copy_values)
 
     @classmethod
     def from_json(cls, json_data: Dict[str, Any], qualname_check: bool = True) -> 'BaseAgent':
@@ -346,24 +528,51 @@ class BaseAgent(
             raise ValueError(f"Tools mismatch: agent tools empty, but llm_options has tools section:'{instance.llm_options.get('tools')}'")
         return instance
 
-    def _prepare_options(self, options: LLMOptions, **kwargs) -> Dict[str, Any]:
+    def _get_tools_payload(self, context: Optional[QueryContext], use_litellm: bool) -> List[Any]:
+        """
+        Returns the tool schemas of the tools eligible for the next completion call.
+        Schemas are built once per tool instance and the assembled list is reused
+        until the tool set or the remaining_calls eligibility changes.
+        """
+        if not self.tools:  # an empty list is left as is by the tools field validation
+            return []
+        with tool_calls_scope(context.tool_calls_made if context else {}):
+            eligible = [
+                (name, tool) for name, tool in self.tools.items() if (
+                    not tool.max_calls_per_query
+                        or tool.remaining_calls > 0
+                )
+            ]
+        if self.prompt_caching:
+            eligible.sort(key=lambda item: item[0])  # the order tools were loaded in does not change the prefix
+        key = (use_litellm, tuple(id(tool) for _, tool in eligible))
+        cached_key, cached_payload = self._tools_payload
+        if cached_key != key:
+            payload = []
+            for name, tool in eligible:
+                cached_tool, cached_use_litellm, tool_payload = self._tool_schemas.get(name, (None, None, None))
+                if cached_tool is not tool or cached_use_litellm != use_litellm:
+                    tool_payload = self._protocol.tool_from_function(
+                        tool.get_callable(wrap=False),
+                        function_dict = tool.get_litellm_description(),
+                        use_litellm=use_litellm
+                    )
+                    self._tool_schemas[name] = (tool, use_litellm, tool_payload)
+                payload.append(tool_payload)
+            self._tools_payload = (key, payload)
+            cached_payload = payload
+        return list(cached_payload)
+
+    def _prepare_options(self, options: LLMOptions, context: Optional[QueryContext] = None, **kwargs) -> Dict[str, Any]:
         import warnings
         use_litellm = False
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=DeprecationWarning)
             use_litellm = getattr(self, "litellm_tool_description", False)
-        opt: LLMOptions = copy.deepcopy(options)
-        if self.tools is not None and not self._tool_fuse_broken:  # populate llm_options based on available tools
-            opt["tools"] = [
-                self._protocol.tool_from_function(
-                    self.tools[tool].get_callable(wrap=False),
-                    function_dict = self.tools[tool].get_litellm_description(),
-                    use_litellm=use_litellm
-                ) for tool in self.tools if (
-                    not self.tools[tool].max_calls_per_query
-                        or self.tools[tool].remaining_calls > 0
-                )
-            ]
+        opt: LLMOptions = dict(options) # copy-on-write overlay, nested values are shared with the agent options
+        tool_fuse_broken = context.tool_fuse_broken if context else False
+        if self.tools is not None and not tool_fuse_broken:  # populate llm_options based on available tools
+            opt["tools"] = self._get_tools_payload(context, use_litellm)
         tool_count = len(opt.get("tools", [])) #active tools
 
         if tool_count == 0:
@@ -387,98 +596,682 @@ class BaseAgent(
         opt.update(kwargs)
         return opt
     
+    def _completion_option_sets(self, active_options_for_this_call: LLMOptions) -> List[LLMOptions]:
+        # Prepare option sets to try for this specific call
+        option_sets_to_try = [active_options_for_this_call]
+        # If the active options are the primary ones, and a global backup exists,
+        # add the global backup as a potential fallback for this specific call's retries.
+        if active_options_for_this_call is self.llm_options and self.backup_options:
+            option_sets_to_try.append(self.backup_options)
+        return option_sets_to_try
+
+    def _prepare_completion_attempts(
+            self,
+            current_options_config_template: LLMOptions,
+            opt_set_idx: int,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> tuple[Dict[str, Any], Optional[KeyPool], int]:
+        opt = self._prepare_options(current_options_config_template, context, **kwargs)
+        key_pool: Optional[KeyPool] = None
+        if self._key_pool is not None and "api_key" not in opt:
+            key_pool = self._key_pool
+
+        max_tries = self.completion_max_tries if self.completion_max_tries is not None else 1
+        if key_pool:
+            if self.completion_remove_key_on_error:
+                max_tries = min(max_tries, key_pool.len())
+            max_tries = max(1, max_tries)
+        
+        # If this is the second set of options being tried (i.e., internal fallback to self.backup_options),
+        # then only attempt it once.
+        if opt_set_idx == 1: 
+            max_tries = 1 
+        return opt, key_pool, max_tries
+
+    def _fit_context_window(self, messages: SupportedMessages, opt: Dict[str, Any]) -> SupportedMessages:
+        """Leaves the oldest turns out of the messages sent when they are over the token budget of the model."""
+        if self._context_window is None or not isinstance(messages, list):
+            return messages
+        fitted, tokens = self._context_window.fit(messages, opt.get("model"))
+        if fitted is not messages and hasattr(self, '_log_bus'):
+            self._log_bus.info(
+                source=f"{self.codename}.context_window",
+                message=f"Left {len(messages) - len(fitted)} of {len(messages)} messages out of the completion to fit the context window",
+                action="context_window.truncate",
+                tokens=tokens,
+                budget=self._context_window.budget(opt.get("model")),
+                **self._context_window.counter.stats()
+            )
+        return fitted
+
+    def _completion_cache_key(self, messages: SupportedMessages, stream: bool, opt: Dict[str, Any]) -> Optional[str]:
+        if self._completion_cache is None or not self.raise_on_completion_status_errors:
+            return None
+        if self.completion_cache.deterministic_only and opt.get("temperature") != 0 and opt.get("seed") is None:
+            return None
+        return CompletionCache.fingerprint(messages, stream, opt)
+
+    def _cached_completion(self, cache_key: Optional[str], stream: bool, use_async: bool = False) -> Optional[Any]:
+        """Replays a cached completion, as a response or as an iterator of chunks, None on a miss."""
+        if cache_key is None:
+            return None
+        payload = self._completion_cache.get(cache_key, ttl=self.completion_cache.ttl)
+        if hasattr(self, '_log_bus'):
+            self._log_bus.info(
+                source=f"{self.codename}.completion.cache",
+                message=f"Completion cache {'hit' if payload is not None else 'miss'}",
+                action=f"completion.cache.{'hit' if payload is not None else 'miss'}",
+                cache_key=cache_key,
+                hits=self._completion_cache.hits,
+                misses=self._completion_cache.misses
+            )
+        if payload is None:
+            return None
+        if not stream:
+            return self._protocol.response_from_dict(payload)
+        chunks = [self._protocol.chunk_from_dict(chunk) for chunk in payload]
+        if not use_async:
+            return iter(chunks)
+
+        async def replay():
+            for chunk in chunks:
+                yield chunk
+        return replay()
+
+    def _cache_completion(self, cache_key: Optional[str], response: Any, stream: bool, use_async: bool = False) -> Any:
+        """Stores a response in the completion cache, streams are recorded and stored once fully consumed."""
+        if cache_key is None:
+            return response
+        if not stream:
+            self._completion_cache.put(cache_key, response.model_dump(mode="json"))
+            return response
+
+        if not use_async:
+            def record():
+                chunks = []
+                for chunk in response:
+                    chunks.append(chunk.model_dump(mode="json"))
+                    yield chunk
+                self._completion_cache.put(cache_key, chunks)
+            return record()
+
+        async def arecord():
+            chunks = []
+            async for chunk in response:
+                chunks.append(chunk.model_dump(mode="json"))
+                yield chunk
+            await self._acache_io(self._completion_cache.put, cache_key, chunks)
+        return arecord()
+
+    async def _acache_io(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs a call of the completion cache, in a worker thread if the cache has a disk tier."""
+        if self._completion_cache.path is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    def _response_tokens(response: Any) -> int:
+        usage = getattr(response, "usage", None)
+        return getattr(usage, "total_tokens", None) or 0
+
+    def _stream_tokens(self, usage: Any, messages: SupportedMessages, model: str, chunks: int) -> int:
+        """Total tokens of a stream: the usage of its last chunks, estimated from the prompt and the chunks if there is none."""
+        tokens = getattr(usage, "total_tokens", None)
+        if tokens or not chunks or not isinstance(messages, list):
+            return tokens or 0
+        if self._context_window is not None:
+            counter = self._context_window.counter
+        else:
+            counter = self._token_counter = self._token_counter or TokenCounter()
+        return sum(counter.count_all(messages, model)) + chunks
+
+    def _release_key_on_close(
+            self,
+            response: Any,
+            key_pool: KeyPool,
+            key: str,
+            messages: SupportedMessages,
+            model: str,
+            use_async: bool = False
+    ) -> Any:
+        """
+        Passes the chunks of a stream through, releasing the key once the stream is consumed or closed:
+        the key stays in flight while the stream is read and an error raised while reading it is reported.
+        """
+        if use_async:
+            async def arelease():
+                usage, chunks, error = None, 0, None
+                try:
+                    async for chunk in response:
+                        usage = getattr(chunk, "usage", None) or usage
+                        chunks += 1
+                        yield chunk
+                except Exception as e:
+                    error = e
+                    raise
+                finally:
+                    key_pool.release(key, error=error, tokens=self._stream_tokens(usage, messages, model, chunks))
+            return arelease()
+
+        def release():
+            usage, chunks, error = None, 0, None
+            try:
+                for chunk in response:
+                    usage = getattr(chunk, "usage", None) or usage
+                    chunks += 1
+                    yield chunk
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                key_pool.release(key, error=error, tokens=self._stream_tokens(usage, messages, model, chunks))
+        return release()
+
+    @staticmethod
+    def _key_label(key_pool: Optional[KeyPool], key: Optional[str]) -> str:
+        index = key_pool.index(key) if key_pool else None
+        return "" if index is None else str(index)
+
+    def _meter_completion(self, response: Any, stream: bool, model: str, key: str, started: float, use_async: bool = False) -> Any:
+        """Records the completion in the metrics, a stream is recorded once it is consumed."""
+        if not stream:
+            finished = time.perf_counter()
+            self._metrics.record_completion(self.shortname, model, key, started, finished, finished, getattr(response, "usage", None))
+            return response
+        if use_async:
+            return self._metrics.ameter_stream(response, self.shortname, model, key, started)
+        return self._metrics.meter_stream(response, self.shortname, model, key, started)
+
+    def _handle_completion_error(
+            self,
+            e: Exception,
+            attempt: int,
+            max_tries: int,
+            opt_set_idx: int,
+            current_options_config_template: LLMOptions,
+            current_key: Optional[str],
+            failed_keys: Optional[set],
+    ) -> None:
+        if hasattr(self, '_log_bus'):
+            self._log_bus.warn(
+                source=f"{self.codename}.completion.error",
+                message=f"Attempt {attempt + 1}/{max_tries} failed with options_set {opt_set_idx}",
+                api_key=JustLogBus.mask_api_key(current_key),
+                action="completion.error",
+                exception=e,
+                options=current_options_config_template,
+                attempt=attempt + 1,
+                max_tries=max_tries
+            )
+        if failed_keys is not None and self.completion_remove_key_on_error and current_key is not None:
+            failed_keys.add(current_key)
+
+    def _handle_completion_fallback(self, opt_set_idx: int, option_sets_to_try: List[LLMOptions]) -> None:
+        # If we are about to try backup options (because active_options_for_this_call failed), log the fallback
+        if opt_set_idx == 0 and len(option_sets_to_try) > 1 and hasattr(self, '_log_bus'): # opt_set_idx == 0 means primary active_options failed
+            self._log_bus.info(
+                source=f"{self.codename}.completion.fallback",
+                message=f"Attempts with initial options failed. Falling back to agent's backup_options for this call.",
+                action="completion.fallback"
+            )
+
+    def _complete_with_option_set(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            opt_set_idx: int,
+            current_options_config_template: LLMOptions,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> BaseModelResponse:
+        """Makes the completion attempts with one set of options, raises the last error if all of them fail."""
+        opt, key_pool, max_tries = self._prepare_completion_attempts(
+            current_options_config_template, opt_set_idx, context, **kwargs
+        )
+        failed_keys = set() if key_pool else None
+        messages = self._fit_context_window(messages, opt)
+        cache_key = self._completion_cache_key(messages, stream, opt)
+        cached = self._cached_completion(cache_key, stream)
+        if cached is not None:
+            return cached
+
+        metered = self._metrics.enabled
+        model = opt.get("model") or ""
+        last_exception: Optional[Exception] = None
+        for attempt in range(max_tries):
+            current_key = opt.get('api_key', None)
+            if key_pool:
+                try:
+                    wait_started = time.perf_counter()
+                    current_key = key_pool.acquire(exclude=failed_keys, max_wait=self.key_max_wait)
+                    opt["api_key"] = current_key
+                except KeyPoolExhausted as e:
+                    last_exception = last_exception or e
+                    break
+                if metered:
+                    self._metrics.queue_seconds.observe(
+                        (self.shortname, self._key_label(key_pool, current_key)), time.perf_counter() - wait_started
+                    )
+            started = time.perf_counter()
+
+            try:
+                # Only one call site for completion, for both primary and backup options
+                response = self._protocol.completion(
+                    drop_params=self.drop_unsupported_params,
+                    raise_on_completion_status_errors=self.raise_on_completion_status_errors,
+                    prompt_caching=self.prompt_caching,
+                    **opt, 
+                    messages=messages,
+                    stream=stream,
+                )
+            except Exception as e:
+                last_exception = e
+                if metered:
+                    self._metrics.record_error(self.shortname, model, self._key_label(key_pool, current_key), e)
+                if key_pool:
+                    key_pool.release(current_key, error=e)
+                self._handle_completion_error(
+                    e, attempt, max_tries, opt_set_idx, current_options_config_template, current_key, failed_keys
+                )
+                continue
+            if key_pool and stream:
+                response = self._release_key_on_close(response, key_pool, current_key, messages, model)
+            elif key_pool:
+                key_pool.release(current_key, tokens=self._response_tokens(response))
+            if self.prompt_caching and not stream:
+                self._prompt_cache_stats.record(getattr(response, "usage", None))
+            if metered:
+                response = self._meter_completion(response, stream, model, self._key_label(key_pool, current_key), started)
+            return self._cache_completion(cache_key, response, stream)
+
+        raise last_exception or RuntimeError("Completion failed after all attempts, but no specific exception was caught.")
+
+    async def _acomplete_with_option_set(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            opt_set_idx: int,
+            current_options_config_template: LLMOptions,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> BaseModelResponse:
+        """Async counterpart of _complete_with_option_set."""
+        opt, key_pool, max_tries = self._prepare_completion_attempts(
+            current_options_config_template, opt_set_idx, context, **kwargs
+        )
+        failed_keys = set() if key_pool else None
+        messages = self._fit_context_window(messages, opt)
+        cache_key = self._completion_cache_key(messages, stream, opt)
+        cached = None if cache_key is None else await self._acache_io(self._cached_completion, cache_key, stream, True)
+        if cached is not None:
+            return cached
+
+        metered = self._metrics.enabled
+        model = opt.get("model") or ""
+        last_exception: Optional[Exception] = None
+        for attempt in range(max_tries):
+            current_key = opt.get('api_key', None)
+            if key_pool:
+                try:
+                    wait_started = time.perf_counter()
+                    current_key = await key_pool.aacquire(exclude=failed_keys, max_wait=self.key_max_wait)
+                    opt["api_key"] = current_key
+                except KeyPoolExhausted as e:
+                    last_exception = last_exception or e
+                    break
+                if metered:
+                    self._metrics.queue_seconds.observe(
+                        (self.shortname, self._key_label(key_pool, current_key)), time.perf_counter() - wait_started
+                    )
+            started = time.perf_counter()
+
+            try:
+                response = await self._protocol.async_completion(
+                    drop_params=self.drop_unsupported_params,
+                    raise_on_completion_status_errors=self.raise_on_completion_status_errors,
+                    prompt_caching=self.prompt_caching,
+                    **opt,
+                    messages=messages,
+                    stream=stream,
+                )
+            except Exception as e:
+                last_exception = e
+                if metered:
+                    self._metrics.record_error(self.shortname, model, self._key_label(key_pool, current_key), e)
+                if key_pool:
+                    key_pool.release(current_key, error=e)
+                self._handle_completion_error(
+                    e, attempt, max_tries, opt_set_idx, current_options_config_template, current_key, failed_keys
+                )
+                continue
+            if key_pool and stream:
+                response = self._release_key_on_close(response, key_pool, current_key, messages, model, use_async=True)
+            elif key_pool:
+                key_pool.release(current_key, tokens=self._response_tokens(response))
+            if self.prompt_caching and not stream:
+                self._prompt_cache_stats.record(getattr(response, "usage", None))
+            if metered:
+                response = self._meter_completion(
+                    response, stream, model, self._key_label(key_pool, current_key), started, use_async=True
+                )
+            if cache_key is not None and not stream:
+                await self._acache_io(self._completion_cache.put, cache_key, response.model_dump(mode="json"))
+                return response
+            return self._cache_completion(cache_key, response, stream, use_async=True)
+
+        raise last_exception or RuntimeError("Completion failed after all attempts, but no specific exception was caught.")
+
+    @staticmethod
+    def _keep_exception(last_exception: Optional[Exception], e: Exception) -> Exception:
+        # running out of keys on a later option set does not hide the provider error of an earlier one
+        if last_exception is not None and isinstance(e, KeyPoolExhausted):
+            return last_exception
+        return e
+
     def _execute_completion(
             self,
             messages: SupportedMessages,
             stream: bool,
             active_options_for_this_call: LLMOptions, # New parameter
+            context: Optional[QueryContext] = None,
             **kwargs
     ) -> BaseModelResponse:
         
-        # Prepare option sets to try for this specific call
-        option_sets_to_try = [active_options_for_this_call]
-        # If the active options are the primary ones, and a global backup exists,
-        # add the global backup as a potential fallback for this specific call's retries.
-        if active_options_for_this_call is self.llm_options and self.backup_options:
-            option_sets_to_try.append(self.backup_options)
-
+        option_sets_to_try = self._completion_option_sets(active_options_for_this_call)
+        if self.hedge_after is not None and len(option_sets_to_try) > 1:
+            return self._hedged_completion(messages, stream, option_sets_to_try, context, **kwargs)
         last_exception: Optional[Exception] = None
 
         for opt_set_idx, current_options_config_template in enumerate(option_sets_to_try):
-            opt = self._prepare_options(current_options_config_template, **kwargs)
-            local_key_getter: Optional[RotateKeys] = None
-            if self._key_getter is not None and "api_key" not in opt:
-                local_key_getter = copy.deepcopy(self._key_getter)
-
-            max_tries = self.completion_max_tries if self.completion_max_tries is not None else 1
-            if local_key_getter:
-                if self.completion_remove_key_on_error:
-                    max_tries = min(max_tries, local_key_getter.len())
-                max_tries = max(1, max_tries)
-            
-            # If this is the second set of options being tried (i.e., internal fallback to self.backup_options),
-            # then only attempt it once.
-            if opt_set_idx == 1: 
-                max_tries = 1 
-
-            for attempt in range(max_tries):
-                current_key = opt.get('api_key', None)
-                if not current_key and local_key_getter:
-                    try:
-                        current_key = local_key_getter()
-                        opt["api_key"] = current_key
-                    except IndexError:
-                        last_exception = last_exception or IndexError("Ran out of API keys during rotation.")
-                        break
+            try:
+                return self._complete_with_option_set(
+                    messages, stream, opt_set_idx, current_options_config_template, context, **kwargs
+                )
+            except Exception as e:
+                last_exception = self._keep_exception(last_exception, e)
+            self._handle_completion_fallback(opt_set_idx, option_sets_to_try)
 
-                try:
-                    # Only one call site for completion, for both primary and backup options
-                    return self._protocol.completion(
-                        drop_params=self.drop_unsupported_params,
-                        raise_on_completion_status_errors=self.raise_on_completion_status_errors,
-                        **opt, 
-                        messages=messages,
-                        stream=stream,
-                    )
-                except Exception as e:
-                    last_exception = e
-                    if hasattr(self, '_log_bus'):
-                        self._log_bus.warn(
-                            source=f"{self.codename}.completion.error",
-                            message=f"Attempt {attempt + 1}/{max_tries} failed with options_set {opt_set_idx}",
-                            api_key=JustLogBus.mask_api_key(current_key),
-                            action="completion.error",
-                            exception=e,
-                            options=current_options_config_template,
-                            attempt=attempt + 1,
-                            max_tries=max_tries
-                        )
-                    if local_key_getter and self.completion_remove_key_on_error and current_key is not None:
-                        local_key_getter.remove(current_key)
-
-            # If we are about to try backup options (because active_options_for_this_call failed), log the fallback
-            if opt_set_idx == 0 and len(option_sets_to_try) > 1 and hasattr(self, '_log_bus'): # opt_set_idx == 0 means primary active_options failed
-                self._log_bus.info(
-                    source=f"{self.codename}.completion.fallback",
-                    message=f"Attempts with initial options failed. Falling back to agent's backup_options for this call.",
-                    action="completion.fallback"
+        raise last_exception
+
+    async def _aexecute_completion(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            active_options_for_this_call: LLMOptions,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> BaseModelResponse:
+        """Async counterpart of _execute_completion, awaits the provider call instead of blocking on it."""
+        option_sets_to_try = self._completion_option_sets(active_options_for_this_call)
+        if self.hedge_after is not None and len(option_sets_to_try) > 1:
+            return await self._ahedged_completion(messages, stream, option_sets_to_try, context, **kwargs)
+        last_exception: Optional[Exception] = None
+
+        for opt_set_idx, current_options_config_template in enumerate(option_sets_to_try):
+            try:
+                return await self._acomplete_with_option_set(
+                    messages, stream, opt_set_idx, current_options_config_template, context, **kwargs
                 )
+            except Exception as e:
+                last_exception = self._keep_exception(last_exception, e)
+            self._handle_completion_fallback(opt_set_idx, option_sets_to_try)
 
-        if last_exception:
-            raise last_exception
-        else:
-            raise RuntimeError("Completion failed after all attempts, but no specific exception was caught.")
+        raise last_exception
+
+    def _first_token(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            opt_set_idx: int,
+            current_options_config_template: LLMOptions,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> Tuple[Any, float, Callable[[], None]]:
+        """
+        Completes with one option set up to the first token: the first chunk of a stream or the whole response.
+        Returns the response, the time to the first token and a callable that discards the response.
+        """
+        start = time.perf_counter()
+        response = self._complete_with_option_set(
+            messages, stream, opt_set_idx, current_options_config_template, context, **kwargs
+        )
+        discard = lambda: None
+        if stream:
+            chunks = iter(response)
+            first_chunk = next(chunks, None)
+
+            def restream():
+                if first_chunk is not None:
+                    yield first_chunk
+                yield from chunks
+            response = restream()
+            discard = getattr(chunks, "close", discard) # closes the stream, the connection is released with it
+        return response, time.perf_counter() - start, discard
+
+    async def _afirst_token(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            opt_set_idx: int,
+            current_options_config_template: LLMOptions,
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> Tuple[Any, float, Callable[[], Any]]:
+        """Async counterpart of _first_token, the discard callable returns an awaitable."""
+        start = time.perf_counter()
+        discard = lambda: asyncio.sleep(0)
+        response = await self._acomplete_with_option_set(
+            messages, stream, opt_set_idx, current_options_config_template, context, **kwargs
+        )
+        if stream:
+            chunks = response.__aiter__()
+            try:
+                first_chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                first_chunk = None
+
+            async def restream():
+                if first_chunk is None:
+                    return
+                yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+            response = restream()
+            if hasattr(chunks, "aclose"):
+                discard = chunks.aclose
+        return response, time.perf_counter() - start, discard
+
+    @classmethod
+    def _hedge_failure(cls, primary_error: Exception, backup_error: Exception) -> Tuple[Exception, Exception]:
+        """Error to raise when both hedged attempts failed and the other error, to be chained as its cause."""
+        error = cls._keep_exception(primary_error, backup_error)
+        return error, primary_error if error is backup_error else backup_error
+
+    @staticmethod
+    def _hedge_timeout(option_sets_to_try: List[LLMOptions], **kwargs) -> Optional[float]:
+        """Completion timeout bounding the wait for the hedged attempts, the longest one of the option sets. None if not set."""
+        timeouts = [kwargs.get("timeout") or options.get("timeout") for options in option_sets_to_try[:2]]
+        if any(timeout is None for timeout in timeouts):
+            return None
+        return float(max(timeouts))
+
+    def _record_hedge(self, winner: int, ttft: float, hedged: bool) -> None:
+        self._hedge_stats.record(winner, ttft, hedged)
+        if hasattr(self, '_log_bus'):
+            self._log_bus.info(
+                source=f"{self.codename}.completion.hedge",
+                message=f"{'Backup' if winner else 'Primary'} options answered first" + (" after hedging" if hedged else ""),
+                action="completion.hedge",
+                winner="backup" if winner else "primary",
+                ttft=ttft,
+                hedged=hedged,
+                **self._hedge_stats.summary()
+            )
+
+    def _hedged_completion(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            option_sets_to_try: List[LLMOptions],
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> BaseModelResponse:
+        """
+        Starts with the primary options and fires the backup ones in parallel if the primary has not produced
+        the first token within hedge_after seconds. The first one to answer wins, the other one is discarded.
+        The attempts run in the hedge_pool, the wait is bounded by the completion timeout of the options.
+        If both fail the primary error is chained.
+        """
+        executor = hedge_pool()
+        timeout = self._hedge_timeout(option_sets_to_try, **kwargs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        submit = lambda idx: executor.submit(
+            contextvars.copy_context().run, self._first_token,
+            messages, stream, idx, option_sets_to_try[idx], context, **kwargs
+        )
+        primary = submit(0)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done and primary.exception() is None:
+            response, ttft, _ = primary.result()
+            self._record_hedge(0, ttft, hedged=False)
+            return response
+        if done: # the primary failed fast, plain fallback to the backup
+            self._handle_completion_fallback(0, option_sets_to_try)
+            try:
+                response, ttft, _ = self._first_token(messages, stream, 1, option_sets_to_try[1], context, **kwargs)
+            except Exception as e:
+                error, cause = self._hedge_failure(primary.exception(), e)
+                raise error from cause
+            self._record_hedge(1, ttft, hedged=False)
+            return response
+
+        backup = submit(1)
+        pending = {primary: 0, backup: 1}
+        discard = lambda futures: [
+            future.add_done_callback(lambda f: f.exception() is None and f.result()[2]())
+            for future in futures if not future.cancel()
+        ]
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            done, _ = wait(list(pending), timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                discard(pending)
+                raise TimeoutError(f"Hedged completion timed out after {timeout} seconds")
+            for future in done:
+                idx = pending.pop(future)
+                if future.exception() is not None:
+                    continue
+                discard(pending)
+                response, ttft, _ = future.result()
+                self._record_hedge(idx, ttft, hedged=True)
+                return response
+        error, cause = self._hedge_failure(primary.exception(), backup.exception())
+        raise error from cause
+
+    async def _ahedged_completion(
+            self,
+            messages: SupportedMessages,
+            stream: bool,
+            option_sets_to_try: List[LLMOptions],
+            context: Optional[QueryContext] = None,
+            **kwargs
+    ) -> BaseModelResponse:
+        """Async counterpart of _hedged_completion, the losing request is cancelled."""
+        timeout = self._hedge_timeout(option_sets_to_try, **kwargs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start_task = lambda idx: asyncio.ensure_future(
+            self._afirst_token(messages, stream, idx, option_sets_to_try[idx], context, **kwargs)
+        )
+        primary = start_task(0)
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done and primary.exception() is None:
+            response, ttft, _ = primary.result()
+            self._record_hedge(0, ttft, hedged=False)
+            return response
+        if done: # the primary failed fast, plain fallback to the backup
+            self._handle_completion_fallback(0, option_sets_to_try)
+            try:
+                response, ttft, _ = await self._afirst_token(messages, stream, 1, option_sets_to_try[1], context, **kwargs)
+            except Exception as e:
+                error, cause = self._hedge_failure(primary.exception(), e)
+                raise error from cause
+            self._record_hedge(1, ttft, hedged=False)
+            return response
+
+        backup = start_task(1)
+        pending = {primary: 0, backup: 1}
+        try:
+            while pending:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                done, _ = await asyncio.wait(set(pending), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"Hedged completion timed out after {timeout} seconds")
+                for task in done:
+                    idx = pending.pop(task)
+                    if task.exception() is not None:
+                        continue
+                    response, ttft, _ = task.result()
+                    self._record_hedge(idx, ttft, hedged=True)
+                    return response
+            error, cause = self._hedge_failure(primary.exception(), backup.exception())
+            raise error from cause
+        finally:
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None: # answered at the same time as the winner
+                    await task.result()[2]()
+
+    def _execute_tool_call(self, call: IFunctionCall[SupportedMessages], call_by_name: Callable) -> SupportedMessages:
+        if not self._metrics.enabled:
+            return call.execute_function(call_by_name)
+        started = time.perf_counter()
+        try:
+            return call.execute_function(call_by_name)
+        finally:
+            self._metrics.tool_seconds.observe((self.shortname, getattr(call, "name", "")), time.perf_counter() - started)
 
     def _process_function_calls(
             self,
             function_calls: List[IFunctionCall[SupportedMessages]],
-            memory: IBaseMemory = None
+            context: QueryContext
     ) -> SupportedMessages:
-        if not memory:
-            memory = self.memory
+        call_by_name = lambda function_name: self.tools[function_name].get_callable()
+        with tool_calls_scope(context.tool_calls_made):
+            # Parallel calls run in the shared thread pool of the tools, async tools are dispatched to their loops
+            # from the worker threads. Each call runs in a copy of the current context to keep the tool calls scope
+            results = ToolExecutors().map(
+                lambda call: self._execute_tool_call(call, call_by_name), function_calls, self.max_parallel_tools
+            )
+        return self._commit_tool_messages(results, context.memory)
+
+    async def _aprocess_function_calls(
+            self,
+            function_calls: List[IFunctionCall[SupportedMessages]],
+            context: QueryContext
+    ) -> SupportedMessages:
+        call_by_name = lambda function_name: self.tools[function_name].get_callable_async()
+        semaphore = asyncio.Semaphore(self.max_parallel_tools)
+
+        async def execute(call: IFunctionCall[SupportedMessages]) -> SupportedMessages:
+            async with semaphore:
+                if not self._metrics.enabled:
+                    return await call.aexecute_function(call_by_name)
+                started = time.perf_counter()
+                try:
+                    return await call.aexecute_function(call_by_name)
+                finally:
+                    self._metrics.tool_seconds.observe((self.shortname, getattr(call, "name", "")), time.perf_counter() - started)
+
+        with tool_calls_scope(context.tool_calls_made):
+            results = await asyncio.gather(*(execute(call) for call in function_calls))
+        return self._commit_tool_messages(results, context.memory)
+
+    def _commit_tool_messages(self, results: List[SupportedMessages], memory: IBaseMemory) -> SupportedMessages:
+        # Tool messages are added in the order of the calls, regardless of the order of completion
         messages: SupportedMessages = []
-        for call in function_calls:
-            msg = call.execute_function(lambda function_name: self.tools[function_name].get_callable())
+        for msg in results:
             self.handle_on_response(msg, action='response', source='tool')
             self.add_to_memory(msg, memory)
             messages.append(msg)
@@ -491,7 +1284,7 @@ class BaseAgent(
             continue_conversation: Optional[bool] = None,
             send_system_prompt: Optional[bool] = None,
             **kwargs
-    ) -> IBaseMemory:
+    ) -> QueryContext:
         # Set default values if not provided
         if enforce_agent_prompt is None:
             enforce_agent_prompt = self.enforce_agent_prompt
@@ -501,7 +1294,10 @@ class BaseAgent(
             send_system_prompt = self.send_system_prompt
 
         self.handle_on_query(query_input, action='query', source='input')  # handle the input query
-        memory_instance = self._fork_memory(copy_values=continue_conversation)  # Handlers from main memory need to fire even if messages are discarded
+        with self._memory_lock: # the fork and its base must be taken from the same memory state
+            base_messages = self.memory.messages
+            base_history_length = len(base_messages) - self.memory.prompt_messages_count if continue_conversation else 0
+            memory_instance = self._fork_memory(copy_values=continue_conversation)  # Handlers from main memory need to fire even if messages are discarded
 
         memory_instance.clear_system_messages(clear_non_empty=True) 
         # No old system messages in history in any case, either user's or agent's will be used
@@ -513,24 +1309,114 @@ class BaseAgent(
                 self.instruct(self.system_prompt, memory_instance)
 
         self.handle_on_query(memory_instance.messages, action='query', source='preprocessor')  # handle the modified query
-        return memory_instance
+        return QueryContext(memory=memory_instance, base_messages=base_messages, base_history_length=base_history_length)
 
     def _postprocess_query(
             self,
-            memory_instance: IBaseMemory,
+            context: QueryContext,
             remember_query: Optional[bool] = None,
             **kwargs
     ) -> IBaseMemory:
-        self._tool_fuse_broken = False  # defuse call limiter
-        if self.tools:
-            for tool in self.tools.values():
-                tool.reset() #reset tool calls, if set
+        memory_instance = context.memory
         if remember_query is None:
             remember_query = self.remember_query
-        if remember_query: #replace with shallow copy of the fork if remember is set
-            self.memory.messages = memory_instance.messages.copy()
+        if remember_query:
+            with self._memory_lock:
+                if self.memory.messages is context.base_messages:
+                    # take over the messages of the fork if remember is set, copy-on-write
+                    self.memory.replace_messages(memory_instance)
+                else:
+                    # memory was committed by a concurrent call since the fork, append only the messages of this call
+                    # system messages are on top, the inherited history follows them
+                    start = memory_instance.prompt_messages_count + context.base_history_length
+                    self.memory.extend_messages(memory_instance.messages[start:])
         return memory_instance
 
+    def _step_options(self) -> List[LLMOptions]:
+        """
+        Options of every step of the tool loop. With backup_options the loop has one more step
+        and the last two of them, a tool-enabled one and a potentially tool-less one, use the backup options.
+        """
+        steps = self.max_tool_calls + (1 if self.backup_options else 0)
+        return [
+            self.backup_options if self.backup_options and step >= steps - 2 else self.llm_options
+            for step in range(steps)
+        ]
+
+    def _commit_response(self, msg: SupportedMessages, context: QueryContext, step: int, steps: int) -> List[IFunctionCall[SupportedMessages]]:
+        """
+        Adds the LLM message of a step to memory and returns the tool calls to process before the next step,
+        none if the loop is over: there are no tools or the fuse is broken.
+        """
+        self.handle_on_response(msg, action='response', source='llm')
+        self.add_to_memory(msg, context.memory)
+        if not self.tools or context.tool_fuse_broken:
+            return []
+        tool_calls = self._protocol.tool_calls_from_message(msg)
+        # Fuse logic: if this is the second-to-last attempt overall, and it has tool calls,
+        # set the fuse to True so the *final* attempt will be tool-less.
+        if tool_calls and step == steps - 2:
+            context.tool_fuse_broken = True
+        return tool_calls
+
+    def _encode_stream_part(
+            self,
+            part: BaseModelResponse,
+            context: QueryContext,
+            sse_encoder: SSEStreamEncoder,
+            reconstruct_chunks: bool,
+            restream_tools: Optional[bool]
+    ) -> Optional[List[Any]]:
+        """Adds a chunk to the stream accumulator and returns its SSE messages, None for the tool call chunks processed separately."""
+        msg: SupportedMessages = context.stream_accumulator.add(part)
+        delta = self._protocol.content_from_delta(msg)
+        finish_reason: FinishReason = self._protocol.finish_reason_from_response(part)
+        if delta or restream_tools:  # stream content as is
+            if reconstruct_chunks:
+                return list(sse_encoder.encode(
+                    self._protocol.create_chunk_from_content(
+                        delta, part["model"], role=msg.get("role", None)
+                    ).model_dump(mode='json')
+                ))
+            return list(sse_encoder.encode(part.model_dump(mode='json')))
+        if finish_reason == FinishReason.function_call:
+            raise NotImplementedError("Function calls are deprecated, use Tool calls instead")
+        if finish_reason == FinishReason.tool_calls:
+            return None  # processed separately
+        return list(sse_encoder.encode(part.model_dump(mode='json')))
+
+    def _finish_stream_step(
+            self,
+            context: QueryContext,
+            yielded: bool,
+            sse_encoder: SSEStreamEncoder,
+            step: int,
+            steps: int
+    ) -> Tuple[List[Any], List[IFunctionCall[SupportedMessages]]]:
+        """
+        Commits the message assembled from the stream of a step.
+        Returns the SSE messages still to send, nothing is held back while the tools run, and the tool calls to process.
+        """
+        messages = list(sse_encoder.flush())
+        tool_calls = []
+        accumulator, context.stream_accumulator = context.stream_accumulator, None
+        if accumulator.chunks > 0:
+            if self.prompt_caching:
+                self._prompt_cache_stats.record(accumulator.usage)
+            tool_calls = self._commit_response(accumulator.message(), context, step, steps)  # type: ignore
+            if not tool_calls and not yielded:  # not delta and not tool, pass as is
+                messages.extend(sse_encoder.encode(accumulator.response().model_dump(mode='json')))
+        return messages, tool_calls
+
+    def _encode_tool_messages(self, tool_messages: SupportedMessages, sse_encoder: SSEStreamEncoder, model: str) -> List[Any]:
+        """SSE messages restreaming the results of the tools."""
+        messages = []
+        for tool_message in tool_messages:
+            messages.extend(sse_encoder.encode(
+                self._protocol.create_chunk_from_content(tool_message, model, role=Role.tool.value).model_dump(mode='json')
+            ))
+        return messages
+
     def query(
             self,
             query_input: SupportedMessages,
@@ -545,63 +1431,33 @@ class BaseAgent(
         Query the agent and return the last message.
         The method iteratively calls the LLM. If `backup_options` are configured and tool calls persist,
         the final two attempts (a tool-enabled call, then a potentially tool-less graceful response call)
-        will utilize the backup model. The `_tool_fuse_broken` attribute controls whether tools are
+        will utilize the backup model. The `tool_fuse_broken` flag of the per-call `QueryContext` controls whether tools are
         stripped in the final attempt to ensure a graceful exit from tool loops.
         """
-        memory = self._preprocess_input(
+        context = self._preprocess_input(
             query_input,
             send_system_prompt=send_system_prompt,
             enforce_agent_prompt=enforce_agent_prompt,
             continue_conversation=continue_conversation,
         )
-
-        self._tool_fuse_broken = False # Ensure a clean slate for the fuse for this specific call
-        effective_max_tool_calls = self.max_tool_calls
-        if self.backup_options:
-            effective_max_tool_calls += 1
-
-        for step in range(effective_max_tool_calls):
-            options_for_this_step = self.llm_options
-            if self.backup_options:
-                # If backup options are available, use them for the last two attempts
-                if step >= effective_max_tool_calls - 2:
-                    options_for_this_step = self.backup_options
-            
+        step_options = self._step_options()
+        for step, options_for_this_step in enumerate(step_options):
             response = self._execute_completion(
-                memory.messages, 
+                context.memory.messages, 
                 stream=False, 
                 active_options_for_this_call=options_for_this_step,
+                context=context,
                 response_format=response_format, # Pass response_format here explicitly
                 **kwargs
             )
             msg: SupportedMessages = self._protocol.message_from_response(response) # type: ignore
-            self.handle_on_response(msg, action='response', source='llm')
-            self.add_to_memory(msg, memory)
-
-            if not self.tools or self._tool_fuse_broken:
-               break # If  the fuse is broken or there are no tools available, exit the loop
-
-            tool_calls = self._protocol.tool_calls_from_message(msg)
-            
-            # Fuse logic: if this is the second-to-last attempt overall, and it has tool calls,
-            # set the fuse to True so the *final* attempt will be tool-less.
-            if step == effective_max_tool_calls - 2: 
-                if tool_calls:
-                    self._tool_fuse_broken = True # Arm fuse for the *final* iteration (next one)
-
+            tool_calls = self._commit_response(msg, context, step, len(step_options))
             if not tool_calls:
-                break # Exit loop if no tool calls are made
-            
-            # Process each tool call if they exist
-            self._process_function_calls(
-                tool_calls,
-                memory
-            ) 
-            
-    
+                break # Exit loop if no tool calls are made, there are no tools or the fuse is broken
+            self._process_function_calls(tool_calls, context)
 
         return self._postprocess_query(
-            memory,
+            context,
             remember_query=remember_query,
         ).last_message_str
 
@@ -615,109 +1471,54 @@ class BaseAgent(
             reconstruct_chunks : bool = False,
             restream_tools: Optional[bool] = None,
             response_format: Optional[str] = None,
+            sse_encoder: Optional[SSEStreamEncoder] = None,
             **kwargs
     ) -> Generator[Union[BaseModelResponse, SupportedMessages],None,None]:
         """
         Streams responses from the agent.
         The method iteratively calls the LLM. If `backup_options` are configured and tool calls persist,
         the final two attempts (a tool-enabled call, then a potentially tool-less graceful response call)
-        will utilize the backup model. The `_tool_fuse_broken` attribute controls whether tools are
+        will utilize the backup model. The `tool_fuse_broken` flag of the per-call `QueryContext` controls whether tools are
         stripped in the final attempt to ensure a graceful exit from tool loops.
+        Chunks are encoded by the sse_encoder, e.g. one emitting bytes and coalescing the deltas for a web server.
         """
-        memory = self._preprocess_input(
+        sse_encoder = sse_encoder or SSEStreamEncoder()
+        context = self._preprocess_input(
             query_input,
             send_system_prompt=send_system_prompt,
             enforce_agent_prompt=enforce_agent_prompt,
             continue_conversation=continue_conversation,
         )
-
-        self._tool_fuse_broken = False # Ensure a clean slate for the fuse for this specific call
-        effective_max_tool_calls = self.max_tool_calls
-        if self.backup_options:
-            effective_max_tool_calls += 1
-
-        for step in range(effective_max_tool_calls):
-            self._partial_streaming_chunks.clear()
-            
-            options_for_this_step = self.llm_options
-            if self.backup_options:
-                # If backup options are available, use them for the last two attempts
-                if step >= effective_max_tool_calls - 2:
-                    options_for_this_step = self.backup_options
-
+        step_options = self._step_options()
+        for step, options_for_this_step in enumerate(step_options):
+            context.stream_accumulator = self._protocol.stream_accumulator()
             response = self._execute_completion(
-                memory.messages, 
+                context.memory.messages, 
                 stream=True, 
                 active_options_for_this_call=options_for_this_step,
+                context=context,
                 response_format=response_format, 
                 **kwargs
             )
             yielded = False
-            tool_calls = [] # Initialize tool_calls for this step
-            for i, part in enumerate(response):
-                self._partial_streaming_chunks.append(part)
-                msg: SupportedMessages = self._protocol.message_from_response(part)
-                delta = self._protocol.content_from_delta(msg)
-                finish_reason: FinishReason = self._protocol.finish_reason_from_response(part)
-                if delta or restream_tools:  # stream content as is
-                    yielded = True
-                    if reconstruct_chunks:
-                        yield SSE.sse_wrap(
-                            self._protocol.create_chunk_from_content(
-                                delta, part["model"], role=msg.get("role", None)
-                            ).model_dump(mode='json')
-                        )
-                    else:
-                        yield SSE.sse_wrap(part.model_dump(mode='json'))
-                elif finish_reason == FinishReason.function_call:
-                    raise NotImplementedError("Function calls are deprecated, use Tool calls instead")
-                elif finish_reason == FinishReason.tool_calls:
-                    pass #processed separately
-                else:
+            for part in response:
+                messages = self._encode_stream_part(part, context, sse_encoder, reconstruct_chunks, restream_tools)
+                if messages is not None:
                     yielded = True
-                    yield SSE.sse_wrap(part.model_dump(mode='json'))
-
-            if len(self._partial_streaming_chunks) > 0:
-                assembly = self._protocol.response_from_deltas(self._partial_streaming_chunks)
-                self._partial_streaming_chunks.clear()
-                msg: SupportedMessages = self._protocol.message_from_response(assembly)  # type: ignore
-                self.handle_on_response(msg, action='response', source='llm')
-                self.add_to_memory(msg, memory)
-
-                tool_calls = self._protocol.tool_calls_from_message(msg)
-                if not tool_calls and not yielded:
-                    yield SSE.sse_wrap(
-                        assembly.model_dump(mode='json')
-                    )  # not delta and not tool, pass as is
-
-            if not self.tools: # or self._tool_fuse_broken or not tool_calls: (old logic)
-                # self._tool_fuse_broken = False # (old logic, fuse reset is handled by _postprocess_query)
-                break  # If there are no tools available, exit the loop
-            
-            # Fuse logic: if this is the second-to-last attempt overall, and it has tool calls,
-            # set the fuse to True so the *final* attempt will be tool-less.
-            if step == effective_max_tool_calls - 2: 
-                if tool_calls: # tool_calls should be populated from the assembled response
-                    self._tool_fuse_broken = True # Arm fuse for the *final* iteration (next one)
-
+                    yield from messages
+            messages, tool_calls = self._finish_stream_step(context, yielded, sse_encoder, step, len(step_options))
+            yield from messages
             if not tool_calls:
-                break # Exit loop if no tool calls are made
-            else:
-                tool_messages = self._process_function_calls(tool_calls,memory)
-                if restream_tools:
-                    for i, tool_message in enumerate(tool_messages):
-                        yield SSE.sse_wrap(
-                            self._protocol.create_chunk_from_content(
-                                tool_message, kwargs.get("model",self.shortname), role=Role.tool.value
-                            ).model_dump(mode='json')
-                        )
-    
+                break # Exit loop if no tool calls are made, there are no tools or the fuse is broken
+            tool_messages = self._process_function_calls(tool_calls, context)
+            if restream_tools:
+                yield from self._encode_tool_messages(tool_messages, sse_encoder, kwargs.get("model", self.shortname))
 
         self._postprocess_query(
-            memory,
+            context,
             remember_query=remember_query,
         )
-        yield SSE.sse_wrap(self._protocol.stop)
+        yield from sse_encoder.encode(self._protocol.stop)
 
 
     def query_structural(
@@ -744,25 +1545,245 @@ class BaseAgent(
         Returns:
             Either a dictionary or validated Pydantic model
         """
+        response_format = self._structural_response_format(parser, response_format, enforce_validation)
+        
+        # Get raw response from the model
+        raw_response = self.query(query_input, response_format=response_format, **kwargs)
         
+        # Process and validate the response
+        return ModelHelper.get_structured_output(raw_response, parser)
+
+    @staticmethod
+    def _structural_response_format(
+        parser: Type[BaseModel],
+        response_format: Optional[str],
+        enforce_validation: bool
+    ) -> Optional[str]:
         if response_format is None and parser is not dict and issubclass(parser, BaseModel) and enforce_validation:
-            schema = ModelHelper.get_response_schema(parser)
-            response_format = ModelHelper.make_all_fields_required(parser)
-            
-            schema_wrapper = {
-                "name": "query_structural", 
-                "schema": schema,
-                "strict": enforce_validation
-            }
+            # built once per parser class instead of creating a new model class on every call
+            response_format = compile_parser(parser).required_model
+        return response_format
 
-            response_format_obj = {"type": "json_schema", "json_schema": schema_wrapper}
+    def stream_structural(
+        self,
+        query_input: SupportedMessages,
+        parser: Type[BaseModel] = BaseModel,
+        response_format: Optional[str] = None,
+        enforce_validation: bool = False,
+        **kwargs
+    ) -> Generator[Union[dict, BaseModel], None, None]:
+        """
+        Streams the response and yields the structured output as it arrives: partial instances of the parser
+        with the fields completed so far, each time a field completes, then the whole response validated
+        as query_structural does. Only the last result is validated by the model validators of the parser.
+
+        Args:
+            query_input: The input to send to the model
+            parser: The Pydantic model class to validate against or dict
+            response_format: Optional JSON schema to guide response format
+            enforce_validation: Whether to enforce validation on the model side
+            **kwargs: Additional arguments to pass to the stream method
+        """
+        response_format = self._structural_response_format(parser, response_format, enforce_validation)
+        partial_parser = PartialOutputParser(parser)
+        for chunk in self.stream(query_input, response_format=response_format, sse_encoder=ChunkPassthroughEncoder(), **kwargs):
+            if not isinstance(chunk, dict) or not chunk.get("choices"):
+                continue  # the stop message
+            choice = chunk["choices"][0]
+            message = choice.get("delta") or choice.get("message") or {}
+            if message.get("role") == Role.tool.value or not message.get("content"):
+                continue  # restreamed tool results are not the response
+            partial = partial_parser.feed(message["content"])
+            if partial is not None:
+                yield partial
+        yield partial_parser.result()
+
+    async def aquery(
+            self,
+            query_input: SupportedMessages,
+            send_system_prompt: Optional[bool] = None,
+            enforce_agent_prompt: Optional[bool] = None,
+            continue_conversation: Optional[bool] = None,
+            remember_query: Optional[bool] = None,
+            response_format: Optional[str] = None,
+            **kwargs
+    ) -> str:
+        """
+        Async counterpart of query, with the same tool loop, backup options and fuse logic.
+        Provider calls are awaited via the protocol adapter async_completion, async tools are awaited natively.
+        Synchronous tools, the input preprocessing with its prompt tools and the disk tier of the caches
+        run in worker threads, off the event loop.
+        """
+        context = await asyncio.to_thread(
+            self._preprocess_input,
+            query_input,
+            send_system_prompt=send_system_prompt,
+            enforce_agent_prompt=enforce_agent_prompt,
+            continue_conversation=continue_conversation,
+        )
+        step_options = self._step_options()
+        for step, options_for_this_step in enumerate(step_options):
+            response = await self._aexecute_completion(
+                context.memory.messages, 
+                stream=False, 
+                active_options_for_this_call=options_for_this_step,
+                context=context,
+                response_format=response_format,
+                **kwargs
+            )
+            msg: SupportedMessages = self._protocol.message_from_response(response) # type: ignore
+            tool_calls = self._commit_response(msg, context, step, len(step_options))
+            if not tool_calls:
+                break
+            await self._aprocess_function_calls(tool_calls, context)
+
+        return self._postprocess_query(
+            context,
+            remember_query=remember_query,
+        ).last_message_str
+
+    async def astream(
+            self,
+            query_input: SupportedMessages,
+            send_system_prompt: Optional[bool] = None,
+            enforce_agent_prompt: Optional[bool] = None,
+            continue_conversation: Optional[bool] = None,
+            remember_query: Optional[bool] = None,
+            reconstruct_chunks : bool = False,
+            restream_tools: Optional[bool] = None,
+            response_format: Optional[str] = None,
+            sse_encoder: Optional[SSEStreamEncoder] = None,
+            **kwargs
+    ) -> AsyncGenerator[Union[BaseModelResponse, SupportedMessages],None]:
+        """
+        Async counterpart of stream, yields the same SSE-wrapped chunks.
+        Provider streams are consumed with async iteration, the rest is awaited or offloaded as in aquery.
+        """
+        sse_encoder = sse_encoder or SSEStreamEncoder()
+        context = await asyncio.to_thread(
+            self._preprocess_input,
+            query_input,
+            send_system_prompt=send_system_prompt,
+            enforce_agent_prompt=enforce_agent_prompt,
+            continue_conversation=continue_conversation,
+        )
+        step_options = self._step_options()
+        for step, options_for_this_step in enumerate(step_options):
+            context.stream_accumulator = self._protocol.stream_accumulator()
+            response = await self._aexecute_completion(
+                context.memory.messages, 
+                stream=True, 
+                active_options_for_this_call=options_for_this_step,
+                context=context,
+                response_format=response_format, 
+                **kwargs
+            )
+            yielded = False
+            async for part in response:
+                messages = self._encode_stream_part(part, context, sse_encoder, reconstruct_chunks, restream_tools)
+                if messages is not None:
+                    yielded = True
+                    for message in messages:
+                        yield message
+            messages, tool_calls = self._finish_stream_step(context, yielded, sse_encoder, step, len(step_options))
+            for message in messages:
+                yield message
+            if not tool_calls:
+                break
+            tool_messages = await self._aprocess_function_calls(tool_calls, context)
+            if restream_tools:
+                for message in self._encode_tool_messages(tool_messages, sse_encoder, kwargs.get("model", self.shortname)):
+                    yield message
+
+        self._postprocess_query(
+            context,
+            remember_query=remember_query,
+        )
+        for message in sse_encoder.encode(self._protocol.stop):
+            yield message
+
+    async def aquery_structural(
+        self, 
+        query_input: SupportedMessages, 
+        parser: Type[BaseModel] = BaseModel,
+        response_format: Optional[str] = None,
+        enforce_validation: bool = False,
+        **kwargs
+    ) -> Union[dict, BaseModel]:
+        """
+        Async counterpart of query_structural, see query_structural for the arguments.
+        """
+        response_format = self._structural_response_format(parser, response_format, enforce_validation)
         
         # Get raw response from the model
-        raw_response = self.query(query_input, response_format=response_format, **kwargs)
+        raw_response = await self.aquery(query_input, response_format=response_format, **kwargs)
         
         # Process and validate the response
         return ModelHelper.get_structured_output(raw_response, parser)
 
+    @staticmethod
+    def _batch_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # every input of a batch is a stateless query, the agent memory is neither read nor changed
+        return {**kwargs, "continue_conversation": False, "remember_query": False}
+
+    def query_batch(
+            self,
+            inputs: Iterable[SupportedMessages],
+            concurrency: int = 8,
+            ordered: bool = True,
+            checkpoint_path: Optional[str] = None,
+            **kwargs
+    ) -> Iterator[BatchResult]:
+        """
+        Queries every input with at most concurrency queries in flight, yielding a BatchResult per input,
+        in the order of the inputs or as completed. A failed input is reported in its result, the batch goes on.
+        Inputs are stateless queries with a memory of their own. The key pool is shared by the queries:
+        set key_max_wait so that they wait for a key coming off cooldown or budget instead of failing.
+        With checkpoint_path the finished inputs are appended to a JSON lines file and a batch started again
+        with the same file resumes where it stopped: the results of the inputs that succeeded are reused.
+        Other keyword arguments are passed to query.
+        """
+        kwargs = self._batch_kwargs(kwargs)
+        return run_batch(
+            lambda query_input: self.query(query_input, **kwargs),
+            inputs, concurrency, ordered, checkpoint_path,
+            thread_name_prefix=f"{self.shortname}.batch",
+        )
+
+    def aquery_batch(
+            self,
+            inputs: Iterable[SupportedMessages],
+            concurrency: int = 8,
+            ordered: bool = True,
+            checkpoint_path: Optional[str] = None,
+            **kwargs
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Async counterpart of query_batch, the queries are awaited on the running event loop.
+        """
+        kwargs = self._batch_kwargs(kwargs)
+        return arun_batch(
+            lambda query_input: self.aquery(query_input, **kwargs),
+            inputs, concurrency, ordered, checkpoint_path,
+        )
+
+    def stream_many(
+            self,
+            inputs: Iterable[SupportedMessages],
+            concurrency: int = 8,
+            **kwargs
+    ) -> Iterator[Tuple[int, Union[Any, BatchResult]]]:
+        """
+        Streams every input with at most concurrency streams at once, as stateless queries like query_batch.
+        Yields (index, chunk) pairs of the streams interleaved as the chunks arrive, then (index, BatchResult)
+        once the stream of an input ends, with the error if it failed. Other keyword arguments are passed to stream.
+        """
+        kwargs = self._batch_kwargs(kwargs)
+        return run_stream_batch(
+            lambda query_input: self.stream(query_input, **kwargs),
+            inputs, concurrency,
+            thread_name_prefix=f"{self.shortname}.batch",
+        )
 
     @property
     def model_supported_parameters(self) -> list[str]:
@@ -879,6 +1900,7 @@ class BaseAgentWithLogging(BaseAgent):
         self._log_tool_result = self.tool_result_callback
         self.subscribe_to_tool_result(self._log_tool_result) #using listener to log tool results
         self.subscribe_to_prompt_tool_result(self._log_tool_result)
+        self.subscribe_to_tool_cache_hit(self._log_tool_result)
         self._log_tool_error = self.tool_error_callback
         self.subscribe_to_tool_error(self._log_tool_error) #using listener to log tool errors
         self.subscribe_to_prompt_tool_error(self._log_tool_error)
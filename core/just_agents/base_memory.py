@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, PrivateAttr
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from typing import Callable, List, Dict
 from functools import singledispatchmethod
 from just_agents.interfaces.memory import IMemory, IMessageFormatter
@@ -84,13 +84,29 @@ class MessageFormatter(IMessageFormatter):
 OnMessageCallable = Callable[[MessageDict], None]
 OnToolCallable = Callable[[ToolCall], None]
 
+def _message_has_text(message: MessageDict) -> bool:
+    """Same as Message(**message).get_text() being non-empty, without building the model."""
+    content = message.get("content")
+    if isinstance(content, list):
+        return bool(" ".join(
+            item.get("text") or "" for item in content if isinstance(item, dict) and item.get("type") == "text"
+        ))
+    return isinstance(content, str) and bool(content)
+
 class IBaseMemory(BaseModel, IMemory[Role, MessageDict], IMessageFormatter, ABC):
     """
     Abstract Base Class to fulfill Pydantic schema requirements for concrete-attributes.
+
+    System messages are always kept on top of the list, so the system prompt slot is found without scanning the history.
+    The messages list is copy-on-write: forks share it until either side changes it through the memory methods,
+    so it must not be mutated in place directly.
     """
 
     messages: List[MessageDict] = Field(default_factory=list, validation_alias='conversation')
 
+    # True while the messages list is shared with a fork (or the memory it was forked from)
+    _shared: bool = PrivateAttr(default=False)
+
     # Private dict of message handlers for each role
     _on_message: Dict[Role, List[OnMessageCallable]] = PrivateAttr(default_factory=lambda: {
         Role.assistant: [],
@@ -106,6 +122,20 @@ class IBaseMemory(BaseModel, IMemory[Role, MessageDict], IMessageFormatter, ABC)
     def add_user_message(self, prompt: str) -> None:
         self.add_message({"role": Role.user, "content": prompt})
 
+    @field_validator('messages', mode='after')
+    @classmethod
+    def _system_messages_on_top(cls, messages: List[MessageDict]) -> List[MessageDict]:
+        if any(message.get("role", "user") == Role.system for message in messages):
+            messages.sort(key=lambda msg: msg.get("role", "user") != Role.system) # stable, preserves the order
+        return messages
+
+    def _own_messages(self) -> List[MessageDict]:
+        """Returns the messages list for in-place changes, copying it first if it is shared."""
+        if self._shared:
+            self.messages = self.messages.copy()
+            self._shared = False
+        return self.messages
+
     def get_message_by_role(self, role: Role) -> List[MessageDict]:
         """
         Retrieves all messages that match the given role.
@@ -115,21 +145,38 @@ class IBaseMemory(BaseModel, IMemory[Role, MessageDict], IMessageFormatter, ABC)
         """
         return [message for message in self.messages if message.get("role","user") == role.value]
 
+    @property
+    def prompt_messages_count(self) -> int:
+        """Number of system messages, only the top of the list is looked at."""
+        count = 0
+        for message in self.messages:
+            if message.get("role", "user") != Role.system:
+                break
+            count += 1
+        return count
+
     @property
     def prompt_messages(self) -> List[MessageDict]:
-        return self.get_message_by_role(Role.system)
+        return self.messages[:self.prompt_messages_count]
 
     def has_system_messages(self) -> bool:
-        return any(message.get("role", "user") == Role.system for message in self.messages)
+        return bool(self.messages) and self.messages[0].get("role", "user") == Role.system
 
     def clear_system_messages(self, clear_non_empty: bool = True) -> None:
-        for sys_prompt in self.prompt_messages:
-            if not clear_non_empty and Message(**sys_prompt).get_text():
-                continue
-            self.messages.remove(sys_prompt)
-        if clear_non_empty and self.prompt_messages:
+        count = self.prompt_messages_count
+        if not count:
+            return
+        kept = [] if clear_non_empty else [sys_prompt for sys_prompt in self.messages[:count] if _message_has_text(sys_prompt)]
+        if len(kept) < count:
+            self.messages = kept + self.messages[count:] # a new list, a shared one is left intact
+            self._shared = False
+        if clear_non_empty and self.has_system_messages():
             raise ValueError("Failed to clear system prompts")
 
+    def clear_messages(self) -> None:
+        self.messages = []
+        self._shared = False
+
     def deepcopy(self) -> 'IBaseMemory':
         new_memory = type(self)()  # Call the default constructor of same class
         new_memory._on_message = self._on_message.copy() #shallow_copy collections instead
@@ -137,6 +184,27 @@ class IBaseMemory(BaseModel, IMemory[Role, MessageDict], IMessageFormatter, ABC)
         return new_memory
         #return self.model_copy(deep=True)
 
+    def fork(self, copy_values: bool = True) -> 'IBaseMemory':
+        """
+        Returns a copy-on-write fork with the same handlers, sharing the messages list if copy_values is set.
+        The list is copied only by the side that changes it first, so forking does not depend on the history length.
+        """
+        new_memory = type(self)()
+        new_memory._on_message = self._on_message.copy()
+        if copy_values:
+            new_memory.messages = self.messages
+            new_memory._shared = self._shared = True
+        return new_memory
+
+    def replace_messages(self, source: 'IBaseMemory') -> None:
+        """Takes over the messages of another memory, e.g. of a finished fork, without copying them."""
+        self.messages = source.messages
+        self._shared = source._shared = True
+
+    def extend_messages(self, messages: List[MessageDict]) -> None:
+        """Appends non-system messages as is, without firing the handlers, e.g. when merging a fork back."""
+        self._own_messages().extend(messages)
+
     # Role-specific message handlers
     def add_on_tool_call(self, fun: OnToolCallable) -> None:
         """
@@ -247,8 +315,6 @@ class BaseMemory(IBaseMemory, MessageFormatter):
         role: Optional[Role] = message.get("role", None)
         if role is None:
             raise ValueError("Message does not have a role")
-        if role == Role.system: # Bubble up the system message to the top of the list preserving order
-            self.messages.sort(key=lambda msg: msg.get("role","user") != Role.system)
         for handler in self._on_message.get(role, []):
             handler(message)
 
@@ -273,7 +339,11 @@ class BaseMemory(IBaseMemory, MessageFormatter):
         """
         Handles AbstractMessage instances.
         """
-        self.messages.append(message)
+        messages = self._own_messages()
+        if message.get("role", "user") == Role.system: # Put the system message below the other ones on top of the list
+            messages.insert(self.prompt_messages_count, message)
+        else:
+            messages.append(message)
         self.handle_message(message)
 
     @add_message.register
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import BaseModel, Field
+
+WINDOW_FACTOR = 4
+"""In the ordered mode, items are started at most concurrency * WINDOW_FACTOR ahead of the first unfinished one."""
+
+
+class BatchResult(BaseModel):
+    """
+    Outcome of one item of a batch, an error does not abort the batch.
+    """
+    index: int = Field(..., description="Position of the item in the inputs")
+    fingerprint: str = Field(..., description="Hash of the item, a checkpointed result is reused only for the same item")
+    output: Any = Field(None, description="Result of the item, None on error")
+    error: Optional[str] = Field(None, description="Message of the exception raised by the item")
+    error_type: Optional[str] = Field(None, description="Class name of the exception raised by the item")
+    seconds: float = Field(0.0, description="Time the item took")
+    resumed: bool = Field(False, description="Loaded from the checkpoint instead of being run again")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def item_fingerprint(item: Any) -> str:
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class BatchCheckpoint:
+    """
+    JSON lines file of the finished items of a batch. A batch started again with the same file skips the items
+    that succeeded, the failed ones are run again. A line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def load(self) -> Dict[int, BatchResult]:
+        results: Dict[int, BatchResult] = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    result = BatchResult.model_validate_json(line)
+                except ValueError:
+                    continue
+                if result.ok:
+                    results[result.index] = result.model_copy(update={"resumed": True})
+                else:
+                    results.pop(result.index, None)
+        return results
+
+    def write(self, result: BatchResult) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(result.model_dump_json(exclude={"resumed"}) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BatchState:
+    """
+    Bookkeeping of a batch shared by the thread and the asyncio runners: takes the items to start,
+    reuses the checkpointed results and releases the finished results in the requested order.
+    """
+
+    def __init__(self, inputs: Iterable[Any], concurrency: int, ordered: bool, checkpoint: Optional[BatchCheckpoint]):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.checkpoint = checkpoint
+        self.restored = checkpoint.load() if checkpoint else {}
+        self.exhausted = False
+        self._items = enumerate(inputs)
+        self._taken = 0
+        self._next = 0
+        self._ready: List[BatchResult] = []
+        self._buffered: Dict[int, BatchResult] = {}
+
+    def take(self, in_flight: int) -> List[Tuple[int, Any, str]]:
+        """Items to start, the ones with a checkpointed result are finished right away."""
+        started = []
+        while not self.exhausted and in_flight + len(started) < self.concurrency:
+            if self.ordered and self._taken - self._next >= self.concurrency * WINDOW_FACTOR:
+                break
+            try:
+                index, item = next(self._items)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self._taken = index + 1
+            fingerprint = item_fingerprint(item)
+            previous = self.restored.pop(index, None)
+            if previous is not None and previous.fingerprint == fingerprint:
+                self._ready.append(previous)
+            else:
+                started.append((index, item, fingerprint))
+        return started
+
+    def finish(self, result: BatchResult) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.write(result)
+        self._ready.append(result)
+
+    def has_ready(self) -> bool:
+        return bool(self._ready)
+
+    def release(self) -> List[BatchResult]:
+        ready, self._ready = self._ready, []
+        if not self.ordered:
+            return ready
+        for result in ready:
+            self._buffered[result.index] = result
+        released = []
+        while self._next in self._buffered:
+            released.append(self._buffered.pop(self._next))
+            self._next += 1
+        return released
+
+    def close(self) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+
+
+def _result(index: int, fingerprint: str, started: float, output: Any = None, error: Optional[BaseException] = None) -> BatchResult:
+    return BatchResult(
+        index=index,
+        fingerprint=fingerprint,
+        output=output,
+        error=None if error is None else str(error) or repr(error),
+        error_type=None if error is None else type(error).__name__,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def _run_item(call: Callable[[Any], Any], index: int, item: Any, fingerprint: str) -> BatchResult:
+    started = time.perf_counter()
+    try:
+        return _result(index, fingerprint, started, output=call(item))
+    except Exception as e:
+        return _result(index, fingerprint, started, error=e)
+
+
+async def _arun_item(call: Callable[[Any], Awaitable[Any]], index: int, item: Any, fingerprint: str) -> BatchResult:
+    started = time.perf_counter()
+    try:
+        return _result(index, fingerprint, started, output=await call(item))
+    except Exception as e:
+        return _result(index, fingerprint, started, error=e)
+
+
+def run_batch(
+        call: Callable[[Any], Any],
+        inputs: Iterable[Any],
+        concurrency: int = 8,
+        ordered: bool = True,
+        checkpoint_path: Optional[str] = None,
+        thread_name_prefix: str = "batch",
+) -> Iterator[BatchResult]:
+    """Runs the call on every input in a thread pool of the given size, yielding the results in order or as completed."""
+    state = BatchState(inputs, concurrency, ordered, BatchCheckpoint(checkpoint_path) if checkpoint_path else None)
+    pending: Dict[Future, int] = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=thread_name_prefix) as executor:
+        try:
+            while True:
+                for index, item, fingerprint in state.take(len(pending)):
+                    pending[executor.submit(_run_item, call, index, item, fingerprint)] = index
+                if not state.has_ready() and pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.pop(future)
+                        state.finish(future.result())
+                released = state.release()
+                yield from released
+                if state.exhausted and not pending and not released and not state.has_ready():
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+            state.close()
+
+
+async def arun_batch(
+        call: Callable[[Any], Awaitable[Any]],
+        inputs: Iterable[Any],
+        concurrency: int = 8,
+        ordered: bool = True,
+        checkpoint_path: Optional[str] = None,
+) -> AsyncIterator[BatchResult]:
+    """Async counterpart of run_batch, at most concurrency calls are awaited at once on the running loop."""
+    state = BatchState(inputs, concurrency, ordered, BatchCheckpoint(checkpoint_path) if checkpoint_path else None)
+    pending: Dict[asyncio.Task, int] = {}
+    try:
+        while True:
+            for index, item, fingerprint in state.take(len(pending)):
+                pending[asyncio.ensure_future(_arun_item(call, index, item, fingerprint))] = index
+            if not state.has_ready() and pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.pop(task)
+                    state.finish(task.result())
+            released = state.release()
+            for result in released:
+                yield result
+            if state.exhausted and not pending and not released and not state.has_ready():
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        state.close()
+
+
+def run_stream_batch(
+        stream_call: Callable[[Any], Iterable[Any]],
+        inputs: Iterable[Any],
+        concurrency: int = 8,
+        thread_name_prefix: str = "batch",
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Runs the streaming call on every input in a thread pool of the given size. Yields (index, chunk) pairs
+    as the chunks of the streams arrive, interleaved, and (index, BatchResult) once the stream of an input ends.
+    """
+    events: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def stream_item(index: int, item: Any, fingerprint: str) -> None:
+        started = time.perf_counter()
+        try:
+            for chunk in stream_call(item):
+                if stop.is_set():
+                    return
+                events.put((index, chunk))
+            events.put((index, _result(index, fingerprint, started)))
+        except Exception as e:
+            events.put((index, _result(index, fingerprint, started, error=e)))
+
+    state = BatchState(inputs, concurrency, ordered=False, checkpoint=None)
+    running = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=thread_name_prefix) as executor:
+        try:
+            while True:
+                for index, item, fingerprint in state.take(running):
+                    executor.submit(stream_item, index, item, fingerprint)
+                    running += 1
+                if not running:
+                    break
+                index, event = events.get()
+                if isinstance(event, BatchResult):
+                    running -= 1
+                yield index, event
+        finally:
+            stop.set()  # the streams still running end at their next chunk
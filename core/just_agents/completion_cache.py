@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+NON_FINGERPRINT_OPTIONS = frozenset({"api_key", "timeout", "num_retries", "metadata", "mock_delay"})
+"""Completion options that do not change the response, left out of the cache key."""
+
+PRUNE_EVERY = 256
+"""Writes between two prunings of the expired rows of the disk tier."""
+
+PRUNE_TO = 0.9
+"""Share of max_entries the disk tier is cut down to once it grows past it, so that it is not pruned on every write."""
+
+
+class CompletionCacheOptions(BaseModel):
+    """
+    Options of the completion response cache of an agent.
+    """
+    ttl: Optional[float] = Field(None, ge=0, description="Seconds a cached completion is served for, forever if not set")
+    max_entries: int = Field(1024, ge=1, description="Number of completions kept in the in-memory LRU tier and in the on-disk tier")
+    path: Optional[str] = Field(None, description="SQLite file of the on-disk tier, the cache is memory-only if not set")
+    deterministic_only: bool = Field(True, description="Cache only the calls made with temperature 0 or a fixed seed")
+
+
+def _canonical_default(value: Any) -> Any:
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return value.model_json_schema()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class CompletionCache:
+    """
+    Completion responses keyed by a canonical fingerprint of the messages and the completion options.
+    Responses are kept as JSON in a bounded in-memory LRU and, optionally, in a table of a SQLite file.
+    Caches are shared process-wide per path and table, the TTL is applied by each reader.
+    The disk tier drops the rows past the longest TTL of its sharers every PRUNE_EVERY writes and is capped at
+    max_entries rows: once it grows past them, the oldest rows are dropped down to PRUNE_TO of max_entries.
+    The same two tiers keep the memoized tool results, in a table of their own.
+    """
+    _shared_caches: ClassVar[Dict[Tuple[Optional[str], str], 'CompletionCache']] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None, table: str = "completions", ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self._disk_rows = 0
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, created REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table} (created)")
+            self._db.commit()
+            self._disk_rows = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    @classmethod
+    def shared(cls, options: CompletionCacheOptions, table: str = "completions") -> 'CompletionCache':
+        """
+        Returns the process-wide cache for the path of the options, growing it to max_entries if needed.
+        Rows are kept for the longest TTL of the sharers, forever if one of them has none.
+        """
+        path = os.path.abspath(options.path) if options.path else None
+        with cls._shared_lock:
+            cache = cls._shared_caches.get((path, table))
+            if cache is None:
+                cache = cls._shared_caches[(path, table)] = cls(options.max_entries, path, table, options.ttl)
+            else:
+                cache.max_entries = max(cache.max_entries, options.max_entries)
+                cache.ttl = None if cache.ttl is None or options.ttl is None else max(cache.ttl, options.ttl)
+            return cache
+
+    @staticmethod
+    def fingerprint(messages: Any, stream: bool, options: Dict[str, Any]) -> str:
+        """Canonical hash of the request, the options that do not affect the response are left out."""
+        request = {
+            "messages": messages,
+            "stream": stream,
+            "options": {key: value for key, value in options.items() if key not in NON_FINGERPRINT_OPTIONS},
+        }
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_canonical_default)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Returns the cached payload if it is younger than ttl seconds, None otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(f"SELECT created, payload FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+            if entry is None or (ttl is not None and time.time() - entry[0] > ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def put(self, key: str, payload: Any) -> None:
+        """Stores a JSON-serializable payload in both tiers, pruning the disk tier when it is due."""
+        entry = (time.time(), json.dumps(payload, ensure_ascii=False))
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, created, payload) VALUES (?, ?, ?)", (key, *entry)
+                )
+                self._writes += 1
+                self._disk_rows += 1  # an upper bound, a replaced row is counted again
+                if self._disk_rows > self.max_entries or self._writes % PRUNE_EVERY == 0:
+                    self._prune(entry[0])
+                self._db.commit()
+
+    def _prune(self, now: float) -> None:
+        """Drops the expired rows of the disk tier and, past max_entries, the oldest ones. Counts the rows written by other processes too."""
+        if self.ttl is not None:
+            self._db.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+        self._disk_rows = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if self._disk_rows > self.max_entries:
+            keep = max(int(self.max_entries * PRUNE_TO), 1)
+            deleted = self._db.execute(
+                f"DELETE FROM {self.table} WHERE created < "
+                f"(SELECT created FROM {self.table} ORDER BY created DESC LIMIT 1 OFFSET ?)", (keep - 1,)
+            ).rowcount
+            self._disk_rows -= deleted
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops all cached completions from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+                self._disk_rows = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return stats
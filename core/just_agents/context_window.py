@@ -0,0 +1,170 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import litellm
+from pydantic import BaseModel, Field
+
+from just_agents.data_classes import Role
+from just_agents.types import MessageDict
+
+CHARS_PER_TOKEN = 4
+"""Estimate of the characters per token, for the messages the tokenizer of the model cannot count."""
+
+
+class ContextWindowOptions(BaseModel):
+    """
+    Token budget of the messages sent with each completion of an agent.
+    """
+    max_tokens: Optional[int] = Field(None, ge=1, description="Token budget of the prompt, the max_input_tokens of the model minus reserve_tokens if not set")
+    reserve_tokens: int = Field(1024, ge=0, description="Tokens left for the answer when the budget comes from the model info")
+    cache_size: int = Field(8192, ge=1, description="Number of per-message token counts kept")
+
+
+@lru_cache(maxsize=256)
+def model_input_tokens(model: Optional[str]) -> Optional[int]:
+    """Context size of the model from the litellm model info, None for the models it does not know."""
+    if not model:
+        return None
+    try:
+        return litellm.get_model_info(model).get("max_input_tokens")
+    except Exception:
+        return None
+
+
+def count_message_tokens(message: MessageDict, model: Optional[str]) -> int:
+    """Tokens of one message with the tokenizer of the model, estimated from its JSON length if it cannot be counted."""
+    try:
+        return litellm.token_counter(model=model or "", messages=[message])
+    except Exception:
+        return len(json.dumps(message, default=str)) // CHARS_PER_TOKEN + 1
+
+
+class TokenCounter:
+    """
+    Per-message token counts, computed once per message and model and kept in a bounded LRU.
+    Messages are recognised by identity, as memory messages are not changed once added; every entry holds
+    a reference to its message, so that the id cannot be reused by another message while the entry lives.
+    """
+
+    def __init__(self, max_entries: int = 8192):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._counts: OrderedDict[Tuple[Optional[str], int], Tuple[MessageDict, int]] = OrderedDict()
+
+    def count(self, message: MessageDict, model: Optional[str]) -> int:
+        key = (model, id(message))
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] is message:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        tokens = count_message_tokens(message, model)
+        with self._lock:
+            self.misses += 1
+            self._counts[key] = (message, tokens)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def count_all(self, messages: List[MessageDict], model: Optional[str]) -> List[int]:
+        """Token counts of the messages, looked up under one lock, only the new messages are tokenized."""
+        counts: List[Optional[int]] = []
+        with self._lock:
+            for message in messages:
+                key = (model, id(message))
+                entry = self._counts.get(key)
+                if entry is not None and entry[0] is message:
+                    self._counts.move_to_end(key)
+                    counts.append(entry[1])
+                else:
+                    counts.append(None)
+            self.hits += len(counts) - counts.count(None)
+        if None not in counts:
+            return counts
+        for index, message in enumerate(messages):
+            if counts[index] is None:
+                counts[index] = self.count(message, model)
+        return counts
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._counts)}
+
+
+_SYSTEM, _USER, _ASSISTANT, _TOOL = Role.system.value, Role.user.value, Role.assistant.value, Role.tool.value
+
+
+def _turns_from_end(messages: List[MessageDict], start: int) -> Iterator[Tuple[int, int]]:
+    """Yields the [start, end) spans of the messages after the prompt that are dropped as a whole, the latest first:
+    an assistant message with tool calls spans the tool results following it, any other message stands alone."""
+    end = len(messages)
+    while end > start:
+        first = end - 1
+        while first > start and messages[first].get("role") == _TOOL:
+            first -= 1
+        if first == end - 1 or not (messages[first].get("role") == _ASSISTANT and messages[first].get("tool_calls")):
+            first = end - 1
+        yield first, end
+        end = first
+
+
+class ContextWindow:
+    """
+    Fits the messages of a completion into the token budget by a sliding window: the system prompts on top
+    are always sent, then the most recent turns that fit. A tool call is never separated from its results
+    and the window opens on a user message when it has one. The latest turn is sent even if it alone is over budget.
+    """
+
+    def __init__(self, options: ContextWindowOptions):
+        self.options = options
+        self.counter = TokenCounter(options.cache_size)
+
+    def budget(self, model: Optional[str]) -> Optional[int]:
+        if self.options.max_tokens is not None:
+            return self.options.max_tokens
+        input_tokens = model_input_tokens(model)
+        if input_tokens is None:
+            return None
+        return max(1, input_tokens - self.options.reserve_tokens)
+
+    def fit(self, messages: List[MessageDict], model: Optional[str]) -> Tuple[List[MessageDict], Optional[int]]:
+        """
+        Returns the messages to send and the number of tokens they take, the same list if all of them fit.
+        Messages are not counted when there is no budget for the model.
+        """
+        budget = self.budget(model)
+        if budget is None:
+            return messages, None
+        counts = self.counter.count_all(messages, model)
+        total = sum(counts)
+        if total <= budget:
+            return messages, total
+
+        prompt_count = 0
+        while prompt_count < len(messages) and messages[prompt_count].get("role") == _SYSTEM:
+            prompt_count += 1
+        used = sum(counts[:prompt_count])
+        window = len(messages)
+        user_start: Optional[Tuple[int, int]] = None  # start of the earliest user message in the window and the tokens from it
+        for first, end in _turns_from_end(messages, prompt_count):
+            tokens = sum(counts[first:end])
+            if used + tokens > budget and window < len(messages):
+                break
+            used += tokens
+            window = first
+            if messages[first].get("role") == _USER:
+                user_start = (first, used)
+        if window == len(messages):
+            return messages, total
+
+        # a window opening on an assistant answer or a tool result is advanced to its first user message
+        if user_start is not None:
+            window, used = user_start
+        return messages[:prompt_count] + messages[window:], used
@@ -247,6 +247,16 @@ class JustMCPServerParameters(BaseModel):
         default=True, 
         description="If true, raise an error if any tool name in include/exclude is not found in the server listing"
         )
+    max_sessions: int = Field(
+        default=1,
+        ge=1,
+        description="Maximum number of sessions to the server, a subprocess each for STDIO servers. Sessions are opened as concurrent tool calls need them and calls go to the least busy one"
+        )
+    session_idle_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds after which an unused extra session is closed, the first session stays open"
+        )
 
     @classmethod
     def single_tool(cls, tool_name: str, mcp_client_config: Union[str, MCPServersConfig]) -> 'JustMCPServerParameters':
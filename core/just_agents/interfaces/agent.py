@@ -64,6 +64,31 @@ class IAgent(ABC, Generic[AbstractQueryInputType, AbstractQueryResponseType, Abs
                 return self.query_structural(query_input, **kwargs)
             else:
                 return self.query(query_input, **kwargs)
+
+    async def aquery(self, query_input: AbstractQueryInputType, **kwargs) -> Optional[AbstractQueryResponseType]:
+        raise NotImplementedError("You need to implement aquery() method first!")
+
+    def astream(self, query_input: AbstractQueryInputType, **kwargs) -> Optional[AsyncGenerator[AbstractStreamingChunkType, None]]:
+        raise NotImplementedError("You need to implement astream() method first!")
+
+    async def aquery_structural(
+        self, 
+        query_input: AbstractQueryInputType, 
+        parser: Type[BaseModel] = BaseModel,
+        response_format: Optional[str] = None,
+        **kwargs
+    ) -> Union[dict, BaseModel]:
+        raise NotImplementedError("You need to implement aquery_structural() method first!")
+
+    async def acompletion(self, query_input: AbstractQueryInputType, **kwargs) -> Optional[Union[AbstractQueryResponseType, AsyncGenerator[AbstractStreamingChunkType, None]]]:
+        stream = kwargs.get("stream", False)
+        if stream:
+            return self.astream(query_input, **kwargs)
+        else:
+            if kwargs.get("response_format", None) or kwargs.get("parser", None):
+                return await self.aquery_structural(query_input, **kwargs)
+            else:
+                return await self.aquery(query_input, **kwargs)
         
 VariArgs = ParamSpec('VariArgs')
 
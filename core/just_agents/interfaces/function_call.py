@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 from abc import ABC, abstractmethod
 from typing import  Callable, Sequence, Any, TypeVar, Generic
 
@@ -12,6 +14,21 @@ class IFunctionCall(ABC, Generic[AbstractMessage]):
     def execute_function(self, call_by_name: ToolByNameCallback) -> AbstractMessage:
         raise NotImplementedError("You need to implement execute_function() abstract method first!")
 
+    async def aexecute_function(self, call_by_name: ToolByNameCallback) -> AbstractMessage:
+        """
+        Runs execute_function in a worker thread, so that the event loop is not blocked.
+        Async tools are awaited on the calling loop. Override to await the tools natively.
+        """
+        loop = asyncio.get_running_loop()
+
+        def sync_call_by_name(name: str) -> Callable:
+            func = call_by_name(name)
+            if not inspect.iscoroutinefunction(func):
+                return func
+            return lambda *args, **kwargs: asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop).result()
+
+        return await asyncio.to_thread(self.execute_function, sync_call_by_name)
+
     @staticmethod
     @abstractmethod
     def reconstruct_tool_call_message(calls: Sequence['IFunctionCall']) -> AbstractMessage:
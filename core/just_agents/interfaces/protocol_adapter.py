@@ -16,6 +16,29 @@ ModelResponseCallback=Callable[...,BaseModelResponse]
 MessageUnpackCallback=Callable[[BaseModelResponse], AbstractMessage]
 ExecuteToolCallback=Callable[[Sequence[IFunctionCall]],List[AbstractMessage]]
 
+class IStreamAccumulator(ABC, Generic[BaseModelResponse, BaseModelStreamResponse, AbstractMessage]):
+    """
+    Assembles the message of a streamed completion chunk by chunk, as an alternative to
+    buffering all the chunks and combining them with response_from_deltas at the end of the stream.
+    """
+    chunks: int = 0
+    usage: Optional[Any] = None  # usage reported by the stream, if any
+
+    @abstractmethod
+    def add(self, chunk: BaseModelStreamResponse) -> AbstractMessage:
+        """Fold a chunk into the message, returns the text part (role and content) of its delta."""
+        raise NotImplementedError("You need to implement add first!")
+
+    @abstractmethod
+    def message(self) -> AbstractMessage:
+        """The message assembled from the chunks added so far."""
+        raise NotImplementedError("You need to implement message first!")
+
+    @abstractmethod
+    def response(self) -> BaseModelResponse:
+        """A complete response wrapping the assembled message."""
+        raise NotImplementedError("You need to implement response first!")
+
 class IProtocolAdapter(ABC, Generic[BaseModelResponse, BaseModelStreamResponse, AbstractMessage]):
     """
     Class that is required to wrap the model protocol
@@ -74,6 +97,11 @@ class IProtocolAdapter(ABC, Generic[BaseModelResponse, BaseModelStreamResponse,
         raise NotImplementedError("You need to implement response_from_deltas first!")
 
 
+    @abstractmethod
+    def stream_accumulator(self) -> IStreamAccumulator[BaseModelResponse, BaseModelStreamResponse, AbstractMessage]:
+        """Create an accumulator assembling the message of a stream as its chunks arrive."""
+        raise NotImplementedError("You need to implement stream_accumulator first!")
+
     @staticmethod
     @abstractmethod
     def create_response_from_content(content: str, model: str, **kwargs) -> Union[BaseModelResponse, AbstractMessage]:
@@ -86,6 +114,18 @@ class IProtocolAdapter(ABC, Generic[BaseModelResponse, BaseModelStreamResponse,
         """Create a chunk from content for streaming."""
         raise NotImplementedError("You need to implement create_chunk_from_content first!")
 
+    @staticmethod
+    @abstractmethod
+    def response_from_dict(data: Dict[str, Any]) -> BaseModelResponse:
+        """Rebuild a response from its JSON dump, e.g. when replaying a cached completion."""
+        raise NotImplementedError("You need to implement response_from_dict first!")
+
+    @staticmethod
+    @abstractmethod
+    def chunk_from_dict(data: Dict[str, Any]) -> BaseModelStreamResponse:
+        """Rebuild a streaming chunk from its JSON dump, e.g. when replaying a cached completion."""
+        raise NotImplementedError("You need to implement chunk_from_dict first!")
+
     @staticmethod
     @abstractmethod
     def get_supported_params( model_name: str) -> Optional[list]:
@@ -187,3 +187,39 @@ def run_async_function_synchronously(
     return result_container[0]
 
 
+
+
+async def run_async_function_on_loop(
+    async_func: Callable[..., Coroutine[Any, Any, T]],
+    *args: Any,
+    target_loop: Optional[asyncio.AbstractEventLoop] = None,
+    **kwargs: Any
+) -> T:
+    """
+    Awaits an async function from the current event loop, optionally executing it on another loop.
+
+    Native async counterpart of `run_async_function_synchronously`: the calling loop is never blocked.
+    If `target_loop` is provided and differs from the running loop (e.g. the dedicated MCP client loop),
+    the coroutine is scheduled there and its result is awaited via a wrapped future.
+
+    Parameters
+    ----------
+    async_func : Callable[..., Coroutine[Any, Any, T]]
+        The asynchronous function (async def) to be executed.
+    *args : Any
+        Positional arguments passed to the `async_func`.
+    target_loop : Optional[asyncio.AbstractEventLoop]
+        Loop that must own the coroutine execution. None means the current running loop.
+    **kwargs : Any
+        Keyword arguments passed to the `async_func`.
+
+    Returns
+    -------
+    T
+        The result returned by the `async_func`.
+    """
+    coro = async_func(*args, **kwargs)
+    if target_loop is None or target_loop is asyncio.get_running_loop():
+        return await coro
+    cfut = asyncio.run_coroutine_threadsafe(coro, target_loop)
+    return await asyncio.wrap_future(cfut)
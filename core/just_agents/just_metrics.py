@@ -0,0 +1,276 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from just_agents.just_bus import SingletonMeta
+from just_agents.key_pool import error_status_code
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+"""Buckets of the durations, in seconds."""
+
+RATE_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 200.0, 400.0, 800.0)
+"""Buckets of the generation speed, in tokens per second."""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Content type of the Prometheus text exposition format."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Metric family with values sharded per thread: every thread writes only to its own shard, without a lock,
+    and the shards are summed when the metric is collected. Shards of finished threads are folded into one.
+    """
+    kind: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[LabelValues, Any]]] = []
+        self._retired: Dict[LabelValues, Any] = {}
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _merge(self, target: Dict[LabelValues, Any], values: Dict[LabelValues, Any]) -> None:
+        raise NotImplementedError
+
+    def collect(self) -> Dict[LabelValues, Any]:
+        """Values summed over the shards, by label values."""
+        with self._lock:
+            alive = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    self._merge(self._retired, values)
+            self._shards = alive
+            total: Dict[LabelValues, Any] = {}
+            self._merge(total, self._retired)
+            for _, values in alive:
+                self._merge(total, dict(values))  # copied at once, the owner thread keeps writing
+        return total
+
+    def reset(self) -> None:
+        with self._lock:
+            for _, values in self._shards:
+                values.clear()
+            self._retired.clear()
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: LabelValues, amount: float = 1.0) -> None:
+        values = self._shard()
+        values[labels] = values.get(labels, 0.0) + amount
+
+    def _merge(self, target: Dict[LabelValues, float], values: Dict[LabelValues, float]) -> None:
+        for labels, value in values.items():
+            target[labels] = target.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {value!r}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        values = self._shard()
+        entry = values.get(labels)
+        if entry is None:
+            entry = values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def _merge(self, target: Dict[LabelValues, list], values: Dict[LabelValues, list]) -> None:
+        for labels, (counts, total, count) in values.items():
+            entry = target.get(labels)
+            if entry is None:
+                target[labels] = [list(counts), total, count]
+                continue
+            entry[0] = [mine + theirs for mine, theirs in zip(entry[0], counts)]
+            entry[1] += total
+            entry[2] += count
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metric families rendered together in the Prometheus text format.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric '{metric.name}' is already registered with another type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))  # type: ignore
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))  # type: ignore
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+class JustMetrics(MetricsRegistry, metaclass=SingletonMeta):
+    """
+    Process-wide metrics of the agents: completions, their latency, time to first token and generation speed,
+    tokens, provider errors, time spent waiting for an API key and tool durations. Labeled by the agent shortname,
+    the model, the index of the key in the key pool and the tool name.
+
+    Disabled by default, every recording call site checks the enabled flag first, so a disabled registry costs nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        super().__init__(enabled)
+        self.completions = self.counter(
+            "just_agents_completions_total", "Completions by outcome, the HTTP status of the provider errors", ("agent", "model", "key", "status"))
+        self.completion_seconds = self.histogram(
+            "just_agents_completion_seconds", "Duration of the completions up to the last token", ("agent", "model"))
+        self.ttft_seconds = self.histogram(
+            "just_agents_time_to_first_token_seconds", "Time to the first chunk of a stream or to the whole response", ("agent", "model"))
+        self.tokens_per_second = self.histogram(
+            "just_agents_tokens_per_second", "Generation speed of the completions after the first token", ("agent", "model"), RATE_BUCKETS)
+        self.tokens = self.counter(
+            "just_agents_tokens_total", "Tokens of the completions by type: prompt, completion or cached", ("agent", "model", "type"))
+        self.queue_seconds = self.histogram(
+            "just_agents_key_wait_seconds", "Time waiting for an API key of the key pool to come off cooldown or budget", ("agent", "key"))
+        self.tool_seconds = self.histogram(
+            "just_agents_tool_seconds", "Duration of the tool calls", ("agent", "tool"))
+
+    def record_completion(
+            self,
+            agent: str,
+            model: str,
+            key: str,
+            started: float,
+            first_token: float,
+            finished: float,
+            usage: Any = None,
+            chunks: int = 0,
+    ) -> None:
+        """Records a completed request, the tokens are estimated from the chunks of a stream reporting no usage."""
+        self.completions.inc((agent, model, key, "ok"))
+        self.completion_seconds.observe((agent, model), finished - started)
+        self.ttft_seconds.observe((agent, model), first_token - started)
+        completion_tokens = _usage_tokens(usage, "completion_tokens") or chunks
+        if usage is not None:
+            self.tokens.inc((agent, model, "prompt"), _usage_tokens(usage, "prompt_tokens"))
+            details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+            if details is not None:
+                self.tokens.inc((agent, model, "cached"), _usage_tokens(details, "cached_tokens"))
+        self.tokens.inc((agent, model, "completion"), completion_tokens)
+        generation = finished - first_token if finished > first_token else finished - started
+        if completion_tokens and generation > 0:
+            self.tokens_per_second.observe((agent, model), completion_tokens / generation)
+
+    def record_error(self, agent: str, model: str, key: str, error: BaseException) -> None:
+        status = error_status_code(error)
+        self.completions.inc((agent, model, key, str(status) if status is not None else type(error).__name__))
+
+    def meter_stream(self, chunks: Iterator[Any], agent: str, model: str, key: str, started: float) -> Iterator[Any]:
+        """
+        Passes the chunks through, recording the completion once the stream is exhausted
+        or the error raised by the provider midway. A stream closed early by the consumer is not recorded.
+        """
+        first_token, count, usage = None, 0, None
+        try:
+            for chunk in chunks:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                count += 1
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            self.record_error(agent, model, key, e)
+            raise
+        finished = time.perf_counter()
+        self.record_completion(agent, model, key, started, first_token or finished, finished, usage, count)
+
+    async def ameter_stream(self, chunks: AsyncIterator[Any], agent: str, model: str, key: str, started: float) -> AsyncIterator[Any]:
+        """Async counterpart of meter_stream."""
+        first_token, count, usage = None, 0, None
+        try:
+            async for chunk in chunks:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                count += 1
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            self.record_error(agent, model, key, e)
+            raise
+        finished = time.perf_counter()
+        self.record_completion(agent, model, key, started, first_token or finished, finished, usage, count)
+
+
+def _usage_tokens(usage: Any, name: str) -> int:
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value if isinstance(value, int) else 0
@@ -6,7 +6,7 @@ from just_agents.just_serialization import JustSerializable
 from just_agents.data_classes import ModelPromptExample, JustMCPServerParameters
 from just_agents.just_tool import (
     JustTool, JustTools, JustToolsRaw, 
-    JustPromptTool, JustPromptTools, JustPromptToolsRaw,
+    JustPromptTool, JustPromptTools, JustPromptToolsRaw, JustPromptToolCache,
     JustToolBase, JustToolFactory, SubscriberCallback
 )
 
@@ -65,13 +65,19 @@ class JustAgentProfileToolsetMixin(BaseModel):
             existing_tools = list(self.tools.values())
             self.tools = JustTools.from_tools(existing_tools + list(mcp_tools.values()))
 
-    def add_prompt_tool(self, fun: callable, call_arguments: Dict[str, Any]) -> None:
+    def add_prompt_tool(
+            self,
+            fun: callable,
+            call_arguments: Dict[str, Any],
+            cache: Optional[Union[JustPromptToolCache, Dict[str, Any]]] = None
+    ) -> None:
         """
         Adds a tool to the agent's prompt_tools collection with input parameters.
 
         Args:
             fun (callable): The function to add as a prompt tool
             call_arguments (Dict[str, Any]): Arguments to call the function with
+            cache (Optional[Union[JustPromptToolCache, Dict[str, Any]]]): Caching options of the result, e.g. {"ttl": 300}
         """
         # Ensure input parameters are JSON serializable
         try:
@@ -80,17 +86,17 @@ class JustAgentProfileToolsetMixin(BaseModel):
         except (TypeError, OverflowError):
             raise ValueError("Input parameters must be JSON serializable")
 
-        prompt_tool_tuple = (fun, call_arguments)
+        prompt_tool = JustToolFactory.create_prompt_tool((fun, call_arguments))
+        if cache is not None:
+            prompt_tool.cache = JustPromptToolCache.model_validate(cache)
 
         if self.prompt_tools is None:
-            self.prompt_tools = JustPromptTools.from_prompt_tools([prompt_tool_tuple])
+            self.prompt_tools = JustPromptTools.from_prompt_tools([prompt_tool])
         else:
-            # Add to the existing prompt tools and rebuild
+            # Add to the existing prompt tools and rebuild, keeping their options and cached results
             existing_prompt_tools = list(self.prompt_tools.values())
-            self.prompt_tools = JustPromptTools.from_prompt_tools([prompt_tool_tuple] + [
-                (tool.get_callable(wrap=False), tool.call_arguments) 
-                for tool in existing_prompt_tools
-            ])
+            self.prompt_tools = JustPromptTools.from_prompt_tools([prompt_tool] + existing_prompt_tools)
+
     def list_tools(self) -> Dict[str, Type]:
         """
         Returns a dictionary mapping tool names to their classes.
@@ -204,6 +210,17 @@ class JustAgentProfileToolsetMixin(BaseModel):
             for tool in self.tools.values():
                 tool.subscribe_to_error(callback)
 
+    def subscribe_to_tool_cache_hit(self, callback: SubscriberCallback) -> None:
+        """
+        Subscribe to tool cache hit events.
+
+        Args:
+            callback (SubscriberCallback): The callback function to be called when a memoized tool result is served
+        """
+        if self.tools:
+            for tool in self.tools.values():
+                tool.subscribe_to_cache_hit(callback)
+
     def subscribe_to_prompt_tool_call(self, callback: SubscriberCallback) -> None:
         """
         Subscribe to prompt tool call events.
@@ -1,5 +1,7 @@
 from typing import Type, TypeVar, Any, Dict, Optional, Union, get_origin, get_args, List, Literal, Callable, Tuple
-from pydantic import BaseModel, Field, create_model, ConfigDict
+from pydantic import BaseModel, Field, create_model, ConfigDict, ValidationError
+from pydantic_core import from_json
+from functools import cached_property, lru_cache
 import re
 import ast
 import json
@@ -10,6 +12,113 @@ from enum import Enum
 T = TypeVar('T', bound=BaseModel)
 ConfigDictExtra = Literal["ignore", "allow", "forbid"]
 
+CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+class CompiledParser:
+    """
+    Artifacts of a structured output parser built once per parser class: the cleaned response schema,
+    the all-required model sent as the response format and a validator reading the JSON text directly.
+    """
+
+    def __init__(self, parser: Type[Union[BaseModel, dict]]):
+        self.parser = parser
+        self.is_dict = parser is dict
+
+    @cached_property
+    def response_schema(self) -> dict:
+        return ModelHelper.get_response_schema(self.parser)
+
+    @cached_property
+    def required_model(self) -> Type[BaseModel]:
+        return ModelHelper.make_all_fields_required(self.parser)
+
+    @cached_property
+    def partial_model(self) -> Type[BaseModel]:
+        """The parser model with every top-level field optional, validates the fields received so far."""
+        fields = {
+            name: (Optional[info.annotation], Field(None, alias=info.alias, validation_alias=info.validation_alias))
+            for name, info in self.parser.model_fields.items()
+        }
+        return create_model(f"Partial{self.parser.__name__}", __config__=self.parser.model_config, **fields)
+
+    def validate_partial(self, response_dict: dict) -> Union[dict, BaseModel]:
+        """
+        Validates the completed fields of a response, the other fields are left unset.
+        The result is an instance of the parser built without its model validators, model_fields_set tells the fields received.
+        """
+        if self.is_dict:
+            return response_dict
+        partial = self.partial_model.model_validate(response_dict)
+        return self.parser.model_construct(**{name: getattr(partial, name) for name in partial.model_fields_set})
+
+    def validate(self, response_dict: Any) -> Union[dict, BaseModel]:
+        return response_dict if self.is_dict else self.parser.model_validate(response_dict)
+
+    def validate_json(self, raw: Union[str, bytes]) -> Union[dict, BaseModel]:
+        """
+        Parses and validates the JSON text in one pass, without an intermediate dict for the models.
+        Raises ValueError when the text is not JSON and ValidationError when it does not match the model.
+        """
+        if self.is_dict:
+            return from_json(raw)
+        try:
+            return self.parser.model_validate_json(raw)
+        except ValidationError as e:
+            if all(error["type"] == "json_invalid" for error in e.errors()):
+                raise ValueError(str(e)) from e
+            raise
+
+
+@lru_cache(maxsize=256)
+def compile_parser(parser: Type[Union[BaseModel, dict]]) -> CompiledParser:
+    return CompiledParser(parser)
+
+
+class PartialOutputParser:
+    """
+    Incremental parser of a JSON object streamed in content deltas. A top-level field is complete
+    once the value of the next one has started, the last field once the whole response has arrived.
+    The buffer is parsed again only on the deltas which may start a value: after a colon or holding a quote.
+    """
+
+    def __init__(self, parser: Type[Union[BaseModel, dict]] = BaseModel):
+        self.compiled = compile_parser(parser)
+        self._deltas: List[str] = []
+        self._completed = 0
+        self._after_colon = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._deltas)
+
+    def feed(self, delta: str) -> Optional[Union[dict, BaseModel]]:
+        """Adds a content delta, returns a partial result when more fields are complete than before."""
+        self._deltas.append(delta)
+        after_colon, self._after_colon = self._after_colon, ":" in delta or (self._after_colon and not delta.strip())
+        if not after_colon and '"' not in delta:
+            return None
+        text = self.text
+        start = text.find("{")
+        if start < 0:
+            return None
+        try:
+            response_dict = from_json(text[start:], allow_partial="trailing-strings")
+        except ValueError:
+            return None
+        if not isinstance(response_dict, dict) or len(response_dict) - 1 <= self._completed:
+            return None
+        self._completed = len(response_dict) - 1
+        completed = dict(list(response_dict.items())[:self._completed])
+        try:
+            return self.compiled.validate_partial(completed)
+        except ValidationError:
+            return None  # reported by the validation of the whole response
+
+    def result(self) -> Union[dict, BaseModel]:
+        """The whole response validated against the parser."""
+        return ModelHelper.get_structured_output(self.text, self.compiled.parser)
+
 class ModelHelper:
     """
     Utility class with static methods for working with Pydantic models.
@@ -260,8 +369,7 @@ class ModelHelper:
             Cleaned string with Markdown code fences removed if present
         """
         raw = raw.strip()
-        pattern = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
-        match = pattern.match(raw)
+        match = CODE_FENCE_PATTERN.match(raw)
         if match:
             return match.group(1)
         return raw
@@ -275,7 +383,7 @@ class ModelHelper:
         Parse the response according to the provided parser.
         Attempts multiple parsing strategies in the following order:
         1. Direct dict usage if already a dict
-        2. Standard json parsing
+        2. Validation straight from the JSON text with the compiled parser
         3. Clean markdown code fences if present and retry parsing
         4. AST literal eval as final fallback
         
@@ -289,21 +397,25 @@ class ModelHelper:
         Raises:
             ValueError: If parsing fails with all available methods
         """
+        compiled = compile_parser(parser)
         # If already a dict, no parsing needed
         if isinstance(raw_response, dict):
-            return raw_response if parser == dict else parser.model_validate(raw_response)
+            return compiled.validate(raw_response)
 
-        if not isinstance(raw_response, str):
+        if not isinstance(raw_response, (str, bytes)):
             raw_response = str(raw_response)
 
         parsing_errors = []
         
-        # Try standard json first on the raw response
+        # Fast path: parse and validate the raw response at once
         try:
-            response_dict = json.loads(raw_response)
-            return response_dict if parser == dict else parser.model_validate(response_dict)
-        except json.JSONDecodeError as e:
+            return compiled.validate_json(raw_response)
+        except ValueError as e:
+            if isinstance(e, ValidationError):
+                raise
             parsing_errors.append(f"Standard JSON parsing failed: {str(e)}")
+            if isinstance(raw_response, bytes):
+                raw_response = raw_response.decode("utf-8", errors="replace")
             
             # Only clean markdown code blocks if initial parsing failed
             cleaned_response = ModelHelper.clean_fallback_result(raw_response)
@@ -315,7 +427,7 @@ class ModelHelper:
             # Try parsing the cleaned response
             try:
                 response_dict = json.loads(cleaned_response)
-                return response_dict if parser == dict else parser.model_validate(response_dict)
+                return compiled.validate(response_dict)
             except json.JSONDecodeError as e:
                 parsing_errors.append(f"Cleaned JSON parsing failed: {str(e)}")
 
@@ -323,7 +435,7 @@ class ModelHelper:
             try:
                 response_dict = ast.literal_eval(cleaned_response)
                 if isinstance(response_dict, dict):
-                    return response_dict if parser == dict else parser.model_validate(response_dict)
+                    return compiled.validate(response_dict)
                 parsing_errors.append("AST parsing succeeded but result was not a dict")
             except (ValueError, SyntaxError) as e:
                 parsing_errors.append(f"AST literal_eval parsing failed: {str(e)}")
@@ -1,18 +1,30 @@
+import asyncio
+import contextvars
+import hashlib
 import inspect
 import sys
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
+import json
 from json import JSONDecodeError
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, List, Dict, Any, Sequence, Union, TypeVar, Type, Tuple, Literal, get_origin
+from typing import Callable, Optional, List, Dict, Any, Sequence, Union, TypeVar, Type, Tuple, Literal, Iterator, get_origin
 from pydantic import ConfigDict, BaseModel, Field, PrivateAttr, ValidationError, model_serializer
 from importlib import import_module
 
 from just_agents.data_classes import ToolDefinition, GoogleBuiltInTools
-from just_agents.just_async import run_async_function_synchronously
+from just_agents.completion_cache import CompletionCache, CompletionCacheOptions, _canonical_default
+from just_agents.just_async import run_async_function_synchronously, run_async_function_on_loop
 from just_agents.just_schema import ModelHelper
 from just_agents.just_bus import JustToolsBus, SubscriberCallback
+from just_agents.tool_executors import ToolExecutors, ToolExecutorMode
 
+from mcp.types import TextContent
 from just_agents.mcp_client import MCPClient, JustMCPServerParameters
 
 
@@ -39,6 +51,102 @@ _GOOGLE_BUILTIN_STUBS_DESCRIPTIONS = {
 GOOGLE_BUILTIN_SEARCH = {"name": GoogleBuiltInTools.search} 
 GOOGLE_BUILTIN_CODE = {"name": GoogleBuiltInTools.code} 
 
+_tool_calls_scope: ContextVar[Optional[Dict[int, int]]] = ContextVar("just_tool_calls_scope", default=None)
+
+@contextmanager
+def tool_calls_scope(calls_made: Dict[int, int]) -> Iterator[Dict[int, int]]:
+    """
+    Counts the calls of all tools made in the current context in calls_made, keyed by id of the tool instance,
+    instead of the per-instance counters. Allows the same tools to be shared by concurrent queries.
+    
+    Args:
+        calls_made: Per-query dictionary of call counters, owned by the caller
+    """
+    token = _tool_calls_scope.set(calls_made)
+    try:
+        yield calls_made
+    finally:
+        _tool_calls_scope.reset(token)
+
+def _reserve_call(tool_instance: 'JustToolBase', max_calls: int, tool_name: str) -> None:
+    """
+    Atomically counts a call against max_calls, raising and publishing an error if the limit is reached.
+    """
+    with tool_instance._calls_lock:
+        if tool_instance.calls_made >= max_calls:
+            error = RuntimeError(f"Maximum number of calls ({max_calls}) reached for {tool_name}")
+        else:
+            tool_instance._add_calls_made(1)
+            return
+    JustToolsBus().publish(f"{tool_name}.{id(tool_instance)}.error", error=error)
+    raise error
+
+def _release_call(tool_instance: 'JustToolBase') -> None:
+    """
+    Returns a call slot reserved by _reserve_call, used when the call has failed.
+    """
+    with tool_instance._calls_lock:
+        tool_instance._add_calls_made(-1)
+
+class JustToolCache(BaseModel):
+    """
+    Memoization options of the results of a tool, keyed by its validated arguments.
+    """
+    ttl: Optional[float] = Field(None, ge=0, description="Seconds a cached result is served for, forever if not set.")
+    max_entries: int = Field(1024, ge=1, description="Number of results kept in memory and, with the disk backend, in the SQLite file.")
+    key_fields: Optional[List[str]] = Field(None, description="Arguments the results are keyed by, all of them if not set.")
+    backend: Literal["memory", "disk"] = Field("memory", description="Keep the results in memory only, per tool, or also in a SQLite file shared by the tools.")
+    path: str = Field("tool_cache.sqlite", description="SQLite file of the disk backend.")
+
+
+def _cache_lookup(tool_instance: 'JustToolBase', tool_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Optional[str], bool, Any]:
+    """
+    Returns (key, hit, result) of a call, publishing the cache_hit event on a hit.
+    The key is None if the call is not cached: positional arguments or arguments failing validation.
+    """
+    if args:
+        return None, False, None
+    key = tool_instance.cache_key(kwargs)
+    if key is None:
+        return None, False, None
+    entry = tool_instance._result_cache.get(key, tool_instance.cache.ttl)
+    if entry is None:
+        return key, False, None
+    JustToolsBus().publish(f"{tool_name}.{id(tool_instance)}.cache_hit", result_interceptor=entry["result"], kwargs=kwargs)
+    return key, True, entry["result"]
+
+
+def _cache_store(tool_instance: 'JustToolBase', key: Optional[str], result: Any) -> None:
+    if key is None:
+        return
+    try:
+        tool_instance._result_cache.put(key, {"result": result})
+    except (TypeError, ValueError):
+        pass # results that are not JSON-serializable are not cached
+
+
+def cache_decorator(tool_instance: 'JustToolBase', tool_name: str):
+    """
+    Decorator to memoize the results of a function by its validated keyword arguments.
+    A hit publishes a cache_hit event instead of the execute and result events and does not count as a call.
+    
+    Args:
+        tool_instance: The tool instance with the cache options and the result cache
+        tool_name: Name of the tool for event publishing
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key, hit, result = _cache_lookup(tool_instance, tool_name, args, kwargs)
+            if hit:
+                return result
+            result = func(*args, **kwargs)
+            _cache_store(tool_instance, key, result)
+            return result
+        return wrapper
+    return decorator
+
+
 def max_calls_decorator(tool_instance: 'JustToolBase', max_calls: int, tool_name: str):
     """
     Decorator to limit the number of calls to a function.
@@ -51,22 +159,42 @@ def max_calls_decorator(tool_instance: 'JustToolBase', max_calls: int, tool_name
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Check if max calls reached before calling
-            if tool_instance._calls_made >= max_calls:
-                error = RuntimeError(f"Maximum number of calls ({max_calls}) reached for {tool_name}")
-                JustToolsBus().publish(f"{tool_name}.{id(tool_instance)}.error", error=error)
-                raise error
-            
-            # Call the function
-            result = func(*args, **kwargs)
-            
-            # Increment counter after successful call
-            tool_instance._calls_made += 1
-            return result
+            # Reserve a call slot before calling, so that concurrent calls can't exceed the limit
+            _reserve_call(tool_instance, max_calls, tool_name)
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                _release_call(tool_instance) # Only successful calls are counted
+                raise
         return wrapper
     return decorator
 
 
+def _call_tool(tool_instance: 'JustToolBase', func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    """
+    Calls the function with the executor and timeout of the tool. Async tools run on their preferred loop
+    (the dedicated MCP loop, if any) and are cancelled on timeout, the executor applies to synchronous tools.
+    """
+    if tool_instance.is_async:
+        preferred_loop = getattr(tool_instance, "_preferred_event_loop", None)
+        return run_async_function_synchronously(
+            ToolExecutors.with_timeout(func, tool_instance.timeout_s, tool_instance.name), *args, **kwargs,
+            target_loop=preferred_loop
+        )
+    return ToolExecutors().run(tool_instance.executor, tool_instance.timeout_s, tool_instance.name, func, *args, **kwargs)
+
+
+async def _acall_tool(tool_instance: 'JustToolBase', func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    """Async counterpart of _call_tool, synchronous tools never block the calling event loop."""
+    if tool_instance.is_async:
+        preferred_loop = getattr(tool_instance, "_preferred_event_loop", None)
+        return await run_async_function_on_loop(
+            ToolExecutors.with_timeout(func, tool_instance.timeout_s, tool_instance.name), *args, **kwargs,
+            target_loop=preferred_loop
+        )
+    return await ToolExecutors().arun(tool_instance.executor, tool_instance.timeout_s, tool_instance.name, func, *args, **kwargs)
+
+
 def event_bus_decorator(tool_instance: 'JustToolBase', tool_name: str):
     """
     Decorator to add event bus publishing and async/sync execution handling to a function.
@@ -84,15 +212,7 @@ def event_bus_decorator(tool_instance: 'JustToolBase', tool_name: str):
             bus = JustToolsBus()
             bus.publish(f"{tool_name}.{id(tool_instance)}.execute", *args, kwargs=kwargs)
             try:
-                if tool_instance.is_async:
-                    # If this is an MCP tool, try to run on the dedicated MCP loop
-                    preferred_loop = getattr(tool_instance, "_preferred_event_loop", None)
-                    result = run_async_function_synchronously(
-                        func, *args, **kwargs,
-                        target_loop=preferred_loop
-                    )
-                else:
-                    result = func(*args, **kwargs)
+                result = _call_tool(tool_instance, func, args, kwargs)
                 bus.publish(f"{tool_name}.{id(tool_instance)}.result", result_interceptor=result, kwargs=kwargs)
                 return result
             except Exception as e:
@@ -102,6 +222,32 @@ def event_bus_decorator(tool_instance: 'JustToolBase', tool_name: str):
     return decorator
 
 
+def _parse_dict_kwargs(raw_func_sig: inspect.Signature, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parses string values of dict-annotated parameters into dictionaries, other values are passed as is.
+
+    Args:
+        raw_func_sig: Signature of the raw callable
+        kwargs: Keyword arguments as received from the LLM
+    """
+    processed_kwargs = {}
+    for key, value in kwargs.items():
+        param = raw_func_sig.parameters.get(key)
+        if param and param.annotation != inspect.Parameter.empty:
+            param_type_origin = get_origin(param.annotation)
+            if (param_type_origin is dict or param_type_origin is Dict) and isinstance(value, str):
+                try:
+                    parsed_value = ModelHelper.get_structured_output(value, parser=dict)
+                    processed_kwargs[key] = parsed_value
+                except ValueError:
+                    processed_kwargs[key] = value 
+            else:
+                processed_kwargs[key] = value
+        else:
+            processed_kwargs[key] = value
+    return processed_kwargs
+
+
 def parsing_wrapper_decorator(tool_instance: 'JustToolBase', tool_name: str):
     """
     Decorator that parses string-to-dict for relevant parameters and adds event publishing.
@@ -119,31 +265,10 @@ def parsing_wrapper_decorator(tool_instance: 'JustToolBase', tool_name: str):
             bus.publish(f"{tool_name}.{id(tool_instance)}.execute", *args, kwargs=kwargs)
             
             # Process kwargs for dict parsing
-            processed_kwargs = {}
-            for key, value in kwargs.items():
-                param = raw_func_sig.parameters.get(key)
-                if param and param.annotation != inspect.Parameter.empty:
-                    param_type_origin = get_origin(param.annotation)
-                    if (param_type_origin is dict or param_type_origin is Dict) and isinstance(value, str):
-                        try:
-                            parsed_value = ModelHelper.get_structured_output(value, parser=dict)
-                            processed_kwargs[key] = parsed_value
-                        except ValueError:
-                            processed_kwargs[key] = value 
-                    else:
-                        processed_kwargs[key] = value
-                else:
-                    processed_kwargs[key] = value
+            processed_kwargs = _parse_dict_kwargs(raw_func_sig, kwargs)
 
             try:
-                if tool_instance.is_async:
-                    preferred_loop = getattr(tool_instance, "_preferred_event_loop", None)
-                    result = run_async_function_synchronously(
-                        func, *args, **processed_kwargs,
-                        target_loop=preferred_loop
-                    )
-                else:
-                    result = func(*args, **processed_kwargs)
+                result = _call_tool(tool_instance, func, args, processed_kwargs)
                 bus.publish(f"{tool_name}.{id(tool_instance)}.result", result_interceptor=result, kwargs=processed_kwargs)
                 return result
             except Exception as e:
@@ -162,6 +287,7 @@ def tool_decorator_composer(tool_instance: 'JustToolBase', tool_name: str):
     - Event bus publishing and execution handling
     - Parameter parsing (if needed)
     - Call count limiting (if configured)
+    - Result memoization (if configured)
     
     Can be used with @ notation:
     @tool_decorator_composer(my_tool_instance, "my_tool")
@@ -186,6 +312,118 @@ def tool_decorator_composer(tool_instance: 'JustToolBase', tool_name: str):
         if tool_instance.max_calls_per_query is not None:
             wrapped_function = max_calls_decorator(tool_instance, tool_instance.max_calls_per_query, tool_name)(wrapped_function)
         
+        # Optionally apply the cache decorator, outermost so that hits are not counted as calls
+        if tool_instance._result_cache is not None:
+            wrapped_function = cache_decorator(tool_instance, tool_name)(wrapped_function)
+        
+        return wrapped_function
+    return decorator
+
+
+def async_max_calls_decorator(tool_instance: 'JustToolBase', max_calls: int, tool_name: str):
+    """
+    Async counterpart of max_calls_decorator, shares the call counter with the synchronous callable.
+    
+    Args:
+        tool_instance: The tool instance to track calls for
+        max_calls: Maximum number of calls allowed
+        tool_name: Name of the tool for error messages
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            _reserve_call(tool_instance, max_calls, tool_name)
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                _release_call(tool_instance)
+                raise
+        return wrapper
+    return decorator
+
+
+def async_cache_decorator(tool_instance: 'JustToolBase', tool_name: str):
+    """
+    Async counterpart of cache_decorator, shares the result cache with the synchronous callable.
+    The disk backend is read and written in a worker thread, off the event loop.
+    
+    Args:
+        tool_instance: The tool instance with the cache options and the result cache
+        tool_name: Name of the tool for event publishing
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            offload = tool_instance.cache.backend == "disk"
+            lookup = (tool_instance, tool_name, args, kwargs)
+            key, hit, result = await asyncio.to_thread(_cache_lookup, *lookup) if offload else _cache_lookup(*lookup)
+            if hit:
+                return result
+            result = await func(*args, **kwargs)
+            if offload:
+                await asyncio.to_thread(_cache_store, tool_instance, key, result)
+            else:
+                _cache_store(tool_instance, key, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def async_event_bus_decorator(tool_instance: 'JustToolBase', tool_name: str, parse_dict_params: bool = False):
+    """
+    Async counterpart of event_bus_decorator and parsing_wrapper_decorator.
+    
+    Publishes the same execute, result, and error events to the JustToolsBus. Coroutine functions
+    are awaited natively (on the preferred loop of the tool, if any), synchronous functions are
+    executed in a worker thread or in the pool of the tool executor so that the calling event loop is never blocked.
+    
+    Args:
+        tool_instance: The tool instance for accessing is_async and event publishing
+        tool_name: Name of the tool for event publishing
+        parse_dict_params: Whether to parse string values of dict-annotated parameters
+    """
+    def decorator(func: Callable) -> Callable:
+        raw_func_sig = inspect.signature(tool_instance._raw_callable) if parse_dict_params else None
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bus = JustToolsBus()
+            bus.publish(f"{tool_name}.{id(tool_instance)}.execute", *args, kwargs=kwargs)
+            if raw_func_sig is not None:
+                kwargs = _parse_dict_kwargs(raw_func_sig, kwargs)
+            try:
+                result = await _acall_tool(tool_instance, func, args, kwargs)
+                bus.publish(f"{tool_name}.{id(tool_instance)}.result", result_interceptor=result, kwargs=kwargs)
+                return result
+            except Exception as e:
+                bus.publish(f"{tool_name}.{id(tool_instance)}.error", error=e)
+                raise e
+        return wrapper
+    return decorator
+
+
+def async_tool_decorator_composer(tool_instance: 'JustToolBase', tool_name: str):
+    """
+    Async counterpart of tool_decorator_composer, produces a coroutine function 
+    with the same event publishing, parameter parsing, call count limiting and result memoization.
+    
+    Args:
+        tool_instance: The tool instance with configuration
+        tool_name: Name of the tool for event publishing
+    """
+    def decorator(func: Callable) -> Callable:
+        parse_dict_params = bool(
+            tool_instance._pydantic_model and ModelHelper.model_has_dict_params(tool_instance._pydantic_model)
+        )
+        wrapped_function = async_event_bus_decorator(tool_instance, tool_name, parse_dict_params)(func)
+        
+        # Optionally apply the max_calls decorator
+        if tool_instance.max_calls_per_query is not None:
+            wrapped_function = async_max_calls_decorator(tool_instance, tool_instance.max_calls_per_query, tool_name)(wrapped_function)
+        
+        if tool_instance._result_cache is not None:
+            wrapped_function = async_cache_decorator(tool_instance, tool_name)(wrapped_function)
+        
         return wrapped_function
     return decorator
 
@@ -204,14 +442,23 @@ class JustToolBase(ToolDefinition, ABC):
     max_calls_per_query: Optional[int] = Field(None, ge=1, description="The maximum number of calls to the function per query.")
     is_async: bool = Field(False, exclude=True, description="True if the tool is an async (non-generator) function.")
     is_transient: bool = Field(False, description="True if the tool should not be serialized (e.g. is bound to an instance).")
+    cache: Optional[JustToolCache] = Field(None, description="Memoization of the results by the arguments, the tool is called every time if not set.")
+    executor: ToolExecutorMode = Field("inline", description="Where a synchronous tool runs: in the calling thread, the shared thread pool or the shared process pool for CPU-bound tools. Process-mode calls with a timeout run in a process of their own.")
+    timeout_s: Optional[float] = Field(None, gt=0, description="Seconds a call may take before an error is returned to the LLM, no limit if not set. Inline synchronous tools with a timeout run in the thread pool. Only the process executor stops a timed-out call: in a thread the call keeps running and holds its worker until it returns.")
 
     _callable: Optional[Callable] = PrivateAttr(default=None)
     """The callable function wrapped with the JustToolsBus callbacks."""
+    _async_callable: Optional[Callable] = PrivateAttr(default=None)
+    """The coroutine function wrapped with the JustToolsBus callbacks, awaits the tool natively."""
     _raw_callable: Optional[Callable] = PrivateAttr(default=None)
     """The original callable function."""
     _calls_made: int = PrivateAttr(default=0)
-    """Counter for tracking how many times this tool has been called."""
+    """Counter for tracking how many times this tool has been called outside of a tool_calls_scope."""
+    _calls_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    """Guards the call counters when the tool is called concurrently."""
     _pydantic_model: Optional[Type[BaseModel]] = PrivateAttr(default=None)
+    _result_cache: Optional[CompletionCache] = PrivateAttr(default=None)
+    """Results memoized by the cache options, per tool in memory or shared by the tools with the same disk file."""
     """The dynamically generated Pydantic model for the tool's parameters."""
 
     @property
@@ -224,13 +471,34 @@ class JustToolBase(ToolDefinition, ABC):
         """
         if self.max_calls_per_query is None:
             return -1  # Placeholder for infinity
-        return max(0, self.max_calls_per_query - self._calls_made)
+        return max(0, self.max_calls_per_query - self.calls_made)
+
+    @property
+    def calls_made(self) -> int:
+        """
+        Returns the number of calls made in the current tool_calls_scope, or in total if called outside of one.
+        """
+        scope = _tool_calls_scope.get()
+        if scope is None:
+            return self._calls_made
+        return scope.get(id(self), 0)
+
+    def _add_calls_made(self, delta: int) -> None:
+        scope = _tool_calls_scope.get()
+        if scope is None:
+            self._calls_made += delta
+        else:
+            scope[id(self)] = scope.get(id(self), 0) + delta
 
     def reset(self) -> Self:
         """
         Reset the call counter for this tool.
         """
-        self._calls_made = 0
+        scope = _tool_calls_scope.get()
+        if scope is None:
+            self._calls_made = 0
+        else:
+            scope.pop(id(self), None)
         return self
     
     def model_post_init(self, __context: Any) -> None:
@@ -256,9 +524,17 @@ class JustToolBase(ToolDefinition, ABC):
             self.is_async = inspect.iscoroutinefunction(func) and \
                             not inspect.isasyncgenfunction(func)
 
+            if isinstance(self.cache, JustToolCache):
+                if self.cache.backend == "disk":
+                    options = CompletionCacheOptions(ttl=self.cache.ttl, max_entries=self.cache.max_entries, path=self.cache.path)
+                    self._result_cache = CompletionCache.shared(options, table="tool_results")
+                else:
+                    self._result_cache = CompletionCache(self.cache.max_entries, ttl=self.cache.ttl)
+
             # Wrap the callable with decorators
             # self.name is the simple name, used for event bus topics
             self._callable = tool_decorator_composer(self, self.name)(func)
+            self._async_callable = async_tool_decorator_composer(self, self.name)(func)
 
         except Exception as e:
             # The specific error type and message depends on the concrete implementation
@@ -278,6 +554,26 @@ class JustToolBase(ToolDefinition, ABC):
         if self._callable is None:
             raise RuntimeError(f"Failed to initialize wrapped callable for tool '{self.name}'")
 
+    def cache_key(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        """
+        Canonical hash of a call for the result cache: the arguments are validated, defaults filled in
+        and restricted to the key fields. Returns None if the arguments fail validation.
+        """
+        arguments = kwargs
+        if self._pydantic_model is not None:
+            try:
+                arguments = self._pydantic_model.model_validate(kwargs).model_dump(mode="json")
+            except ValidationError:
+                return None
+        if self.cache.key_fields is not None:
+            arguments = {field: arguments.get(field) for field in self.cache.key_fields}
+        call = {
+            "tool": [self.name, getattr(self, "package", None), getattr(self, "static_class", None)],
+            "arguments": arguments,
+        }
+        canonical = json.dumps(call, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_canonical_default)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
     @staticmethod
     def function_to_llm_dict(input_function: Callable) -> Dict[str, Any]:
         """
@@ -390,6 +686,16 @@ class JustToolBase(ToolDefinition, ABC):
         if not self.subscribe(callback, "error"):
             raise ValueError(f"Failed to subscribe to {self.name}.error")
 
+    def subscribe_to_cache_hit(self, callback: SubscriberCallback) -> None:
+        """
+        Subscribe to the cache hit event, published instead of the call and result events when the result is memoized.
+        
+        Args:
+            callback (SubscriberCallback): Callback function that takes event_name (str) and result_interceptor=result, kwargs=kwargs
+        """
+        if not self.subscribe(callback, "cache_hit"):
+            raise ValueError(f"Failed to subscribe to {self.name}.cache_hit")
+
 
     def get_callable_sync(self, wrap: bool = True) -> Callable:
         """
@@ -417,6 +723,25 @@ class JustToolBase(ToolDefinition, ABC):
         """Alias for get_callable_sync. Retrieves the callable function."""
         return self.get_callable_sync(wrap=wrap)
 
+    def get_callable_async(self, wrap: bool = True) -> Callable:
+        """
+        Retrieve the coroutine function to await the tool from an event loop.
+        
+        Args:
+            wrap: If True, the coroutine function is wrapped with the JustToolsBus callbacks
+
+        Returns:
+            Wrapped coroutine function if wrap is True, otherwise the raw callable (which may be synchronous).
+            
+        Raises:
+            RuntimeError: If callables are not initialized
+        """
+        if wrap:
+            if self._async_callable is None:
+                raise RuntimeError(f"Wrapped async callable not initialized for tool '{self.name}'")
+            return self._async_callable
+        return self.get_callable_sync(wrap=False)
+
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         """
         Allows the tool instance to be called like a function.
@@ -610,6 +935,7 @@ class JustMCPTool(JustMCPServerParameters, JustToolBase):
         # Reset client reference and create a fresh one
 
         self._mcp_client = MCPClient.get_client_by_inputs(**self.model_dump())
+        self._mcp_client.invalidate_tool_catalog()
         return self
             
     def _get_raw_function_info(self) -> Tuple[Callable, Dict[str, Any], Optional[Type[BaseModel]]]:
@@ -657,65 +983,42 @@ class JustMCPTool(JustMCPServerParameters, JustToolBase):
             
     async def _fetch_tool_info(self) -> Dict[str, Any]:
         """
-        Connects to MCP and retrieves information about the specified tool.
+        Connects to MCP and retrieves information about the specified tool from the tool catalog of the client.
         """
-        tool_definitions = await self._mcp_client.list_tools_openai()
-        
-        for tool_def in tool_definitions:
-            if tool_def.name == self.name:
-                return tool_def.model_dump()
-                
-        raise ImportError(f"Tool '{self.name}' not found in MCP")
+        tool_def = (await self._mcp_client.tool_catalog()).get(self.name)
+        if tool_def is None:
+            raise ImportError(f"Tool '{self.name}' not found in MCP")
+        return tool_def.model_dump()
 
     
     async def _async_invoke_tool(self, *args, **kwargs) -> Any:
         """
         Asynchronously connects to MCP and invokes the tool with the given parameters.
+        The structured content is returned as is when the server sends it, otherwise the value of the content items:
+        a text item is parsed once in case it is JSON, the other items are returned as dicts of their fields.
         """
         result = await self._mcp_client.invoke_tool(self.name, kwargs) 
         if result.error_code != 0:
-            raise ValueError(f"MCP tool error: {result.content}, error code: {result.error_code}")
-        
-        # Parse the structured JSON response to extract the actual content
-        # MCP returns content in the format: {"type":"text","text":"actual_value"}
-        try:
-            import json
-            content_lines = result.content.split('\n')
-            if len(content_lines) == 1:
-                # Single content item
-                parsed_content = json.loads(content_lines[0])
-                if isinstance(parsed_content, dict) and "text" in parsed_content:
-                    # If the text field contains JSON, try to parse it
-                    text_content = parsed_content["text"]
-                    try:
-                        # Try to parse as JSON in case it's a serialized dict/object
-                        return json.loads(text_content)
-                    except (json.JSONDecodeError, TypeError):
-                        # If it's not JSON, return as is
-                        return text_content
-                else:
-                    # Return the parsed content directly (for complex objects)
-                    return parsed_content
-            else:
-                # Multiple content items - extract text from each
-                extracted_texts = []
-                for line in content_lines:
-                    if line.strip():  # Skip empty lines
-                        parsed_line = json.loads(line)
-                        if isinstance(parsed_line, dict) and "text" in parsed_line:
-                            text_content = parsed_line["text"]
-                            try:
-                                # Try to parse as JSON
-                                extracted_texts.append(json.loads(text_content))
-                            except (json.JSONDecodeError, TypeError):
-                                extracted_texts.append(text_content)
-                        else:
-                            extracted_texts.append(parsed_line)
-                # If we have only one item, return it directly, otherwise return list
-                return extracted_texts[0] if len(extracted_texts) == 1 else extracted_texts
-        except (JSONDecodeError, KeyError, TypeError):
-            # If parsing fails, return the raw content
-            return result.content
+            raise ValueError(f"MCP tool error: {result.text}, error code: {result.error_code}")
+        if result.structured_content is not None:
+            return result.structured_content
+        values = [self._content_value(content) for content in result.content]
+        if not values:
+            return ""
+        # If we have only one item, return it directly, otherwise return list
+        return values[0] if len(values) == 1 else values
+
+    @staticmethod
+    def _content_value(content: Any) -> Any:
+        if isinstance(content, TextContent):
+            try:
+                # Try to parse as JSON in case it's a serialized dict/object
+                return json.loads(content.text)
+            except (JSONDecodeError, TypeError):
+                return content.text
+        if isinstance(content, BaseModel):
+            return content.model_dump(mode="json", exclude_none=True)
+        return content
     
 
 
@@ -759,9 +1062,83 @@ class JustGoogleBuiltIn(JustToolBase):
         
         return stub_callable, schema, None
 
+class JustPromptToolCache(BaseModel):
+    """
+    Caching options of a prompt tool result between prompts.
+    """
+    ttl: Optional[float] = Field(None, ge=0, description="Seconds the result stays fresh, cached forever if not set.")
+    stale_while_revalidate: float = Field(0.0, ge=0, description="Seconds past ttl the stale result is still served while it is refreshed in the background.")
+    refresh_on_miss: bool = Field(True, description="Call the tool when the result is past the stale window, otherwise keep serving the last result and refresh it in the background.")
+
+
 class JustPromptTool(JustImportedTool):
     call_arguments: Optional[Dict[str,Any]] = Field(..., description="Input parameters to call the function with.")
     """Input parameters to call the function with."""
+    cache: Optional[JustPromptToolCache] = Field(None, description="Caching of the result between prompts, the tool is called on every prompt if not set.")
+    """Caching of the result between prompts, the tool is called on every prompt if not set."""
+
+    _cached_result: Any = PrivateAttr(default=None)
+    _cached_at: Optional[float] = PrivateAttr(default=None)
+    """Monotonic time of the cached result, None if nothing is cached."""
+    _refresh_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    """Serializes the calls, so that concurrent prompts wait for one call instead of repeating it."""
+    _revalidating: bool = PrivateAttr(default=False)
+
+    def _result_age(self) -> Optional[float]:
+        return None if self._cached_at is None else time.monotonic() - self._cached_at
+
+    def _is_fresh(self) -> bool:
+        age = self._result_age()
+        return age is not None and (self.cache.ttl is None or age <= self.cache.ttl)
+
+    def lookup(self) -> Tuple[bool, Any]:
+        """
+        Returns (True, result) if the cached result can be served, starting a background refresh if it is stale.
+        Returns (False, None) if the tool has to be called.
+        """
+        if self.cache is None or self._cached_at is None:
+            return False, None
+        if self._is_fresh():
+            return True, self._cached_result
+        if self.cache.refresh_on_miss and self._result_age() > self.cache.ttl + self.cache.stale_while_revalidate:
+            return False, None
+        self._revalidate()
+        return True, self._cached_result
+
+    def call(self, force: bool = False) -> Any:
+        """
+        Calls the tool with the call_arguments, caching the result if the cache is configured.
+        A fresh cached result is returned instead, unless force is set.
+        """
+        if self.cache is None:
+            return self.get_callable()(**(self.call_arguments or {}))
+        with self._refresh_lock:
+            if not force and self._is_fresh(): # refreshed by a concurrent call while waiting
+                return self._cached_result
+            result = self.get_callable()(**(self.call_arguments or {}))
+            self._cached_result, self._cached_at = result, time.monotonic()
+            return result
+
+    def invalidate(self) -> None:
+        """Drops the cached result, the next prompt calls the tool."""
+        with self._refresh_lock:
+            self._cached_result, self._cached_at = None, None
+
+    def _revalidate(self) -> None:
+        with self._calls_lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+
+        def refresh() -> None:
+            try:
+                self.call(force=True)
+            except Exception:
+                pass # the error is published to the JustToolsBus, the stale result is kept
+            finally:
+                self._revalidating = False
+
+        threading.Thread(target=refresh, name=f"revalidate-{self.name}", daemon=True).start()
 
 # Raw input types (for validation) - simplified for serialized form
 JustToolsRaw = Union[
@@ -921,6 +1298,33 @@ class JustPromptTools(JustTools):
         """Get prompt tool instances."""
         return self._prompt_tools_dict.values()
 
+    def call_all(self, max_workers: int = 8) -> Dict[str, Any]:
+        """
+        Calls all prompt tools with their call_arguments, in the order of the collection.
+        Cached results are served as is, the tools that have to be called run concurrently.
+        """
+        results: Dict[str, Any] = {}
+        misses: List[str] = []
+        for name, prompt_tool in self._prompt_tools_dict.items():
+            hit, result = prompt_tool.lookup()
+            if hit:
+                results[name] = result
+            else:
+                misses.append(name)
+
+        if len(misses) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as executor:
+                futures = {
+                    name: executor.submit(contextvars.copy_context().run, self._prompt_tools_dict[name].call)
+                    for name in misses
+                }
+            for name, future in futures.items():
+                results[name] = future.result()
+        else:
+            for name in misses:
+                results[name] = self._prompt_tools_dict[name].call()
+        return {name: results[name] for name in self._prompt_tools_dict}
+
     def batch_call(self, tool_names: List[str], *args, **kwargs) -> List[Any]:
         """Call multiple prompt tools with the same arguments."""
         results = []
@@ -1256,11 +1660,9 @@ class JustToolFactory:
         # Get the MCP client
         client = MCPClient.get_client_by_inputs(mcp_client_config=endpoint)
         
-        # Create and run the coroutine to list tools
+        # Create and run the coroutine to list tools, the connection stays open for the tools of the server
         async def get_tools():
-            async with client:
-                tool_definitions = await client.list_tools_openai()
-                return {tool.name: tool for tool in tool_definitions}
+            return dict(await client.tool_catalog())
             
         # Run the coroutine using run_async_function_synchronously
         return run_async_function_synchronously(get_tools)
@@ -1286,8 +1688,7 @@ class JustToolFactory:
         
         # Create and run the coroutine to get the tool
         async def get_tool():
-            async with client:
-                return await client.get_tool_openai_by_name(tool_name)
+            return await client.get_tool_openai_by_name(tool_name)
             
         # Run the coroutine using run_async_function_synchronously
         return run_async_function_synchronously(get_tool)
@@ -1355,7 +1756,9 @@ class JustToolFactory:
         for tool_name in tools_to_create:
             tool = JustMCPTool(
                 name=tool_name,
-                mcp_client_config=config.mcp_client_config
+                mcp_client_config=config.mcp_client_config,
+                max_sessions=config.max_sessions,
+                session_idle_seconds=config.session_idle_seconds
             )
             tool_dict[tool_name] = tool
         
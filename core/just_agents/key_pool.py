@@ -0,0 +1,294 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, ClassVar, Deque, Dict, Iterable, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from just_agents.just_bus import JustLogBus
+from just_agents.rotate_keys import RotateKeys
+
+KeySelection = Literal["lru", "least_in_flight"]
+
+RATE_WINDOW = 60.0
+"""Seconds of the sliding window of the RPM and TPM budgets."""
+
+
+class KeyPoolExhausted(IndexError):
+    """
+    Raised when no key of the pool can be used: all of them are cooling down, over budget or excluded.
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeyStats(BaseModel):
+    """
+    Health and usage of a single key of the pool.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    in_flight: int = Field(0, description="Requests currently made with the key")
+    requests: int = Field(0, description="Total requests made with the key")
+    failures: int = Field(0, description="Total failed requests")
+    consecutive_failures: int = Field(0, description="Failed requests since the last success")
+    cooldowns: int = Field(0, description="Times the key was put on cooldown after a 429 or 5xx response")
+    tokens: int = Field(0, description="Total tokens reported by the responses")
+    last_used: float = Field(0.0, description="Monotonic time the key was last handed out")
+    cooldown_until: float = Field(0.0, description="Monotonic time until which the key is not handed out")
+
+    _request_times: Deque[float] = PrivateAttr(default_factory=deque)
+    _token_times: Deque[Tuple[float, int]] = PrivateAttr(default_factory=deque)
+
+    def _prune(self, now: float) -> None:
+        while self._request_times and now - self._request_times[0] >= RATE_WINDOW:
+            self._request_times.popleft()
+        while self._token_times and now - self._token_times[0][0] >= RATE_WINDOW:
+            self._token_times.popleft()
+
+    def available_at(self, now: float, rpm_limit: Optional[int], tpm_limit: Optional[int]) -> float:
+        """Returns the monotonic time the key can be handed out again, now or earlier if it is available."""
+        self._prune(now)
+        available = self.cooldown_until
+        if rpm_limit is not None and len(self._request_times) >= rpm_limit:
+            available = max(available, self._request_times[len(self._request_times) - rpm_limit] + RATE_WINDOW)
+        if tpm_limit is not None:
+            used = sum(tokens for _, tokens in self._token_times)
+            for timestamp, tokens in self._token_times: # budget frees up as the old usage leaves the window
+                if used < tpm_limit:
+                    break
+                used -= tokens
+                available = max(available, timestamp + RATE_WINDOW)
+        return available
+
+
+class KeyPool:
+    """
+    Thread-safe pool of API keys, shared process-wide by all agents configured with the same key source.
+
+    A key is put on cooldown after a 429 or 5xx response, for the Retry-After period if the provider sent one,
+    otherwise with an exponential backoff. Keys are selected least-recently-used or least-in-flight,
+    skipping the ones cooling down or over their optional client-side RPM/TPM budgets.
+    """
+    _shared_pools: ClassVar[Dict[str, 'KeyPool']] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+            self,
+            keys: Iterable[str],
+            selection: KeySelection = "lru",
+            rpm_limit: Optional[int] = None,
+            tpm_limit: Optional[int] = None,
+            base_cooldown: float = 1.0,
+            max_cooldown: float = 60.0,
+    ):
+        self._lock = threading.Lock()
+        self._keys: Dict[str, KeyStats] = {key: KeyStats() for key in dict.fromkeys(keys) if key}
+        self._indices: Dict[str, int] = {key: index for index, key in enumerate(self._keys)}
+        self.configure(selection, rpm_limit, tpm_limit, base_cooldown, max_cooldown)
+
+    def configure(
+            self,
+            selection: KeySelection = "lru",
+            rpm_limit: Optional[int] = None,
+            tpm_limit: Optional[int] = None,
+            base_cooldown: float = 1.0,
+            max_cooldown: float = 60.0,
+    ) -> 'KeyPool':
+        if selection not in ("lru", "least_in_flight"):
+            raise ValueError(f"Unknown key selection '{selection}', expected 'lru' or 'least_in_flight'")
+        self.selection = selection
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        return self
+
+    def _merged(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Settings of a pool with one more sharer: the strictest RPM/TPM budgets that are set and the longest cooldowns.
+        The selection of the first sharer is kept.
+        """
+        if options.get("selection", self.selection) not in ("lru", "least_in_flight"):
+            raise ValueError(f"Unknown key selection '{options['selection']}', expected 'lru' or 'least_in_flight'")
+        strictest = lambda current, new: current if new is None else new if current is None else min(current, new)
+        return dict(
+            selection=self.selection,
+            rpm_limit=strictest(self.rpm_limit, options.get("rpm_limit")),
+            tpm_limit=strictest(self.tpm_limit, options.get("tpm_limit")),
+            base_cooldown=max(self.base_cooldown, options.get("base_cooldown", self.base_cooldown)),
+            max_cooldown=max(self.max_cooldown, options.get("max_cooldown", self.max_cooldown)),
+        )
+
+    @classmethod
+    def shared(cls, source: str, keys: Iterable[str], **options) -> 'KeyPool':
+        """
+        Returns the process-wide pool for the key source, creating it on first use.
+        Options of later callers are merged into the current ones, see _merged, the health state of the keys is kept.
+        """
+        with cls._shared_lock:
+            pool = cls._shared_pools.get(source)
+            if pool is None:
+                pool = cls._shared_pools[source] = cls(keys, **options)
+            elif options:
+                pool.configure(**pool._merged(options))
+            return pool
+
+    @classmethod
+    def from_path(cls, file_path: str, **options) -> 'KeyPool':
+        return cls.shared(f"path:{os.path.abspath(file_path)}", RotateKeys.from_path(file_path).keys, **options)
+
+    @classmethod
+    def from_env(cls, env_var: str, **options) -> 'KeyPool':
+        return cls.shared(f"env:{env_var}", RotateKeys.from_env(env_var).keys, **options)
+
+    @classmethod
+    def from_list(cls, keys: List[str], **options) -> 'KeyPool':
+        return cls(keys, **options)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def len(self) -> int:
+        return len(self._keys)
+
+    def index(self, key: Optional[str]) -> Optional[int]:
+        """Position of the key in the pool, to tell the keys apart without revealing them."""
+        return self._indices.get(key)
+
+    def _try_acquire(self, exclude: Iterable[str]) -> Tuple[Optional[str], Optional[float]]:
+        """Returns (key, None) for an available key, or (None, seconds until one is available)."""
+        with self._lock:
+            now = time.monotonic()
+            best_key, best_rank, soonest = None, None, None
+            for key, stats in self._keys.items():
+                if key in exclude:
+                    continue
+                available_at = stats.available_at(now, self.rpm_limit, self.tpm_limit)
+                if available_at > now:
+                    soonest = available_at if soonest is None else min(soonest, available_at)
+                    continue
+                rank = (stats.in_flight, stats.last_used) if self.selection == "least_in_flight" else (stats.last_used,)
+                if best_rank is None or rank < best_rank:
+                    best_key, best_rank = key, rank
+            if best_key is None:
+                return None, None if soonest is None else soonest - now
+            stats = self._keys[best_key]
+            stats.in_flight += 1
+            stats.requests += 1
+            stats.last_used = now
+            stats._request_times.append(now)
+            return best_key, None
+
+    def acquire(self, exclude: Iterable[str] = (), max_wait: float = 0.0) -> str:
+        """
+        Hands out a key, marking it in flight until release() is called.
+        Waits up to max_wait seconds for a key to come off cooldown or budget, raises KeyPoolExhausted otherwise.
+        """
+        exclude = frozenset(exclude)
+        deadline = time.monotonic() + max_wait
+        while True:
+            key, retry_after = self._try_acquire(exclude)
+            if key is not None:
+                return key
+            self._check_wait(retry_after, deadline)
+            time.sleep(retry_after)
+
+    async def aacquire(self, exclude: Iterable[str] = (), max_wait: float = 0.0) -> str:
+        """Async counterpart of acquire(), waits without blocking the event loop."""
+        exclude = frozenset(exclude)
+        deadline = time.monotonic() + max_wait
+        while True:
+            key, retry_after = self._try_acquire(exclude)
+            if key is not None:
+                return key
+            self._check_wait(retry_after, deadline)
+            await asyncio.sleep(retry_after)
+
+    @staticmethod
+    def _check_wait(retry_after: Optional[float], deadline: float) -> None:
+        if retry_after is None:
+            raise KeyPoolExhausted("Ran out of API keys during rotation.")
+        if time.monotonic() + retry_after > deadline:
+            raise KeyPoolExhausted(
+                f"All API keys are cooling down or over budget, next one is available in {retry_after:.1f}s",
+                retry_after=retry_after
+            )
+
+    def release(self, key: str, error: Optional[BaseException] = None, tokens: int = 0) -> None:
+        """
+        Returns a key handed out by acquire(), reporting the outcome of the request made with it.
+        A 429 or 5xx error puts the key on cooldown, honouring the Retry-After header of the response.
+        """
+        with self._lock:
+            stats = self._keys.get(key)
+            if stats is None:
+                return
+            now = time.monotonic()
+            stats.in_flight = max(0, stats.in_flight - 1)
+            if tokens:
+                stats.tokens += tokens
+                stats._token_times.append((now, tokens))
+            if error is None:
+                stats.consecutive_failures = 0
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if not is_retryable_status(error_status_code(error)):
+                return
+            cooldown = error_retry_after(error)
+            if cooldown is None:
+                cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (stats.consecutive_failures - 1))
+            stats.cooldown_until = max(stats.cooldown_until, now + cooldown)
+            stats.cooldowns += 1
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Returns the stats of every key in the pool order, with the masked key and the remaining cooldown in seconds."""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "key": JustLogBus.mask_api_key(key),
+                    **stats.model_dump(exclude={"last_used", "cooldown_until"}),
+                    "cooldown_remaining": max(0.0, stats.cooldown_until - now),
+                }
+                for key, stats in self._keys.items()
+            ]
+
+def error_status_code(error: BaseException) -> Optional[int]:
+    """Extracts the HTTP status code from a provider exception, if any."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    try:
+        return int(status_code) if status_code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+def error_retry_after(error: BaseException) -> Optional[float]:
+    """Extracts the Retry-After period in seconds from the headers of a provider exception, if any."""
+    headers = getattr(error, "litellm_response_headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -1,15 +1,15 @@
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, List, Optional, Set, Union, cast
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 import asyncio
 import shlex
 import threading
+import time
 import json
 
-from mcp.types import Tool as MCPTool, TextContent, ImageContent, EmbeddedResource
+from mcp.types import Tool as MCPTool, CallToolResult, ContentBlock, TextContent, ServerNotification, ToolListChangedNotification
 from fastmcp import Client
-from fastmcp.client.client import CallToolResult
-from fastmcp.exceptions import ToolError
 
 from pydantic import BaseModel, Field, PrivateAttr, AnyUrl, ValidationError
 from just_agents.data_classes import ToolDefinition
@@ -20,9 +20,52 @@ from just_agents.data_classes import JustMCPServerParameters, MCPServersConfig
 AcceptedMCPClientConfig = Union[AnyUrl, str, MCPServersConfig, Path]
 
 class MCPToolInvocationResult(BaseModel):
-    content: str = Field(..., description="Result content as a string")
+    content: List[ContentBlock] = Field(default_factory=list, description="Content items of the result, as sent by the server")
+    structured_content: Optional[Any] = Field(None, description="Structured result as sent by the server, unwrapped for the results which are not objects")
     error_code: int = Field(..., description="Error code (0 for success, 1 for error)")
 
+    @property
+    def text(self) -> str:
+        """Text of the text content items, e.g. the message of an error."""
+        return "\n".join(item.text for item in self.content if isinstance(item, TextContent))
+
+    @classmethod
+    def error(cls, message: str) -> 'MCPToolInvocationResult':
+        return cls(content=[TextContent(type="text", text=message)], error_code=1)
+
+class MCPSession:
+    """
+    Extra session of a pooled MCP client, a subprocess of its own for STDIO servers.
+    Used only on the loop of its client, the counters need no lock.
+    """
+    def __init__(self, client: Client) -> None:
+        self.client = client
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self._opening: Optional[asyncio.Future] = None
+
+    async def open(self) -> None:
+        # the calls dispatched to the session while it connects wait for the same connection
+        if self._opening is None:
+            self._opening = asyncio.ensure_future(self.client.__aenter__())
+        await asyncio.shield(self._opening)
+
+    @property
+    def broken(self) -> bool:
+        """Whether the session has connected and lost its connection since."""
+        if self._opening is None or not self._opening.done():
+            return False
+        try:
+            return self._opening.exception() is not None or not self.client.is_connected()
+        except Exception:
+            return True
+
+    async def close(self) -> None:
+        try:
+            await self.client.close()
+        except Exception:
+            pass
+
 class MCPClientLocator(JustLocator['MCPClient'], metaclass=SingletonMeta):
     """
     A singleton registry for MCP clients.
@@ -161,6 +204,15 @@ class MCPClient(JustMCPServerParameters):
     _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
     _loop_thread: Optional[threading.Thread] = PrivateAttr(default=None)
     _loop_ready: Optional[threading.Event] = PrivateAttr(default=None)
+    # Tool definitions by name, fetched once per connection and shared by all the tools of the server
+    _tool_catalog: Optional[Dict[str, ToolDefinition]] = PrivateAttr(default=None)
+    # Tools whose structured results are wrapped in {"result": ...}, e.g. the FastMCP tools returning a value that is not an object
+    _wrapped_results: Set[str] = PrivateAttr(default_factory=set)
+    # Session pool: calls in flight on the first session, the extra sessions and the timer closing the idle ones
+    _in_flight: int = PrivateAttr(default=0)
+    _sessions: List[MCPSession] = PrivateAttr(default_factory=list)
+    _reaper: Optional[asyncio.TimerHandle] = PrivateAttr(default=None)
+    _connect_lock: Optional[asyncio.Lock] = PrivateAttr(default=None)
 
     def model_post_init(self, __context: Any) -> None:
         """Initialize after Pydantic model initialization."""
@@ -356,13 +408,16 @@ class MCPClient(JustMCPServerParameters):
         # Build a deterministic client key from the parsed transport specification
         client_key = cls._serialize_transport_spec_for_key(transport_spec)
 
-        # Reuse existing client if present (applies to all transports)
+        # Reuse existing client if present (applies to all transports), the largest requested pool wins
+        pool = {name: kwargs[name] for name in ("max_sessions", "session_idle_seconds") if kwargs.get(name) is not None}
         existing_client = _mcp_locator.get_client_by_key(client_key)
         if existing_client:
+            if pool.get("max_sessions", 1) > existing_client.max_sessions:
+                existing_client.max_sessions = pool["max_sessions"]
             return existing_client
 
         # Create and register new client
-        client = cls(client_key=client_key, mcp_client_config=mcp_client_config)
+        client = cls(client_key=client_key, mcp_client_config=mcp_client_config, **pool)
         _mcp_locator.publish_client(client)
         return client
 
@@ -377,22 +432,115 @@ class MCPClient(JustMCPServerParameters):
                         return
                 except Exception:
                     pass
-                try:
-                    await self._client.close()
-                except Exception:
-                    pass
-                self._client = None
-                self._client_context_manager = None
-            # Create client
-            self._client = Client(self._transport_spec)
-            self._client_context_manager = self._client.__aenter__()
-            await self._client_context_manager
-            self._client_event_loop = self._loop
+            # Concurrent calls wait for the connection being made instead of replacing it
+            if self._connect_lock is None:
+                self._connect_lock = asyncio.Lock()
+            async with self._connect_lock:
+                if self._client:
+                    try:
+                        if self._client.is_connected():
+                            self._client_event_loop = self._loop
+                            return
+                    except Exception:
+                        pass
+                    try:
+                        await self._client.close()
+                    except Exception:
+                        pass
+                    self._client = None
+                    self._client_context_manager = None
+                # Create client, the tools of a new connection are fetched again
+                self._tool_catalog = None
+                self._client = Client(self._transport_spec, message_handler=self._handle_message)
+                self._client_context_manager = self._client.__aenter__()
+                await self._client_context_manager
+                self._client_event_loop = self._loop
 
         await self._run_on_client_loop(_inner())
 
+    async def _handle_message(self, message: Any) -> None:
+        """Drops the tool catalog when the server notifies that its tools have changed."""
+        if isinstance(message, ServerNotification) and isinstance(message.root, ToolListChangedNotification):
+            self.invalidate_tool_catalog()
+
+    def invalidate_tool_catalog(self) -> None:
+        """Makes the next catalog lookup fetch the tools from the server again."""
+        self._tool_catalog = None
+
+    @asynccontextmanager
+    async def _session(self):
+        """
+        Yields the FastMCP client of the least busy session, on the client loop. A new session is opened
+        when all the sessions are busy and the pool has room for it.
+        """
+        await self._connect()
+        if self.max_sessions <= 1 and not self._sessions:
+            yield self._client
+            return
+        self._reap_idle_sessions()
+        session: Optional[MCPSession] = min(self._sessions, key=lambda pooled: pooled.in_flight, default=None)
+        if session is not None and session.in_flight >= self._in_flight:
+            session = None  # the first session is the least busy
+        if self._in_flight and (session is None or session.in_flight) and len(self._sessions) + 1 < self.max_sessions:
+            session = MCPSession(Client(self._transport_spec, message_handler=self._handle_message))
+            self._sessions.append(session)
+        if session is None:
+            self._in_flight += 1
+            try:
+                yield self._client
+            finally:
+                self._in_flight -= 1
+            return
+        session.in_flight += 1
+        try:
+            try:
+                await session.open()
+            except Exception:
+                if session in self._sessions:
+                    self._sessions.remove(session)
+                raise
+            yield session.client
+        finally:
+            session.in_flight -= 1
+            session.last_used = time.monotonic()
+            self._schedule_reaper()
+
+    def _reap_idle_sessions(self) -> None:
+        """Closes the extra sessions unused for session_idle_seconds and the ones which lost their connection."""
+        deadline = time.monotonic() - self.session_idle_seconds
+        idle = [
+            session for session in self._sessions
+            if not session.in_flight and (session.last_used <= deadline or session.broken)
+        ]
+        for session in idle:
+            self._sessions.remove(session)
+            asyncio.ensure_future(session.close())
+
+    def _schedule_reaper(self) -> None:
+        if self._reaper is not None or not self._sessions:
+            return
+
+        def reap() -> None:
+            self._reaper = None
+            self._reap_idle_sessions()
+            self._schedule_reaper()
+
+        self._reaper = asyncio.get_running_loop().call_later(self.session_idle_seconds, reap)
+
     async def _close(self) -> None:
         """Closes the FastMCP client and tears down the connection."""
+        if self._sessions or self._reaper:
+            async def _close_sessions():
+                if self._reaper is not None:
+                    self._reaper.cancel()
+                    self._reaper = None
+                sessions, self._sessions = self._sessions, []
+                for session in sessions:
+                    await session.close()
+            try:
+                await self._run_on_client_loop(_close_sessions())
+            except Exception:
+                pass
         if self._client:
             async def _inner_close():
                 try:
@@ -417,36 +565,28 @@ class MCPClient(JustMCPServerParameters):
         await self._close()
 
     async def invoke_tool(self, tool_name: str, kwargs: Dict[str, Any]) -> MCPToolInvocationResult:
-        """Invoke a specific tool with parameters, returning a ToolInvocationResult."""
+        """
+        Invoke a specific tool with parameters, returning a ToolInvocationResult.
+        The content items and the structured content are passed on as the server sent them, nothing is serialized again.
+        """
         async def _inner() -> MCPToolInvocationResult:
             await self._connect()
             try:
-                call_result: CallToolResult = await self._client.call_tool(tool_name, kwargs)
-                if call_result.is_error:
-                    error_message = "Tool execution failed"
-                    if call_result.content:
-                        content_items = []
-                        for content in call_result.content:
-                            if isinstance(content, (TextContent, ImageContent, EmbeddedResource)):
-                                content_items.append(content.model_dump_json(exclude_none=True))
-                            else:
-                                content_items.append(str(content))
-                        error_message = "\\n".join(content_items)
-                    return MCPToolInvocationResult(content=error_message, error_code=1)
-                content_str = ""
-                if call_result.content:
-                    content_items = []
-                    for content in call_result.content:
-                        if isinstance(content, (TextContent, ImageContent, EmbeddedResource)):
-                            content_items.append(content.model_dump_json(exclude_none=True))
-                        else:
-                            content_items.append(str(content))
-                    content_str = "\\n".join(content_items)
-                return MCPToolInvocationResult(content=content_str, error_code=0)
-            except ToolError as e:
-                return MCPToolInvocationResult(content=str(e), error_code=1)
+                async with self._session() as client:
+                    call_result: CallToolResult = await client.call_tool_mcp(tool_name, kwargs)
+                structured_content = call_result.structuredContent
+                if structured_content is not None and not call_result.isError:
+                    if self._tool_catalog is None:
+                        await self.tool_catalog()
+                    if tool_name in self._wrapped_results:
+                        structured_content = structured_content.get("result")
+                return MCPToolInvocationResult(
+                    content=call_result.content,
+                    structured_content=structured_content,
+                    error_code=1 if call_result.isError else 0,
+                )
             except Exception as e:
-                return MCPToolInvocationResult(content=f"Connection error: {str(e)}", error_code=1)
+                return MCPToolInvocationResult.error(f"Connection error: {str(e)}")
 
         return await self._run_on_client_loop(_inner())
 
@@ -463,6 +603,47 @@ class MCPClient(JustMCPServerParameters):
             return tools
         return await self._run_on_client_loop(_inner())
 
+    @staticmethod
+    def _tool_definition(tool: MCPTool) -> ToolDefinition:
+        """Converts an MCP tool schema to the ToolDefinition format."""
+        parameters = {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+
+        for param_name, param_schema in tool.inputSchema.get("properties", {}).items():
+            parameters["properties"][param_name] = param_schema
+            if param_name in tool.inputSchema.get("required", []):
+                parameters["required"].append(param_name)
+
+        return ToolDefinition(
+            name=tool.name,
+            description=tool.description or "",
+            parameters=parameters
+        )
+
+    async def tool_catalog(self, refresh: bool = False) -> Dict[str, ToolDefinition]:
+        """
+        Returns the tools of the MCP endpoint as ToolDefinition objects by name.
+        The tools are listed once and cached until a reconnect, a tools/list_changed notification or a refresh.
+
+        Args:
+            refresh: Whether to list the tools again even if they are cached
+
+        Returns:
+            Dict[str, ToolDefinition]: Tools by name, shared by all the callers, not to be modified
+        """
+        async def _inner() -> Dict[str, ToolDefinition]:
+            if self._tool_catalog is None or refresh:
+                tools_raw = await self._fetch_tool_info()
+                self._wrapped_results = {
+                    tool.name for tool in tools_raw if (tool.outputSchema or {}).get("x-fastmcp-wrap-result")
+                }
+                self._tool_catalog = {tool.name: self._tool_definition(tool) for tool in tools_raw}
+            return self._tool_catalog
+        return await self._run_on_client_loop(_inner())
+
     async def list_tools_openai(self) -> List[ToolDefinition]:
         """
         Lists available tools from the MCP endpoint as ToolDefinition objects.
@@ -470,30 +651,7 @@ class MCPClient(JustMCPServerParameters):
         Returns:
             List[ToolDefinition]: List of tools formatted as ToolDefinition objects
         """
-        tools_raw = await self._fetch_tool_info()
-        tool_definitions = []
-        
-        for tool in tools_raw:
-            # Convert MCP tool schema to ToolDefinition format
-            parameters = {
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-            
-            for param_name, param_schema in tool.inputSchema.get("properties", {}).items():
-                parameters["properties"][param_name] = param_schema
-                if param_name in tool.inputSchema.get("required", []):
-                    parameters["required"].append(param_name)
-            
-            tool_definition = ToolDefinition(
-                name=tool.name,
-                description=tool.description or "",
-                parameters=parameters
-            )
-            tool_definitions.append(tool_definition)
-            
-        return tool_definitions
+        return list((await self.tool_catalog()).values())
 
     async def get_tool_openai_by_name(self, tool_name: str) -> Optional[ToolDefinition]:
         """
@@ -505,10 +663,4 @@ class MCPClient(JustMCPServerParameters):
         Returns:
             Optional[ToolDefinition]: The tool as a ToolDefinition object, or None if not found
         """
-        tool_definitions = await self.list_tools_openai()
-        
-        for tool in tool_definitions:
-            if tool.name == tool_name:
-                return tool
-                
-        return None
+        return (await self.tool_catalog()).get(tool_name)
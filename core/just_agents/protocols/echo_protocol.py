@@ -0,0 +1,271 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, Iterator, List, Optional, Tuple, Union
+
+import httpx
+import litellm
+from litellm.utils import ModelResponse, ModelResponseStream
+from pydantic import BaseModel, Field, PrivateAttr
+
+from just_agents.data_classes import FinishReason, Role
+from just_agents.interfaces.protocol_adapter import IProtocolAdapter
+from just_agents.protocols.litellm_protocol import LiteLLMAdapter
+from just_agents.types import MessageDict
+
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+"""Whitespace-delimited pieces the echo adapter streams and counts as tokens."""
+
+ECHO_OPTIONS_KEY = "echo"
+"""Completion option holding per-call EchoOptions overrides, e.g. in llm_options of an agent."""
+
+
+class EchoToolCall(BaseModel):
+    """
+    Tool call made by a scripted echo response.
+    """
+    name: str = Field(..., description="Name of the tool to call")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the call")
+    id: Optional[str] = Field(None, description="Id of the call, generated if not set")
+
+
+class EchoResponse(BaseModel):
+    """
+    Scripted answer of the echo adapter.
+    """
+    content: Optional[str] = Field(None, description="Text of the answer, the last message is echoed back if neither content nor tool calls are set")
+    reasoning_content: Optional[str] = Field(None, description="Reasoning streamed ahead of the content")
+    tool_calls: List[EchoToolCall] = Field(default_factory=list, description="Tool calls of the answer")
+    chunks: Optional[List[str]] = Field(None, description="Exact streaming pieces of the content, split into tokens if not set")
+    error: Optional[int] = Field(None, description="HTTP status of an error raised instead of answering, e.g. 429 or 503")
+
+
+class EchoRule(BaseModel):
+    """
+    Answers with the response when the last message matches the pattern.
+    """
+    pattern: str = Field(".*", description="Regular expression searched in the text of the last message")
+    role: Optional[str] = Field(None, description="Role the last message must have, any if not set")
+    response: EchoResponse = Field(..., description="Answer given on a match")
+
+
+class EchoOptions(BaseModel):
+    """
+    Behaviour of the echo adapter. Rules are checked first, then the scripted responses are served in turn,
+    otherwise the last message is echoed back.
+    """
+    rules: List[EchoRule] = Field(default_factory=list, description="Rule-based answers, the first match wins")
+    responses: List[EchoResponse] = Field(default_factory=list, description="Scripted answers served in turn, cycling")
+    ttft: float = Field(0.0, ge=0, description="Seconds before the first token")
+    tokens_per_second: Optional[float] = Field(None, gt=0, description="Generation speed after the first token, instant if not set")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Share of the calls failing with error_status")
+    error_status: int = Field(429, description="HTTP status of the injected errors")
+    retry_after: Optional[float] = Field(None, ge=0, description="Retry-After header of the injected errors, in seconds")
+    seed: Optional[int] = Field(None, description="Seed of the error injection")
+
+
+class EchoProtocolAdapter(LiteLLMAdapter):
+    """
+    Offline adapter answering without a network call, for tests, load tests and benchmarks of agents and servers.
+    Responses are the same litellm ModelResponse and ModelResponseStream objects a provider call returns,
+    delivered at the configured time to first token and token rate, errors are raised as litellm exceptions.
+
+    The options of the adapter can be overridden per call with the 'echo' completion option, e.g. in llm_options:
+    {"model": "echo", "echo": {"ttft": 0.3, "tokens_per_second": 50, "responses": [{"content": "hi"}]}}
+    """
+    options: EchoOptions = Field(default_factory=EchoOptions, description="Default behaviour of the adapter")
+
+    _turns: Iterator[int] = PrivateAttr(default_factory=itertools.count)
+    _random: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        if self.options.seed is not None:
+            self._random.seed(self.options.seed)
+
+    def sanitize_args(self, *args, **kwargs) -> tuple:
+        """Only drops the internal arguments, there is no model catalog to validate against."""
+        for internal_kwarg in ["raise_on_completion_status_errors", "reconstruct_chunks"]:
+            kwargs.pop(internal_kwarg, None)
+        if not kwargs.get("messages"):
+            raise ValueError("Messages are required")
+        return args, kwargs
+
+    def _provider_completion(self, *args, **kwargs) -> Union[ModelResponse, Generator[ModelResponseStream, None, None]]:
+        options, response, model, messages, error = self._prepare(kwargs)
+        if error is not None:
+            time.sleep(options.ttft)
+            raise error
+        if not kwargs.get("stream"):
+            time.sleep(self._duration(options, response))
+            return self._response(response, model, messages)
+
+        def stream() -> Generator[ModelResponseStream, None, None]:
+            for delay, chunk in self._chunks(options, response, model, messages, kwargs):
+                if delay:
+                    time.sleep(delay)
+                yield chunk
+        return stream()
+
+    async def _provider_acompletion(self, *args, **kwargs) \
+            -> Union[ModelResponse, AsyncGenerator[ModelResponseStream, None]]:
+        options, response, model, messages, error = self._prepare(kwargs)
+        if error is not None:
+            await asyncio.sleep(options.ttft)
+            raise error
+        if not kwargs.get("stream"):
+            await asyncio.sleep(self._duration(options, response))
+            return self._response(response, model, messages)
+
+        async def stream() -> AsyncGenerator[ModelResponseStream, None]:
+            for delay, chunk in self._chunks(options, response, model, messages, kwargs):
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk
+        return stream()
+
+    def _prepare(self, kwargs: Dict[str, Any]) \
+            -> Tuple[EchoOptions, EchoResponse, str, List[MessageDict], Optional[Exception]]:
+        """Picks the answer to the call, or the error to raise after the time to first token."""
+        overrides = kwargs.get(ECHO_OPTIONS_KEY)
+        options = self.options
+        if overrides:
+            options = EchoOptions.model_validate({**options.model_dump(exclude_unset=True), **overrides})
+        model, messages = kwargs.get("model") or "echo", kwargs["messages"]
+        response = self._select(options, messages)
+        status = response.error
+        if status is None and options.error_rate and self._random.random() < options.error_rate:
+            status = options.error_status
+        if status is not None:
+            return options, response, model, messages, self._error(status, model, options.retry_after)
+        if response.content is None and not response.tool_calls:
+            response = response.model_copy(update={"content": _message_text(messages[-1])})
+        return options, response, model, messages, None
+
+    def _select(self, options: EchoOptions, messages: List[MessageDict]) -> EchoResponse:
+        last = messages[-1]
+        text = _message_text(last)
+        for rule in options.rules:
+            if (rule.role is None or rule.role == last.get("role")) and re.search(rule.pattern, text):
+                return rule.response
+        if options.responses:
+            return options.responses[next(self._turns) % len(options.responses)]
+        return EchoResponse()
+
+    @staticmethod
+    def _error(status: int, model: str, retry_after: Optional[float]) -> Exception:
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        request = httpx.Request("POST", "http://echo.invalid/v1/chat/completions")
+        response = httpx.Response(status, headers=headers, request=request)
+        message = f"Echo adapter injected error {status}"
+        error_class = {
+            429: litellm.RateLimitError,
+            500: litellm.InternalServerError,
+            502: litellm.BadGatewayError,
+            503: litellm.ServiceUnavailableError,
+        }.get(status)
+        if error_class is None:
+            return litellm.APIError(status, message, llm_provider="echo", model=model, request=request)
+        return error_class(message, llm_provider="echo", model=model, response=response)
+
+    @staticmethod
+    def _tokens(response: EchoResponse) -> Tuple[List[str], List[str], List[List[str]]]:
+        """Splits the reasoning, the content and the arguments of every tool call into streamed pieces."""
+        reasoning = TOKEN_PATTERN.findall(response.reasoning_content or "")
+        content = response.chunks if response.chunks is not None else TOKEN_PATTERN.findall(response.content or "")
+        arguments = [TOKEN_PATTERN.findall(json.dumps(call.arguments)) for call in response.tool_calls]
+        return reasoning, content, arguments
+
+    def _duration(self, options: EchoOptions, response: EchoResponse) -> float:
+        reasoning, content, arguments = self._tokens(response)
+        count = len(reasoning) + len(content) + sum(len(pieces) + 1 for pieces in arguments)
+        if not options.tokens_per_second or count < 2:
+            return options.ttft
+        return options.ttft + (count - 1) / options.tokens_per_second
+
+    @staticmethod
+    def _tool_calls(response: EchoResponse) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": call.id or f"call_echo_{index}",
+                "type": "function",
+                "function": {"name": call.name, "arguments": json.dumps(call.arguments)},
+            }
+            for index, call in enumerate(response.tool_calls)
+        ]
+
+    @staticmethod
+    def _usage(messages: List[MessageDict], response: EchoResponse) -> Dict[str, int]:
+        completion_text = (response.reasoning_content or "") + (response.content or "") \
+            + "".join(json.dumps(call.arguments) for call in response.tool_calls)
+        return IProtocolAdapter.create_usage(
+            prompt_text="".join(_message_text(message) for message in messages),
+            completion_text=completion_text,
+        )
+
+    def _response(self, response: EchoResponse, model: str, messages: List[MessageDict]) -> ModelResponse:
+        message: Dict[str, Any] = {"role": Role.assistant.value, "content": response.content}
+        if response.tool_calls:
+            message["tool_calls"] = self._tool_calls(response)
+        if response.reasoning_content is not None:
+            message["reasoning_content"] = response.reasoning_content
+        finish_reason = FinishReason.tool_calls.value if response.tool_calls else FinishReason.stop.value
+        return ModelResponse(**IProtocolAdapter.create_base_response(
+            model=model,
+            choices=[IProtocolAdapter.create_choice(message, finish_reason=finish_reason)],
+            usage=self._usage(messages, response),
+        ))
+
+    def _chunks(
+            self,
+            options: EchoOptions,
+            response: EchoResponse,
+            model: str,
+            messages: List[MessageDict],
+            kwargs: Dict[str, Any],
+    ) -> Generator[Tuple[float, ModelResponseStream], None, None]:
+        """Yields the chunks of the stream with the delay before each of them."""
+        response_id = IProtocolAdapter.get_chat_completion_id()
+        created = int(time.time())
+        interval = 1 / options.tokens_per_second if options.tokens_per_second else 0.0
+        reasoning, content, arguments = self._tokens(response)
+        deltas: List[Dict[str, Any]] = [{"reasoning_content": piece} for piece in reasoning]
+        deltas += [{"content": piece} for piece in content]
+        for index, call in enumerate(self._tool_calls(response)):
+            deltas.append({"tool_calls": [{
+                "index": index, "id": call["id"], "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": ""},
+            }]})
+            deltas += [
+                {"tool_calls": [{"index": index, "function": {"arguments": piece}}]}
+                for piece in arguments[index]
+            ]
+        if not deltas:
+            deltas.append({"content": ""})
+        deltas[0]["role"] = Role.assistant.value
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, usage: Optional[Dict[str, int]] = None):
+            return ModelResponseStream(**IProtocolAdapter.create_base_response(
+                model=model,
+                is_chunk=True,
+                response_id=response_id,
+                created_timestamp=created,
+                choices=[IProtocolAdapter.create_choice(delta, finish_reason=finish_reason, is_chunk=True)],
+                usage=usage,
+            ))
+
+        for position, delta in enumerate(deltas):
+            yield (options.ttft if position == 0 else interval), chunk(delta)
+        finish_reason = FinishReason.tool_calls.value if response.tool_calls else FinishReason.stop.value
+        include_usage = (kwargs.get("stream_options") or {}).get("include_usage", False)
+        yield 0.0, chunk({}, finish_reason, self._usage(messages, response) if include_usage else None)
+
+
+def _message_text(message: MessageDict) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content if isinstance(content, str) else ""
@@ -1,8 +1,8 @@
 from typing import Optional, Union, ClassVar, Type, Sequence, List, Dict, Any, AsyncGenerator, Generator, Callable, get_args
 
-from pydantic import Field, PrivateAttr, BaseModel
-from functools import singledispatchmethod
-from copy import deepcopy
+from pydantic import Field, PrivateAttr, BaseModel, ConfigDict
+from functools import singledispatchmethod, lru_cache
+from bisect import bisect_right
 import os
 from importlib.metadata import version, PackageNotFoundError
 from packaging.version import Version
@@ -17,7 +17,7 @@ from litellm.utils import Delta, Message, ModelResponse, ModelResponseStream, fu
 from litellm.litellm_core_utils.get_supported_openai_params import get_supported_openai_params
 
 from just_agents.interfaces.function_call import IFunctionCall, ToolByNameCallback
-from just_agents.interfaces.protocol_adapter import IProtocolAdapter, ExecuteToolCallback
+from just_agents.interfaces.protocol_adapter import IProtocolAdapter, IStreamAccumulator, ExecuteToolCallback
 from just_agents.data_classes import Role, ToolCall, FinishReason, GoogleBuiltInTools
 from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
 from just_agents.types import MessageDict
@@ -25,6 +25,9 @@ from just_agents.just_bus import JustLogBus
 
 SupportedResponse=Union[ModelResponse, ModelResponseStream, MessageDict]
 
+CACHE_CONTROL = {"type": "ephemeral"}
+"""Prompt cache breakpoint of the providers with explicit prompt caching."""
+
 class LiteLLMFunctionCall(ToolCall, IFunctionCall[MessageDict]):
     def execute_function(self, call_by_name: ToolByNameCallback):
         function_args = self.arguments or {}
@@ -36,8 +39,22 @@ class LiteLLMFunctionCall(ToolCall, IFunctionCall[MessageDict]):
                 function_response = str(function_to_call(**function_args))
             except Exception as e:
                 function_response = f"Error occurred during call: '{str(e)}'"
-        message = {"role": Role.tool.value, "content": function_response, "name": self.name, "tool_call_id": self.id}
-        return message
+        return self._tool_message(function_response)
+
+    async def aexecute_function(self, call_by_name: ToolByNameCallback):
+        function_args = self.arguments or {}
+        if isinstance(function_args, str):
+            function_response = f"Incorrect arguments received: '{function_args}'" #error on validation
+        else:
+            try:
+                function_to_call = call_by_name(self.name)
+                function_response = str(await function_to_call(**function_args))
+            except Exception as e:
+                function_response = f"Error occurred during call: '{str(e)}'"
+        return self._tool_message(function_response)
+
+    def _tool_message(self, function_response: str) -> MessageDict:
+        return {"role": Role.tool.value, "content": function_response, "name": self.name, "tool_call_id": self.id}
 
     @staticmethod
     def reconstruct_tool_call_message(calls: Sequence['LiteLLMFunctionCall']) -> dict:
@@ -72,11 +89,199 @@ def get_valid_models() -> List[str]: #override of litellm_helper, key-independen
             valid_models.extend(models_for_provider)
             
     return valid_models
+
+
+class ModelCatalog:
+    """
+    Hashed index of the litellm model names, with a lowercased haystack of the whole catalog
+    for the 'did you forget the provider' suggestions given for unknown models.
+    """
+
+    def __init__(self, models: List[str]):
+        self.models = list(models)
+        self._index = frozenset(self.models)
+        self._haystack = "\n".join(name.lower() for name in self.models)
+        self._offsets: List[int] = []
+        offset = 0
+        for name in self.models:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+        self._suggestions: Dict[str, Optional[str]] = {}
+
+    def __contains__(self, model: str) -> bool:
+        return model in self._index
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def suggest(self, model: str) -> Optional[str]:
+        """Returns the first catalog model containing the given name, case-insensitive."""
+        if model not in self._suggestions:
+            position = self._haystack.find(model.lower()) if "\n" not in model else -1
+            self._suggestions[model] = self.models[bisect_right(self._offsets, position) - 1] if position >= 0 else None
+        return self._suggestions[model]
+
+
+class ModelCapabilities(BaseModel):
+    """
+    Completion parameters and features litellm reports for a catalog model.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    supported_params: List[str] = Field(default_factory=list, description="OpenAI parameters the model accepts")
+    response_schema: bool = Field(False, description="Whether the model accepts a JSON schema as response_format")
+    function_calling: bool = Field(False, description="Whether the model supports tool calls")
+    reasoning: bool = Field(False, description="Whether the model accepts reasoning_effort")
+
+
+@lru_cache(maxsize=None)
+def model_capabilities(model: str) -> ModelCapabilities:
+    """
+    Looks the capabilities of a catalog model up once per process.
+    Call model_capabilities.cache_clear() after registering custom models with litellm.
+    """
+    return ModelCapabilities(
+        supported_params=get_supported_openai_params(model) or [],
+        response_schema=bool(supports_response_schema(model)),
+        function_calling=bool(supports_function_calling(model)),
+        reasoning=bool(supports_reasoning(model)),
+    )
+
+
+class LiteLLMStreamAccumulator(IStreamAccumulator[ModelResponse, ModelResponseStream, MessageDict]):
+    """
+    Folds the deltas of a LiteLLM stream into a message as the chunks arrive.
+    Content and reasoning pieces are joined once at the end, tool call fragments are merged by index,
+    thinking blocks are closed on their signature, so the message is the same stream_chunk_builder
+    assembles from the full chunk list, without keeping the chunks.
+    """
+
+    def __init__(self):
+        self.chunks = 0
+        self.id: Optional[str] = None
+        self.model: Optional[str] = None
+        self.created: Optional[int] = None
+        self.role: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[Any] = None
+        self._content: Optional[List[str]] = None
+        self._reasoning: Optional[List[str]] = None
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+        self._thinking_blocks: List[Dict[str, Any]] = []
+        self._thinking: List[str] = []
+
+    def add(self, chunk: ModelResponseStream) -> MessageDict:
+        self.chunks += 1
+        self.id = self.id or chunk.id
+        self.model = self.model or chunk.model
+        self.created = self.created or chunk.created
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            self.usage = usage
+        if not chunk.choices:
+            return {}
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        delta = choice.delta
+        text: MessageDict = {}
+        if delta.role:
+            self.role = text["role"] = delta.role
+        if delta.content is not None:
+            if self._content is None:
+                self._content = []
+            self._content.append(delta.content)
+            text["content"] = delta.content
+        reasoning = getattr(delta, "reasoning_content", None)
+        if reasoning is not None:
+            if self._reasoning is None:
+                self._reasoning = []
+            self._reasoning.append(reasoning)
+        if delta.tool_calls:
+            for tool_call in delta.tool_calls:
+                self._add_tool_call(tool_call)
+        thinking_blocks = getattr(delta, "thinking_blocks", None)
+        if thinking_blocks:
+            for block in thinking_blocks:
+                self._add_thinking_block(block)
+        return text
+
+    def _add_tool_call(self, tool_call: Any) -> None:
+        call = self._tool_calls.setdefault(tool_call.index or 0, {
+            "id": None, "type": None, "name": None, "arguments": [], "provider_specific_fields": None
+        })
+        if tool_call.id:
+            call["id"] = tool_call.id
+        if tool_call.type:
+            call["type"] = tool_call.type
+        function = tool_call.function
+        if function is not None:
+            if function.name:
+                call["name"] = function.name
+            if function.arguments:
+                call["arguments"].append(function.arguments)
+        provider_fields = getattr(tool_call, "provider_specific_fields", None) \
+            or getattr(function, "provider_specific_fields", None)
+        if isinstance(provider_fields, dict) and provider_fields:
+            call["provider_specific_fields"] = {**(call["provider_specific_fields"] or {}), **provider_fields}
+
+    def _add_thinking_block(self, block: Dict[str, Any]) -> None:
+        if block.get("type") == "redacted_thinking":
+            self._thinking.clear()  # an unsigned block in progress is dropped
+            if block.get("data"):
+                self._thinking_blocks.append({"type": "redacted_thinking", "data": block["data"]})
+            return
+        if block.get("thinking"):
+            self._thinking.append(block["thinking"])
+        if block.get("signature"):
+            self._thinking_blocks.append(
+                {"type": "thinking", "thinking": "".join(self._thinking), "signature": block["signature"]}
+            )
+            self._thinking.clear()
+
+    def message(self) -> MessageDict:
+        message: MessageDict = {"role": self.role or Role.assistant.value}
+        if self._content is not None:
+            message["content"] = "".join(self._content)
+        tool_calls = []
+        for index in sorted(self._tool_calls):
+            call = self._tool_calls[index]
+            if not (call["id"] and call["name"]):
+                continue  # incomplete fragments are dropped, as stream_chunk_builder does
+            tool_call = {
+                "id": call["id"],
+                "type": call["type"] or "function",
+                "function": {"name": call["name"], "arguments": "".join(call["arguments"]) or "{}"},
+            }
+            if call["provider_specific_fields"]:
+                tool_call["provider_specific_fields"] = call["provider_specific_fields"]
+            tool_calls.append(tool_call)
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        if self._reasoning is not None:
+            message["reasoning_content"] = "".join(self._reasoning)
+        if self._thinking_blocks:
+            message["thinking_blocks"] = list(self._thinking_blocks)
+        return message
+
+    def response(self) -> ModelResponse:
+        response = IProtocolAdapter.create_base_response(
+            model=self.model,
+            response_id=self.id,
+            created_timestamp=self.created,
+            choices=[IProtocolAdapter.create_choice(self.message(), finish_reason=self.finish_reason or FinishReason.stop.value)],
+        )
+        if self.usage is not None:
+            response["usage"] = self.usage
+        return ModelResponse(**response)
+
+
 class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Union[CustomStreamWrapper, CustomStreamWrapper]]):
     #Class that describes function convention
 
     function_convention: ClassVar[Type[IFunctionCall[MessageDict]]] = LiteLLMFunctionCall
     valid_models: ClassVar[List[str]] = get_valid_models()
+    model_catalog: ClassVar[ModelCatalog] = ModelCatalog(valid_models)
     log_name: str = Field('anonymous')
     _log_bus : JustLogBus = PrivateAttr(default_factory= lambda: JustLogBus())
 
@@ -92,11 +297,6 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
         # Extract and preprocess the model from kwargs
         model = kwargs.get('model')
         messages = kwargs.get('messages')
-        if '/' in model:
-            provider = model.split('/')[0]
-        else:
-            provider = None
-
         if not model:
             self._log_bus.fatal(
                 f"Model is required",
@@ -113,6 +313,7 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
                 model=model
             )
             raise ValueError("Messages are required")
+        provider = model.split('/')[0] if '/' in model else None
 
         for internal_kwarg in ["raise_on_completion_status_errors", "reconstruct_chunks"]:
             if kwargs.pop(internal_kwarg, None) is not None:
@@ -127,35 +328,28 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
             if key is None:
                 kwargs.pop(key) #remove None keys
 
-        messages = deepcopy(messages) #defnsive copy to avoid mutating original messages
-        if "anthropic" in model.lower() or "claude" in model.lower() or "opus" in model.lower() or "sonnet" in model.lower():
-            anthropic_reasoning = True
-        else:
-            anthropic_reasoning = False
-        
-        for message in messages:
-            message["reasoning"] = message.pop("reasoning", None)
-            message["reasoning_content"] = message.pop("reasoning_content", None)
-            if not anthropic_reasoning: 
-                message.pop("thinking_blocks", None)
+        model_name = model.lower()
+        anthropic_reasoning = any(marker in model_name for marker in ("anthropic", "claude", "opus", "sonnet"))
+        # shallow copies: the message dicts are shared by the agent memory and its forks,
+        # changes made to the request by litellm or its callbacks must not reach them
+        kwargs["messages"] = [
+            {key: value for key, value in message.items() if anthropic_reasoning or key != "thinking_blocks"}
+            if isinstance(message, dict) else message
+            for message in messages
+        ]
 
         api_base = kwargs.get('api_base')
 
-        if model not in self.valid_models:
+        if model not in self.model_catalog:
             if not api_base:
                 self._log_bus.warn(
                     f"Model is not supported by litellm by default! Validation is impossible.",
                     source=source,
                     action="validation_canceled",
                     model=model,
-                    valid_models=self.valid_models
+                    valid_models_count=len(self.model_catalog)
                 )  
-                suggestion = None
-                if not provider:
-                    for valid_model in self.valid_models:
-                        if model.lower() in valid_model.lower():
-                            suggestion = valid_model
-                            break
+                suggestion = None if provider else self.model_catalog.suggest(model)
                 if suggestion:
                     self._log_bus.warn(
                         f"Litellm supports {suggestion}. Did you forget to set provider?",
@@ -175,7 +369,8 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
                 kwargs["custom_llm_provider"] = provider
             return args, kwargs
 
-        supported_params = self.get_supported_params(model) or []
+        capabilities = model_capabilities(model)
+        supported_params = capabilities.supported_params
         if not "response_format" in supported_params:
             kwargs.pop("response_format", None)
             self._log_bus.warn(
@@ -185,7 +380,7 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
                 model=model
             )
 
-        if kwargs.get("response_format", None) and not supports_response_schema(model):
+        if kwargs.get("response_format", None) and not capabilities.response_schema:
             fallback = {"type": "json_object"}
             self._log_bus.warn(
                 f"response_schema is not supported by model, using json_object as fallback",
@@ -197,7 +392,7 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
             )
             kwargs["response_format"] = fallback
 
-        if "tools" in kwargs and not supports_function_calling(model):
+        if "tools" in kwargs and not capabilities.function_calling:
             kwargs.pop("tools", None)
             kwargs.pop("tool_choice", None)
             self._log_bus.warn(
@@ -207,7 +402,7 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
                 model=model
             )
 
-        if "reasoning_effort" in kwargs and not supports_reasoning(model):
+        if "reasoning_effort" in kwargs and not capabilities.reasoning:
             kwargs.pop("reasoning_effort", None)
             self._log_bus.warn(
                 f"reasoning_effort not supported by model",
@@ -229,6 +424,31 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
         # Return sanitized arguments
         return args, kwargs
 
+    @staticmethod
+    def uses_cache_breakpoints(model: str) -> bool:
+        """Anthropic models cache only the prefixes marked with cache_control, the other providers cache them automatically."""
+        model_name = model.lower()
+        return model_name.startswith("anthropic/") or "claude" in model_name
+
+    def add_cache_breakpoints(self, kwargs: Dict[str, Any]) -> None:
+        """
+        Marks the stable prefix of the request as cacheable: the tool list, the first system prompt and the latest message,
+        so that the next step of the conversation reads the prefix this one writes. Nothing is marked for the providers
+        caching prefixes automatically. The marked messages and tools are copies, the caller's ones are left intact.
+        """
+        if not self.uses_cache_breakpoints(kwargs.get("model") or ""):
+            return
+        tools = kwargs.get("tools")
+        if tools and "function" in tools[-1]:
+            kwargs["tools"] = [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]
+        messages = list(kwargs["messages"])
+        positions = {len(messages) - 1}
+        if messages[0].get("role") == Role.system:
+            positions.add(0)
+        for position in positions:
+            messages[position] = _with_cache_control(messages[position])
+        kwargs["messages"] = messages
+
     def tool_from_function(self, tool: Callable, function_dict: Dict[str, Any] = None, use_litellm: bool = False
     ) -> Union[ChatCompletionToolParam, Dict[str, Any]]:
         """
@@ -285,15 +505,27 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
             function=function_dict
         )
 
+    def _provider_completion(self, *args, **kwargs) -> Union[ModelResponse, CustomStreamWrapper, Generator]:
+        """The call to the provider, overridden by the adapters answering locally."""
+        return completion(*args, **kwargs)
+
+    async def _provider_acompletion(self, *args, **kwargs) \
+            -> Union[ModelResponse, CustomStreamWrapper, AsyncGenerator[Any, None]]:
+        """Async counterpart of _provider_completion."""
+        return await acompletion(*args, **kwargs)
+
     def completion(self, *args, **kwargs) -> Union[ModelResponse, CustomStreamWrapper, Generator]:
         # Sanitize arguments before calling the completion method
         raise_on_completion_status_errors = kwargs.pop("raise_on_completion_status_errors", False)
+        prompt_caching = kwargs.pop("prompt_caching", False)
         args, kwargs = self.sanitize_args(*args, **kwargs)
+        if prompt_caching:
+            self.add_cache_breakpoints(kwargs)
         stream = kwargs.get("stream", None)
         model = kwargs.get("model", "")
         source = f"{self.log_name}.completion"
         try:
-            return completion(*args, **kwargs)
+            return self._provider_completion(*args, **kwargs)
         except APIStatusError as e:
             self._log_bus.error(
                 "Error in completion",
@@ -324,11 +556,14 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
             -> Union[ModelResponse, CustomStreamWrapper, AsyncGenerator[Any, None]]:
         # Sanitize arguments before calling the async_completion method
         raise_on_completion_status_errors = kwargs.pop("raise_on_completion_status_errors", False)
+        prompt_caching = kwargs.pop("prompt_caching", False)
         args, kwargs = self.sanitize_args(*args, **kwargs)
+        if prompt_caching:
+            self.add_cache_breakpoints(kwargs)
         stream = kwargs.get("stream", None)
         source = f"{self.log_name}.async_completion"
         try:
-            return await acompletion(*args, **kwargs)
+            return await self._provider_acompletion(*args, **kwargs)
         except APIStatusError as e:
             self._log_bus.log_message(
                 "Error in async_completion",
@@ -350,6 +585,16 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
                     str(e), 
                     kwargs.get("model", ""),
                 )
+        except Exception as e:
+            self._log_bus.fatal(
+                "Unhandled exception in async_completion!!",
+                source=source,
+                action="exception",
+                args=args,
+                kwargs=kwargs,
+                error=e
+            )
+            raise e
 
     # TODO: use https://docs.litellm.ai/docs/providers/custom_llm_server as mock for tests
 
@@ -507,6 +752,9 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
         message.choices[0].message.tool_calls = tool_calls
         return message
 
+    def stream_accumulator(self) -> LiteLLMStreamAccumulator:
+        return LiteLLMStreamAccumulator()
+
     @staticmethod
     def response_from_deltas(chunks: List[ModelResponseStream]) -> ModelResponse:
         return stream_chunk_builder(chunks=chunks)
@@ -626,6 +874,14 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
             include_token_details=False
         ))
 
+    @staticmethod
+    def response_from_dict(data: Dict[str, Any]) -> ModelResponse:
+        return ModelResponse(**data)
+
+    @staticmethod
+    def chunk_from_dict(data: Dict[str, Any]) -> ModelResponseStream:
+        return ModelResponseStream(**data)
+
     def create_streaming_chunks_from_text_wrapper(
         self,
         content: str,
@@ -675,4 +931,11 @@ class LiteLLMAdapter(BaseModel, IProtocolAdapter[ModelResponse, MessageDict, Uni
    
 
 
-
+def _with_cache_control(message: MessageDict) -> MessageDict:
+    """Copy of the message with a cache breakpoint on its last text block, the message itself if it has no text."""
+    content = message.get("content")
+    if isinstance(content, str) and content:
+        return {**message, "content": [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]}
+    if isinstance(content, list) and content and isinstance(content[-1], dict) and content[-1].get("type") == "text":
+        return {**message, "content": [*content[:-1], {**content[-1], "cache_control": CACHE_CONTROL}]}
+    return message
@@ -24,9 +24,9 @@ class ProtocolAdapterFactory:
         if mode == StreamingMode.openai:
             from just_agents.protocols.litellm_protocol import LiteLLMAdapter
             return LiteLLMAdapter(log_name=log_name, **kwargs)
-        # elif mode == StreamingMode.echo:
-        #     from just_agents.protocols.echo_protocol import EchoProtocolAdapter
-        #     return EchoProtocolAdapter(**kwargs)
+        elif mode == StreamingMode.echo:
+            from just_agents.protocols.echo_protocol import EchoProtocolAdapter
+            return EchoProtocolAdapter(log_name=log_name, **kwargs)
         else:
             raise ValueError("Unknown streaming method")
 
@@ -1,5 +1,27 @@
-from typing import Any, Union, Optional, Dict
+from typing import Any, Union, Optional, Dict, List, Tuple
 import json
+import time
+
+# Try to import orjson but fall back to the standard library if not available
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+ENVELOPE_KEYS = ("id", "object", "created", "model")
+"""Fields shared by all the chunks of a chat completion stream."""
+
+
+def json_bytes(data: Any) -> bytes:
+    """Compact UTF-8 JSON of the data, serialized with orjson when it is installed."""
+    if _ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass  # e.g. integers over 64 bits, left to the standard library
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 
 class ServerSentEventsStream:
     # https://developer.mozilla.org/en-US/docs/Web/API/Server-sent_events/Using_server-sent_events#event_stream_format
@@ -37,23 +59,18 @@ class ServerSentEventsStream:
             NotImplementedError:
                 If the data type is not supported by the SSE protocol.
         """
-        lines = []
-
-        if event:
-            # Insert the "event" field only if event is provided
-            lines.append(f"event: {event}")
-
         if isinstance(data, str):
-            lines.append(f"data: {data}")
+            payload = data
         elif isinstance(data, dict):
             # Serialize dictionaries to JSON
-            lines.append(f"data: {json.dumps(data)}")
+            payload = json_bytes(data).decode("utf-8")
         else:
             raise NotImplementedError("Data type not supported by the SSE protocol.")
 
-        # Append a blank line to separate events
-        lines.append("")
-        return "\n".join(lines) + "\n"
+        # Insert the "event" field only if event is provided, a blank line separates the events
+        if event:
+            return f"event: {event}\ndata: {payload}\n\n"
+        return f"data: {payload}\n\n"
 
     @staticmethod
     def sse_parse(sse_text: str) -> Dict[str, Any]:
@@ -117,3 +134,110 @@ class ServerSentEventsStream:
             "event": event,
             "data": parsed_data,
         }
+
+
+class SSEStreamEncoder:
+    """
+    Encoder of the messages of one SSE stream of chat completion chunks, in the sse_wrap format, as str or bytes.
+
+    The envelope the chunks of a stream share (id, object, created, model) is serialized once and spliced
+    in front of the rest of every chunk. Consecutive content deltas can be coalesced into one message
+    until coalesce_seconds have passed since the first of them or coalesce_bytes of content are pending,
+    so that token-sized deltas cost fewer serializations and writes per client.
+    The window is checked as the chunks arrive, call flush() before a pause in the stream, e.g. a tool call.
+    """
+
+    def __init__(self, as_bytes: bool = False, coalesce_seconds: float = 0.0, coalesce_bytes: int = 0):
+        self.as_bytes = as_bytes
+        self.coalesce_seconds = coalesce_seconds
+        self.coalesce_bytes = coalesce_bytes
+        self._envelope: Optional[Tuple[Any, ...]] = None
+        self._prefix = b""
+        self._pending: Optional[Dict[str, Any]] = None
+        self._pending_content: List[str] = []
+        self._pending_size = 0
+        self._pending_since = 0.0
+
+    @property
+    def coalescing(self) -> bool:
+        return self.coalesce_seconds > 0 or self.coalesce_bytes > 0
+
+    def encode(self, data: Union[Dict[str, Any], str], event: Optional[str] = None) -> List[Union[str, bytes]]:
+        """Returns the messages ready to be sent, none if the chunk is held back to be coalesced."""
+        if self.coalescing and event is None and isinstance(data, dict) and self._coalescable(data):
+            return self._coalesce(data)
+        messages = self.flush()
+        messages.append(self._message(data, event))
+        return messages
+
+    def flush(self) -> List[Union[str, bytes]]:
+        """Returns the message of the coalesced content deltas, if any are pending."""
+        if self._pending is None:
+            return []
+        chunk = self._pending
+        chunk["choices"][0]["delta"]["content"] = "".join(self._pending_content)
+        self._pending = None
+        self._pending_content = []
+        self._pending_size = 0
+        return [self._message(chunk)]
+
+    @staticmethod
+    def _coalescable(chunk: Dict[str, Any]) -> bool:
+        choices = chunk.get("choices")
+        if not choices or len(choices) != 1 or chunk.get("usage"):
+            return False
+        choice = choices[0]
+        delta = choice.get("delta")
+        if choice.get("finish_reason") or choice.get("logprobs") or not isinstance(delta, dict):
+            return False
+        if not isinstance(delta.get("content"), str):
+            return False
+        return all(value is None for key, value in delta.items() if key not in ("content", "role"))
+
+    def _coalesce(self, chunk: Dict[str, Any]) -> List[Union[str, bytes]]:
+        messages: List[Union[str, bytes]] = []
+        if self._pending is not None and (
+                chunk.get("id") != self._pending.get("id") or chunk["choices"][0]["delta"].get("role")
+        ):
+            messages = self.flush()  # a new message starts
+        content = chunk["choices"][0]["delta"]["content"]
+        if self._pending is None:
+            self._pending = chunk
+            self._pending_since = time.monotonic()
+        self._pending_content.append(content)
+        self._pending_size += len(content)
+        if (self.coalesce_bytes and self._pending_size >= self.coalesce_bytes) or \
+                (self.coalesce_seconds and time.monotonic() - self._pending_since >= self.coalesce_seconds):
+            messages.extend(self.flush())
+        return messages
+
+    def _json(self, chunk: Dict[str, Any]) -> bytes:
+        envelope = tuple(chunk.get(key) for key in ENVELOPE_KEYS)
+        rest = {key: value for key, value in chunk.items() if key not in ENVELOPE_KEYS}
+        if None in envelope or not rest:
+            return json_bytes(chunk)
+        if envelope != self._envelope:
+            self._envelope = envelope
+            self._prefix = json_bytes(dict(zip(ENVELOPE_KEYS, envelope)))[:-1] + b","
+        return self._prefix + json_bytes(rest)[1:]
+
+    def _message(self, data: Union[Dict[str, Any], str], event: Optional[str] = None) -> Union[str, bytes]:
+        if isinstance(data, str):
+            payload = data.encode("utf-8")
+        elif isinstance(data, dict):
+            payload = self._json(data)
+        else:
+            raise NotImplementedError("Data type not supported by the SSE protocol.")
+        message = b"data: " + payload + b"\n\n"
+        if event:
+            message = b"event: " + event.encode("utf-8") + b"\n" + message
+        return message if self.as_bytes else message.decode("utf-8")
+
+
+class ChunkPassthroughEncoder(SSEStreamEncoder):
+    """
+    Encoder returning the chunks as they are, dicts and not SSE messages, for consumers of a stream in the same process.
+    """
+
+    def _message(self, data: Union[Dict[str, Any], str], event: Optional[str] = None) -> Union[Dict[str, Any], str]:  # type: ignore
+        return data
@@ -0,0 +1,166 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Any, Callable, Coroutine, List, Literal, Optional, Sequence
+
+from just_agents.just_bus import SingletonMeta
+
+ToolExecutorMode = Literal["inline", "thread", "process"]
+"""Where a synchronous tool runs: in the calling thread, the shared thread pool or the shared process pool."""
+
+DEFAULT_MAX_THREADS = 32
+"""Size of the shared thread pool of the tools."""
+
+
+def _timeout_error(tool_name: str, timeout_s: float) -> TimeoutError:
+    return TimeoutError(f"Tool {tool_name} timed out after {timeout_s} seconds")
+
+
+class ToolExecutors(metaclass=SingletonMeta):
+    """
+    Process-wide bounded pools the tools run in, created on first use.
+
+    Synchronous tools run inline, in the thread pool or in the process pool, so that CPU-bound tools can use
+    several cores. A thread can't be stopped, a tool timing out in the thread pool keeps running and holds its worker
+    until it returns, only the caller stops waiting. A process can: a process-mode call with a timeout runs in
+    a process of its own, which is terminated when the call times out, the calls of other tools are not affected.
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_MAX_THREADS, max_processes: Optional[int] = None):
+        self.max_threads = max_threads
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._worker = threading.local()
+
+    def pool(self, mode: ToolExecutorMode) -> Executor:
+        """Returns the shared pool of the thread or process mode."""
+        with self._lock:
+            if mode == "process":
+                if self._processes is None:
+                    # spawned workers do not inherit the locks held by the threads of the agent
+                    self._processes = ProcessPoolExecutor(self.max_processes, mp_context=multiprocessing.get_context("spawn"))
+                return self._processes
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    self.max_threads, thread_name_prefix="just_tools", initializer=setattr, initargs=(self._worker, "active", True)
+                )
+            return self._threads
+
+    def on_worker(self) -> bool:
+        """True in a worker of the thread pool, waiting on the pool from there could deadlock it."""
+        return getattr(self._worker, "active", False)
+
+    @staticmethod
+    def _dedicated_pool(mode: ToolExecutorMode, timeout_s: Optional[float]) -> Optional[ProcessPoolExecutor]:
+        """Single-process pool of a timed process-mode call, which can be killed without failing other calls."""
+        if mode != "process" or timeout_s is None:
+            return None
+        return ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+
+    @staticmethod
+    def _kill(pool: Executor) -> None:
+        """Terminates the workers of a dedicated process pool."""
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _effective_mode(mode: ToolExecutorMode, timeout_s: Optional[float]) -> ToolExecutorMode:
+        return "thread" if mode == "inline" and timeout_s is not None else mode  # only a pool can enforce a timeout
+
+    def run(self, mode: ToolExecutorMode, timeout_s: Optional[float], tool_name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Runs a synchronous tool, raising TimeoutError if it does not return within timeout_s seconds."""
+        mode = self._effective_mode(mode, timeout_s)
+        if mode == "inline" or (mode == "thread" and timeout_s is None and self.on_worker()):
+            return func(*args, **kwargs)
+        dedicated = self._dedicated_pool(mode, timeout_s)
+        pool = dedicated or self.pool(mode)
+        if mode == "process":
+            future: Future = pool.submit(partial(func, *args, **kwargs))
+        else:
+            future = pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout_s)
+        except (TimeoutError, FutureTimeoutError):  # distinct classes before Python 3.11
+            if future.done():  # raised by the tool itself
+                raise
+            if not future.cancel() and dedicated is not None:
+                self._kill(dedicated)
+            raise _timeout_error(tool_name, timeout_s) from None
+        finally:
+            if dedicated is not None:
+                dedicated.shutdown(wait=False)
+
+    async def arun(self, mode: ToolExecutorMode, timeout_s: Optional[float], tool_name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of run, the calling event loop is never blocked: inline tools run in a worker thread."""
+        mode = self._effective_mode(mode, timeout_s)  # a thread timing out would hold up the shutdown of the loop executor
+        dedicated = self._dedicated_pool(mode, timeout_s)
+        if mode == "inline":
+            call = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        else:
+            target = partial(func, *args, **kwargs)
+            if mode == "thread":
+                target = partial(contextvars.copy_context().run, target)
+            call = asyncio.get_running_loop().run_in_executor(dedicated or self.pool(mode), target)
+        try:
+            done, _ = await asyncio.wait({call}, timeout=timeout_s)
+            if not done:
+                call.cancel()
+                if dedicated is not None:
+                    self._kill(dedicated)
+                raise _timeout_error(tool_name, timeout_s)
+            return call.result()
+        finally:
+            if dedicated is not None:
+                dedicated.shutdown(wait=False)
+
+    def map(self, func: Callable[[Any], Any], items: Sequence[Any], max_parallel: int) -> List[Any]:
+        """
+        Calls func on every item in the thread pool, at most max_parallel calls at a time, returns the results in order.
+        Each call runs in a copy of the calling context. In a worker of the pool the calls run one after another.
+        """
+        if max_parallel <= 1 or len(items) <= 1 or self.on_worker():
+            return [func(item) for item in items]
+        pool = self.pool("thread")
+        slots = threading.BoundedSemaphore(max_parallel)
+        futures: List[Future] = []
+        for item in items:
+            slots.acquire()
+            future = pool.submit(contextvars.copy_context().run, func, item)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def with_timeout(func: Callable[..., Coroutine[Any, Any, Any]], timeout_s: Optional[float], tool_name: str) -> Callable[..., Coroutine[Any, Any, Any]]:
+        """Wraps a coroutine function of an async tool, cancelling it after timeout_s seconds."""
+        if timeout_s is None:
+            return func
+
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=timeout_s)
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            if not done:
+                task.cancel()
+                raise _timeout_error(tool_name, timeout_s)
+            return task.result()
+        return timed
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts the pools down, they are created again on the next call."""
+        with self._lock:
+            pools, self._threads, self._processes = [self._threads, self._processes], None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,351 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from just_agents.base_agent import BaseAgent
+from just_agents.interfaces.function_call import IFunctionCall
+from just_agents.just_tool import JustToolsBus, JustTransientTool
+from just_agents.protocols.protocol_factory import StreamingMode
+from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
+from just_agents.web.rest_api import AgentRestAPI, overrides_sync_only
+from fastapi.testclient import TestClient
+
+# litellm mock_response / mock_tool_calls make these tests fully offline
+MOCK_OPTIONS = {
+    "model": "gpt-4.1-nano",
+    "temperature": 0.0,
+    "api_key": "sk-mock",
+    "mock_response": "hello world",
+}
+
+secret_calls = []
+
+async def get_secret(word: str) -> str:
+    """Returns the secret associated with a word."""
+    await asyncio.sleep(0.01)
+    secret_calls.append(word)
+    return f"secret-{word}"
+
+def get_secret_sync(word: str) -> str:
+    """Returns the secret associated with a word, synchronously."""
+    secret_calls.append(word)
+    return f"secret-{word}"
+
+def mock_tool_options(tool_name: str) -> dict:
+    return {
+        **MOCK_OPTIONS,
+        "mock_tool_calls": [{
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": tool_name, "arguments": "{\"word\": \"abc\"}"}
+        }]
+    }
+
+def test_aquery_matches_query():
+    agent = BaseAgent(llm_options=MOCK_OPTIONS)
+    assert asyncio.run(agent.aquery("hi")) == agent.query("hi") == "hello world"
+
+def test_astream_yields_sse_chunks():
+    agent = BaseAgent(llm_options=MOCK_OPTIONS)
+
+    async def collect():
+        return [chunk async for chunk in agent.astream("hi")]
+
+    chunks = asyncio.run(collect())
+    assert chunks[-1] == SSE.sse_wrap(agent._protocol.stop)
+    content = "".join(
+        SSE.sse_parse(chunk)["data"]["choices"][0]["delta"].get("content") or ""
+        for chunk in chunks[:-1]
+    )
+    assert content == "hello world"
+
+@pytest.mark.parametrize("tool", [get_secret, get_secret_sync])
+def test_aquery_tool_loop(tool):
+    secret_calls.clear()
+    agent = BaseAgent(llm_options=mock_tool_options(tool.__name__), tools=[tool], max_tool_calls=3)
+    result = asyncio.run(agent.aquery("What is the secret for abc?"))
+    assert result == "hello world"
+    # the mock always requests the tool, the fuse makes the final step tool-less
+    assert secret_calls == ["abc", "abc"]
+    tool_messages = [m for m in agent.memory.messages if m.get("role") == "tool"]
+    assert [m["content"] for m in tool_messages] == ["secret-abc", "secret-abc"]
+    assert agent.tools[tool.__name__].get_callable_async() is not None
+
+@pytest.mark.parametrize("method", ["query", "stream", "aquery", "astream"])
+def test_tool_loops_break_the_fuse_alike(method):
+    secret_calls.clear()
+    always_call = {"rules": [{"response": {"tool_calls": [{"name": "get_secret", "arguments": {"word": "abc"}}]}}]}
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo", "echo": always_call},
+        tools=[get_secret],
+        max_tool_calls=3,
+    )
+
+    async def collect():
+        if method == "aquery":
+            return await agent.aquery("What is the secret for abc?")
+        return [chunk async for chunk in agent.astream("What is the secret for abc?")]
+
+    if method == "query":
+        agent.query("What is the secret for abc?")
+    elif method == "stream":
+        list(agent.stream("What is the secret for abc?"))
+    else:
+        asyncio.run(collect())
+    # the calls of the final, tool-less step are not executed
+    assert secret_calls == ["abc", "abc"]
+
+class SyncOnlyCall(IFunctionCall[dict]):
+    def __init__(self, name: str):
+        self.id, self.type, self.name = "call_1", "function", name
+
+    def execute_function(self, call_by_name):
+        return {"role": "tool", "tool_call_id": self.id, "content": call_by_name(self.name)(word="abc")}
+
+    @staticmethod
+    def reconstruct_tool_call_message(calls):
+        return {"role": "assistant", "tool_calls": [{"id": call.id} for call in calls]}
+
+@pytest.mark.parametrize("tool", [get_secret, get_secret_sync])
+def test_default_aexecute_function_runs_in_a_thread(tool):
+    secret_calls.clear()
+    message = asyncio.run(SyncOnlyCall(tool.__name__).aexecute_function(lambda name: tool))
+    assert message["content"] == "secret-abc"
+    assert secret_calls == ["abc"]
+
+def test_aquery_falls_back_to_backup_options():
+    agent = BaseAgent(
+        llm_options={**MOCK_OPTIONS, "mock_response": Exception("primary is down")},
+        backup_options={**MOCK_OPTIONS, "mock_response": "from backup"},
+    )
+    assert asyncio.run(agent.aquery("hi")) == "from backup"
+
+def mock_parallel_options(tool_name: str, words: list) -> dict:
+    return {
+        **MOCK_OPTIONS,
+        "mock_tool_calls": [{
+            "id": f"call_{i}",
+            "type": "function",
+            "function": {"name": tool_name, "arguments": f"{{\"word\": \"{word}\"}}"}
+        } for i, word in enumerate(words)]
+    }
+
+def slow_lookup(word: str) -> str:
+    """Looks up a word, slowly."""
+    time.sleep(0.3 if word == "first" else 0.15)
+    return f"result-{word}"
+
+async def slow_alookup(word: str) -> str:
+    """Looks up a word, slowly and asynchronously."""
+    await asyncio.sleep(0.3 if word == "first" else 0.15)
+    return f"result-{word}"
+
+@pytest.mark.parametrize("use_async", [False, True])
+@pytest.mark.parametrize("tool", [slow_lookup, slow_alookup])
+def test_parallel_tool_calls_keep_order(tool, use_async):
+    words = ["first", "second", "third", "fourth"]
+    agent = BaseAgent(llm_options=mock_parallel_options(tool.__name__, words), tools=[tool], max_tool_calls=2, max_parallel_tools=4)
+    executed, results = [], []
+    bus = JustToolsBus()
+    tool_id = id(agent.tools[tool.__name__])
+    on_execute = lambda event_name, *args, **kwargs: executed.append(kwargs["kwargs"]["word"])
+    on_result = lambda event_name, *args, **kwargs: results.append(kwargs["result_interceptor"])
+    bus.subscribe(f"{tool.__name__}.{tool_id}.execute", on_execute)
+    bus.subscribe(f"{tool.__name__}.{tool_id}.result", on_result)
+    try:
+        start = time.perf_counter()
+        if use_async:
+            asyncio.run(agent.aquery("look up"))
+        else:
+            agent.query("look up")
+        elapsed = time.perf_counter() - start
+    finally:
+        bus.unsubscribe(f"{tool.__name__}.{tool_id}.execute", on_execute)
+        bus.unsubscribe(f"{tool.__name__}.{tool_id}.result", on_result)
+
+    tool_messages = [m for m in agent.memory.messages if m.get("role") == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == [f"call_{i}" for i in range(len(words))]
+    assert [m["content"] for m in tool_messages] == [f"result-{word}" for word in words]
+    assert sorted(executed) == sorted(words)
+    assert sorted(results) == sorted(m["content"] for m in tool_messages)
+    assert results[-1] == "result-first" # the slow call completed last, but is first in memory
+    assert elapsed < 0.3 + 0.15 * (len(words) - 1) # faster than serial execution
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_tool_calls_are_serial_by_default(use_async):
+    words = ["first", "second", "third"]
+    agent = BaseAgent(llm_options=mock_parallel_options("slow_lookup", words), tools=[slow_lookup], max_tool_calls=2)
+    executed = []
+    bus = JustToolsBus()
+    topic = f"slow_lookup.{id(agent.tools['slow_lookup'])}.result"
+    on_result = lambda event_name, *args, **kwargs: executed.append(kwargs["result_interceptor"])
+    bus.subscribe(topic, on_result)
+    try:
+        if use_async:
+            asyncio.run(agent.aquery("look up"))
+        else:
+            agent.query("look up")
+    finally:
+        bus.unsubscribe(topic, on_result)
+    assert executed == [f"result-{word}" for word in words] # the slow first call is not overtaken
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_parallel_tool_calls_respect_max_calls(use_async):
+    words = ["a", "b", "c", "d", "e"]
+    tool = JustTransientTool(name="slow_lookup", is_transient=True, raw_callable=slow_lookup, max_calls_per_query=2)
+    agent = BaseAgent(llm_options=mock_parallel_options("slow_lookup", words), tools=[tool], max_tool_calls=2, max_parallel_tools=4)
+    if use_async:
+        asyncio.run(agent.aquery("look up"))
+    else:
+        agent.query("look up")
+    contents = [m["content"] for m in agent.memory.messages if m.get("role") == "tool"]
+    assert len(contents) == len(words)
+    assert sum(content.startswith("result-") for content in contents) == 2
+    assert sum("Maximum number of calls (2)" in content for content in contents) == 3
+
+def make_counting_agent(executed: List[str]) -> BaseAgent:
+    def count_lookup(word: str) -> str:
+        """Looks up a word, once per query."""
+        time.sleep(0.005)
+        executed.append(word)
+        return f"result-{word}"
+
+    tool = JustTransientTool(name="count_lookup", is_transient=True, raw_callable=count_lookup, max_calls_per_query=1)
+    return BaseAgent(llm_options=mock_parallel_options("count_lookup", ["w"]), tools=[tool], max_tool_calls=3)
+
+def assert_isolated_calls(agent: BaseAgent, executed: List[str], results: List[str], queries: List[str]) -> None:
+    assert results == ["hello world"] * len(queries)
+    # max_calls_per_query is accounted per query: exactly one successful call each
+    assert len(executed) == len(queries)
+    assert agent.tools["count_lookup"].remaining_calls == 1
+    # every query was remembered exactly once, none was lost to a concurrent commit
+    user_queries = [m["content"] for m in agent.memory.messages if m.get("role") == "user"]
+    assert sorted(user_queries) == sorted(queries)
+
+def test_concurrent_queries_on_one_agent():
+    """Hammers one agent from many threads, per-call state must not leak between the calls."""
+    executed = []
+    agent = make_counting_agent(executed)
+    threads, queries_per_thread = 16, 5
+    queries = [f"query {t}-{i}" for t in range(threads) for i in range(queries_per_thread)]
+
+    def worker(worker_id: int) -> List[str]:
+        return [agent.query(f"query {worker_id}-{i}") for i in range(queries_per_thread)]
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = [result for worker_results in executor.map(worker, range(threads)) for result in worker_results]
+    assert_isolated_calls(agent, executed, results, queries)
+
+def test_concurrent_aqueries_on_one_agent():
+    executed = []
+    agent = make_counting_agent(executed)
+    queries = [f"query {i}" for i in range(50)]
+
+    async def run_all():
+        return await asyncio.gather(*(agent.aquery(query) for query in queries))
+
+    results = list(asyncio.run(run_all()))
+    assert_isolated_calls(agent, executed, results, queries)
+
+def make_hedged_agent(primary_delay: float, backup_delay: float = 0.0) -> BaseAgent:
+    return BaseAgent(
+        llm_options={**MOCK_OPTIONS, "mock_response": "from primary", "mock_delay": primary_delay},
+        backup_options={**MOCK_OPTIONS, "mock_response": "from backup", "mock_delay": backup_delay},
+        hedge_after=0.2,
+    )
+
+def test_hedged_query_takes_the_first_answer():
+    slow_primary = make_hedged_agent(primary_delay=2.0)
+    start = time.perf_counter()
+    assert slow_primary.query("hi") == "from backup"
+    assert time.perf_counter() - start < 1.5
+    assert slow_primary.hedge_stats["backup_win_rate"] == 1.0
+    assert slow_primary.hedge_stats["hedge_rate"] == 1.0
+
+    fast_primary = make_hedged_agent(primary_delay=0.0)
+    assert fast_primary.query("hi") == "from primary"
+    assert fast_primary.hedge_stats["primary_win_rate"] == 1.0
+    assert fast_primary.hedge_stats["hedge_rate"] == 0.0
+
+@pytest.mark.parametrize("primary_ttft", [0.0, 0.4]) # fails before and after the hedge is fired
+def test_hedged_failures_keep_the_primary_error(primary_ttft):
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo", "echo": {"ttft": primary_ttft, "responses": [{"error": 503}]}},
+        backup_options={"model": "echo", "echo": {"responses": [{"error": 500}]}},
+        hedge_after=0.2,
+    )
+    with pytest.raises(Exception, match="injected error 500") as raised:
+        agent.query("hi")
+    assert "injected error 503" in str(raised.value.__cause__)
+
+def test_hedged_astream_cancels_the_loser():
+    agent = make_hedged_agent(primary_delay=2.0)
+
+    async def collect():
+        start = time.perf_counter()
+        chunks = [chunk async for chunk in agent.astream("hi")]
+        return chunks, time.perf_counter() - start
+
+    chunks, elapsed = asyncio.run(collect())
+    content = "".join(
+        SSE.sse_parse(chunk)["data"]["choices"][0]["delta"].get("content") or ""
+        for chunk in chunks[:-1]
+    )
+    assert content == "from backup"
+    assert elapsed < 1.5
+    assert agent.hedge_stats["backup_win_rate"] == 1.0
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_hedged_wait_is_bounded_by_the_completion_timeout(use_async):
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo", "timeout": 0.5, "echo": {"ttft": 3.0}},
+        backup_options={"model": "echo", "timeout": 0.5, "echo": {"ttft": 3.0}},
+        hedge_after=0.1,
+    )
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError, match="Hedged completion timed out"):
+        asyncio.run(agent.aquery("hi")) if use_async else agent.query("hi")
+    assert time.perf_counter() - start < 2.0
+
+prompt_tool_threads = []
+
+def record_prompt_thread(label: str) -> str:
+    """Records the thread the prompt tool runs in."""
+    prompt_tool_threads.append(threading.get_ident())
+    return label
+
+def test_async_preprocessing_runs_off_the_loop():
+    prompt_tool_threads.clear()
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo"},
+        prompt_tools=[(record_prompt_thread, {"label": "probe"})],
+    )
+
+    async def run():
+        loop_thread = threading.get_ident()
+        await agent.aquery("hi")
+        [chunk async for chunk in agent.astream("hi")]
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert len(prompt_tool_threads) == 2 and loop_thread not in prompt_tool_threads
+
+class ShoutingAgent(BaseAgent):
+    def query(self, query_input, **kwargs):
+        return super().query(query_input, **kwargs).upper()
+
+def test_rest_api_serves_sync_overrides():
+    agent = ShoutingAgent(streaming_method=StreamingMode.echo, llm_options={"model": "echo"})
+    assert overrides_sync_only(agent, "query", "aquery") and not overrides_sync_only(agent, "stream", "astream")
+    response = TestClient(AgentRestAPI(agents={"shouting_agent": agent})).post(
+        "/v1/chat/completions",
+        json={"model": "shouting_agent", "messages": [{"role": "user", "content": "hello there"}]},
+    )
+    assert response.json() == "HELLO THERE"
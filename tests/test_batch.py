@@ -0,0 +1,48 @@
+import asyncio
+
+from just_agents.base_agent import BaseAgent
+from just_agents.batch import BatchResult
+from just_agents.protocols.protocol_factory import StreamingMode
+
+ECHO_OPTIONS = {
+    "model": "echo",
+    "echo": {"rules": [{"pattern": "fail", "response": {"error": 500}}]},
+}
+
+def echo_agent() -> BaseAgent:
+    return BaseAgent(streaming_method=StreamingMode.echo, llm_options=ECHO_OPTIONS, system_prompt="You are an echo")
+
+def test_query_batch_with_checkpoint(tmp_path):
+    agent = echo_agent()
+    inputs = [f"item {index}" for index in range(20)]
+    inputs[5] = "fail 5"
+    checkpoint = str(tmp_path / "batch.jsonl")
+
+    batch = agent.query_batch(inputs, concurrency=4, checkpoint_path=checkpoint)
+    first = [next(batch) for _ in range(8)]
+    batch.close()  # a crash after the first results
+    assert [result.index for result in first] == list(range(8))
+    assert first[5].error_type == "InternalServerError" and first[5].output is None
+    assert all(result.output == inputs[result.index] for result in first if result.index != 5)
+    assert agent.memory.messages == []  # every input is a stateless query
+
+    inputs[5] = "item 5"
+    results = list(agent.query_batch(inputs, concurrency=4, checkpoint_path=checkpoint))
+    assert [result.output for result in results] == inputs
+    resumed = {result.index for result in results if result.resumed}
+    assert set(range(8)) - {5} <= resumed and 5 not in resumed
+
+def test_async_batch_and_stream_many():
+    agent = echo_agent()
+    inputs = ["one", "two", "fail three", "four"]
+
+    async def collect():
+        return [result async for result in agent.aquery_batch(inputs, concurrency=2, ordered=False)]
+    results = sorted(asyncio.run(collect()), key=lambda result: result.index)
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[3].output == "four"
+
+    events = list(agent.stream_many(inputs, concurrency=3))
+    finished = {index: event for index, event in events if isinstance(event, BatchResult)}
+    assert sorted(finished) == [0, 1, 2, 3] and not finished[2].ok and finished[0].ok
+    assert all(any(index == item and not isinstance(event, BatchResult) for index, event in events) for item in (0, 1, 3))
@@ -0,0 +1,14 @@
+from benchmarks.harness import BENCHMARKS, BenchmarkReport, compare, run
+import benchmarks.agent_benchmarks  # registers the benchmarks
+
+def test_benchmarks_flag_regressions(tmp_path):
+    assert {"agent.query", "agent.stream", "tools.tool_loop_100", "memory.fork_commit_long_history"} <= set(BENCHMARKS)
+    report = run("bus.", rounds=1)
+    report.save(tmp_path / "baseline.json")
+    baseline = BenchmarkReport.load(tmp_path / "baseline.json")
+    assert compare(report, baseline) == []
+
+    baseline.results["bus.publish_fan_out"].median /= 2
+    regressions = compare(report, baseline, threshold=0.5)
+    assert [regression.name for regression in regressions] == ["bus.publish_fan_out"]
+    assert regressions[0].ratio == 2
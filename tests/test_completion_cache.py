@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+
+from just_agents.base_agent import BaseAgent
+from just_agents.completion_cache import CompletionCache, CompletionCacheOptions
+from just_agents.protocols.litellm_protocol import LiteLLMAdapter
+from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
+
+MOCK_OPTIONS = {
+    "model": "gpt-4.1-nano",
+    "temperature": 0.0,
+    "api_key": "sk-mock",
+    "mock_response": "hello world",
+}
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls = []
+    completion, async_completion = LiteLLMAdapter.completion, LiteLLMAdapter.async_completion
+
+    def counting_completion(self, *args, **kwargs):
+        calls.append(kwargs.get("stream"))
+        return completion(self, *args, **kwargs)
+
+    async def counting_async_completion(self, *args, **kwargs):
+        calls.append(kwargs.get("stream"))
+        return await async_completion(self, *args, **kwargs)
+
+    monkeypatch.setattr(LiteLLMAdapter, "completion", counting_completion)
+    monkeypatch.setattr(LiteLLMAdapter, "async_completion", counting_async_completion)
+    return calls
+
+def stream_content(chunks) -> str:
+    return "".join(
+        SSE.sse_parse(chunk)["data"]["choices"][0]["delta"].get("content") or ""
+        for chunk in chunks[:-1]
+    )
+
+def test_query_and_stream_are_replayed(provider_calls, tmp_path):
+    options = CompletionCacheOptions(path=str(tmp_path / "completions.sqlite"))
+    agent = BaseAgent(llm_options=MOCK_OPTIONS, completion_cache=options, continue_conversation=False)
+    assert agent.query("hi") == agent.query("hi") == "hello world"
+    assert provider_calls == [False]
+
+    streamed = [list(agent.stream("hi")) for _ in range(2)]
+    assert stream_content(streamed[0]) == stream_content(streamed[1]) == "hello world"
+    assert provider_calls == [False, True]
+    assert asyncio.run(agent.aquery("hi")) == "hello world"
+    assert provider_calls == [False, True]
+
+    # another process reads the completions from the disk tier
+    assert CompletionCache(path=options.path).stats() == {"hits": 0, "misses": 0, "entries": 0, "disk_entries": 2}
+
+def test_cache_is_opt_in_and_deterministic(provider_calls):
+    plain = BaseAgent(llm_options=MOCK_OPTIONS)
+    plain.query("hi")
+    plain.query("hi")
+    sampled = BaseAgent(llm_options={**MOCK_OPTIONS, "temperature": 0.7}, completion_cache=CompletionCacheOptions())
+    sampled.query("hi")
+    sampled.query("hi")
+    expired = BaseAgent(llm_options=MOCK_OPTIONS, completion_cache=CompletionCacheOptions(ttl=0), continue_conversation=False)
+    expired.query("expired")
+    expired.query("expired")
+    assert len(provider_calls) == 6
+
+def test_disk_tier_is_pruned(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("just_agents.completion_cache.time.time", lambda: clock[0])
+    cache = CompletionCache(max_entries=3, path=str(tmp_path / "pruned.sqlite"), ttl=60)
+    for index in range(5):
+        clock[0] += 1
+        cache.put(f"key{index}", index)
+    assert cache.stats()["disk_entries"] == 3  # capped at max_entries
+    assert CompletionCache(path=cache.path).get("key1") is None
+    assert CompletionCache(path=cache.path).get("key4") == 4
+
+    clock[0] += 120
+    cache.put("fresh", 5)
+    assert cache.stats()["disk_entries"] == 1  # the expired rows are dropped
+
+    # the table is not scanned on every write: it is cut below max_entries once it grows past them
+    statements = []
+    large = CompletionCache(max_entries=100, path=str(tmp_path / "large.sqlite"))
+    large._db.set_trace_callback(statements.append)
+    for index in range(300):
+        clock[0] += 1
+        large.put(f"key{index}", index)
+        assert large._disk_rows <= 100
+    assert large.stats()["disk_entries"] == large._disk_rows
+    assert sum(statement.startswith("DELETE") for statement in statements) < 30
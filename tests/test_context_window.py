@@ -0,0 +1,58 @@
+from just_agents.base_agent import BaseAgent
+from just_agents.context_window import ContextWindow, ContextWindowOptions
+from just_agents.data_classes import Role
+from just_agents.protocols.echo_protocol import EchoProtocolAdapter
+from just_agents.protocols.protocol_factory import StreamingMode
+
+def tool_turn(index: int) -> list:
+    return [
+        {"role": "user", "content": f"question {index} " * 20},
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": f"call_{index}", "type": "function", "function": {"name": "lookup", "arguments": "{}"}}
+        ]},
+        {"role": "tool", "tool_call_id": f"call_{index}", "name": "lookup", "content": f"result {index} " * 20},
+        {"role": "assistant", "content": f"answer {index} " * 20},
+    ]
+
+def test_sliding_window_keeps_prompt_and_tool_pairs():
+    messages = [{"role": "system", "content": "You are a helpful assistant"}]
+    for index in range(10):
+        messages += tool_turn(index)
+    window = ContextWindow(ContextWindowOptions(max_tokens=300))
+    fitted, tokens = window.fit(messages, "gpt-4.1-nano")
+    assert fitted[0] is messages[0] and fitted[1]["role"] == Role.user
+    assert fitted[-1] is messages[-1] and tokens <= 300 and len(fitted) < len(messages)
+    call_ids = {call["id"] for message in fitted for call in message.get("tool_calls") or []}
+    assert call_ids == {message["tool_call_id"] for message in fitted if message["role"] == Role.tool}
+
+    # counts are cached per message, a list within budget is sent as is
+    assert window.counter.stats()["misses"] == len(messages)
+    assert window.fit(fitted, "gpt-4.1-nano") == (fitted, tokens)
+    assert window.counter.stats()["misses"] == len(messages)
+
+    # the latest turn is sent even when it alone is over budget
+    fitted, _ = ContextWindow(ContextWindowOptions(max_tokens=10)).fit(messages, "gpt-4.1-nano")
+    assert fitted == [messages[0], messages[-1]]
+    # no budget for the models without known context size
+    assert ContextWindow(ContextWindowOptions()).fit(messages, "echo") == (messages, None)
+
+def test_agent_sends_fitted_messages(monkeypatch):
+    sent = []
+    provider_completion = EchoProtocolAdapter._provider_completion
+
+    def recording_completion(self, *args, **kwargs):
+        sent.append(kwargs["messages"])
+        return provider_completion(self, *args, **kwargs)
+
+    monkeypatch.setattr(EchoProtocolAdapter, "_provider_completion", recording_completion)
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo"},
+        system_prompt="You are an echo",
+        context_window=ContextWindowOptions(max_tokens=200),
+    )
+    for index in range(20):
+        agent.query(f"message number {index} " * 5)
+    assert len(agent.memory.messages) == 41
+    assert sent[-1][0]["role"] == Role.system and sent[-1][1]["role"] == Role.user
+    assert sent[-1][-1] is agent.memory.messages[-2] and len(sent[-1]) < 20
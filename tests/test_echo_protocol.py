@@ -0,0 +1,65 @@
+import asyncio
+import time
+import pytest
+
+from litellm.utils import ModelResponse, ModelResponseStream
+
+from just_agents.base_agent import BaseAgent
+from just_agents.data_classes import Role
+from just_agents.interfaces.protocol_adapter import IProtocolAdapter
+from just_agents.key_pool import error_retry_after, error_status_code
+from just_agents.protocols.echo_protocol import EchoOptions, EchoProtocolAdapter, EchoResponse
+from just_agents.protocols.protocol_factory import ProtocolAdapterFactory, StreamingMode
+
+def get_weather(city: str) -> str:
+    """
+    Gets the weather in a city
+    """
+    return f"sunny in {city}"
+
+WEATHER_OPTIONS = {
+    "model": "echo",
+    "echo": {
+        "rules": [
+            {"role": "user", "pattern": "weather", "response": {"tool_calls": [{"name": "get_weather", "arguments": {"city": "Paris"}}]}},
+            {"role": "tool", "response": {"content": "It is sunny in Paris"}},
+        ],
+    },
+}
+
+def test_echo_agent_tool_loop():
+    assert isinstance(ProtocolAdapterFactory.get_protocol_adapter(StreamingMode.echo), EchoProtocolAdapter)
+    agent = BaseAgent(streaming_method=StreamingMode.echo, llm_options=WEATHER_OPTIONS, tools=[get_weather])
+    assert agent.query("What is the weather?") == "It is sunny in Paris"
+    assert [m["role"] for m in agent.memory.messages[-3:]] == [Role.assistant, Role.tool, Role.assistant]
+    assert agent.memory.messages[-2]["content"] == "sunny in Paris"
+
+    assert IProtocolAdapter.content_from_stream(agent.stream("And the weather now?")) == "It is sunny in Paris"
+    assert asyncio.run(agent.aquery("echo me")) == "echo me"
+
+@pytest.mark.parametrize("tools", [[], None])
+def test_echo_agent_without_tools(tools):
+    agent = BaseAgent(streaming_method=StreamingMode.echo, llm_options={"model": "echo"}, tools=tools)
+    assert agent.query("hi") == "hi"
+    assert IProtocolAdapter.content_from_stream(agent.stream("hello")) == "hello"
+
+def test_echo_timing_and_errors():
+    adapter = EchoProtocolAdapter(options=EchoOptions(ttft=0.05, tokens_per_second=100, responses=[EchoResponse(content="one two three")]))
+    messages = [{"role": "user", "content": "hi"}]
+    start = time.perf_counter()
+    chunks = list(adapter.completion(model="echo", messages=messages, stream=True, stream_options={"include_usage": True}))
+    assert time.perf_counter() - start >= 0.05 + 2 / 100
+    assert all(isinstance(chunk, ModelResponseStream) for chunk in chunks)
+    assert [chunk.choices[0].delta.content for chunk in chunks[:-1]] == ["one ", "two ", "three"]
+    assert chunks[-1].choices[0].finish_reason == "stop" and chunks[-1].usage.total_tokens > 0
+    response = adapter.completion(model="echo", messages=messages)
+    assert isinstance(response, ModelResponse) and response.choices[0].message.content == "one two three"
+
+    with pytest.raises(Exception) as error:
+        adapter.completion(
+            model="echo", messages=messages, raise_on_completion_status_errors=True,
+            echo={"error_rate": 1.0, "error_status": 503, "retry_after": 2},
+        )
+    assert error_status_code(error.value) == 503 and error_retry_after(error.value) == 2.0
+    # without raise_on_completion_status_errors the error is returned as the answer, as for the providers
+    assert "503" in adapter.completion(model="echo", messages=messages, echo={"responses": [{"error": 503}]}).choices[0].message.content
@@ -0,0 +1,117 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+
+from just_agents.base_agent import BaseAgent
+from just_agents.key_pool import KeyPool, KeyPoolExhausted, error_retry_after
+
+MOCK_OPTIONS = {
+    "model": "gpt-4.1-nano",
+    "temperature": 0.0,
+    "mock_response": "hello world",
+}
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+def test_lru_and_least_in_flight_selection():
+    pool = KeyPool.from_list(["a", "b", "c"])
+    assert [pool.acquire() for _ in range(3)] == ["a", "b", "c"]
+    pool.release("b")
+    assert pool.acquire() == "a" # least recently used, regardless of in flight
+
+    pool = KeyPool.from_list(["a", "b"], selection="least_in_flight")
+    assert pool.acquire() == "a"
+    assert pool.acquire() == "b"
+    pool.release("b")
+    assert pool.acquire() == "b"
+
+def test_cooldown_honours_retry_after():
+    pool = KeyPool.from_list(["a", "b"])
+    pool.release(pool.acquire(), error=ProviderError(429, {"retry-after": "30"}))
+    pool.release(pool.acquire(), error=ProviderError(400)) # client errors do not cool the key down
+    assert [pool.acquire(), pool.acquire()] == ["b", "b"]
+    stats_a, stats_b = pool.stats()
+    assert stats_a["cooldowns"] == 1 and 29 < stats_a["cooldown_remaining"] <= 30
+    assert stats_b["failures"] == 1 and stats_b["cooldown_remaining"] == 0
+
+    pool.release("b", error=ProviderError(503))
+    with pytest.raises(KeyPoolExhausted) as exhausted:
+        pool.acquire()
+    assert 0 < exhausted.value.retry_after <= 2 * pool.base_cooldown # second failure in a row
+    assert error_retry_after(ProviderError(429, {"retry-after-ms": "1500"})) == 1.5
+
+def test_rpm_budget_waits_for_the_window(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("just_agents.key_pool.time.monotonic", lambda: clock[0])
+    monkeypatch.setattr("just_agents.key_pool.time.sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    pool = KeyPool.from_list(["a"], rpm_limit=2, tpm_limit=1000)
+    pool.release(pool.acquire(), tokens=10)
+    pool.release(pool.acquire(), tokens=10)
+    with pytest.raises(KeyPoolExhausted):
+        pool.acquire(max_wait=30)
+    assert pool.acquire(max_wait=60) == "a"
+    assert clock[0] == 160.0
+
+def test_agents_share_the_key_pool(monkeypatch):
+    monkeypatch.setenv("JUST_AGENTS_TEST_KEYS", "key-one,key-two,key-three")
+    failing = BaseAgent(
+        llm_options={**MOCK_OPTIONS, "mock_response": "litellm.RateLimitError"},
+        key_list_env="JUST_AGENTS_TEST_KEYS",
+        completion_max_tries=3,
+    )
+    with pytest.raises(Exception):
+        failing.query("hi")
+    assert [stats["cooldowns"] for stats in failing._key_pool.stats()] == [1, 1, 1] # every attempt used another key
+
+    healthy = BaseAgent(llm_options=MOCK_OPTIONS, key_list_env="JUST_AGENTS_TEST_KEYS")
+    assert healthy._key_pool is failing._key_pool
+    with pytest.raises(KeyPoolExhausted):
+        healthy.query("hi") # all keys of the shared pool are cooling down
+
+def test_shared_pool_keeps_the_strictest_limits(monkeypatch):
+    monkeypatch.setenv("JUST_AGENTS_LIMITED_KEYS", "key-one")
+    strict = BaseAgent(
+        llm_options=MOCK_OPTIONS, key_list_env="JUST_AGENTS_LIMITED_KEYS",
+        key_selection="least_in_flight", key_rpm_limit=10, key_tpm_limit=5000,
+    )
+    loose = BaseAgent(llm_options=MOCK_OPTIONS, key_list_env="JUST_AGENTS_LIMITED_KEYS", key_tpm_limit=1000)
+    unlimited = BaseAgent(llm_options=MOCK_OPTIONS, key_list_env="JUST_AGENTS_LIMITED_KEYS")
+    pool = strict._key_pool
+    assert loose._key_pool is pool and unlimited._key_pool is pool
+    assert (pool.selection, pool.rpm_limit, pool.tpm_limit) == ("least_in_flight", 10, 1000)
+
+def test_streams_hold_the_key_until_closed(monkeypatch):
+    monkeypatch.setenv("JUST_AGENTS_STREAM_KEYS", "key-one,key-two")
+    agent = BaseAgent(
+        llm_options=MOCK_OPTIONS,
+        key_list_env="JUST_AGENTS_STREAM_KEYS",
+        key_tpm_limit=100000,
+        key_selection="least_in_flight",
+    )
+    pool = agent._key_pool
+    stream = agent.stream("hi")
+    next(stream)
+    assert [stats["in_flight"] for stats in pool.stats()] == [1, 0]  # in flight while the stream is read
+    list(stream)
+    first, second = pool.stats()
+    assert first["in_flight"] == 0 and first["tokens"] > 0  # charged once the stream is consumed
+    assert second["tokens"] == 0
+
+    async def collect():
+        return [chunk async for chunk in agent.astream("hi")]
+    asyncio.run(collect())
+    assert [stats["in_flight"] for stats in pool.stats()] == [0, 0]
+    assert pool.stats()[1]["tokens"] > 0  # the least used key took the async stream
+
+    def failing_stream():
+        yield SimpleNamespace(usage=None)
+        raise ProviderError(429, {"retry-after": "30"})
+    key = pool.acquire()
+    with pytest.raises(ProviderError):
+        list(agent._release_key_on_close(failing_stream(), pool, key, [], MOCK_OPTIONS["model"]))
+    assert pool.stats()[pool.index(key)]["cooldowns"] == 1  # an error raised while streaming cools the key down
@@ -158,6 +158,23 @@ class TestMCPToolsBasic:
         # MCP returns structured content as JSON string or direct value
         assert (isinstance(result, str) and ('"text":"8"' in result or result == "8")) or result == 8
 
+    def test_mcp_result_is_not_reserialized(self, mcp_server_available, mcp_client_config):
+        """Test that the typed content and the structured content of a result are passed on as sent"""
+        from mcp.types import TextContent
+        from just_agents.just_async import run_async_function_synchronously
+
+        tool = JustMCPTool(name="prime_factorization_summer", mcp_client_config=mcp_client_config)
+        client = tool._mcp_client
+        result = run_async_function_synchronously(client.invoke_tool, "prime_factorization_summer", {"n": 12})
+        assert result.error_code == 0 and isinstance(result.content[0], TextContent)
+        assert result.structured_content["factors"] == [2, 2, 3]
+        assert tool(n=12) == result.structured_content
+
+        # a result that is not an object is unwrapped from the structured content
+        assert JustMCPTool(name="add", mcp_client_config=mcp_client_config)(a=2, b=3) == 5
+        error = run_async_function_synchronously(client.invoke_tool, "add", {"a": "two", "b": 3})
+        assert error.error_code == 1 and "two" in error.text and error.structured_content is None
+
 
 class TestMCPToolSetConfig:
     """Tests for JustMCPServerParameters and bulk tool creation"""
@@ -181,7 +198,33 @@ class TestMCPToolSetConfig:
         # Verify they are all JustMCPTool instances
         for tool in tools.values():
             assert isinstance(tool, JustMCPTool)
-    
+
+    def test_tool_catalog_is_fetched_once(self, mcp_server_available, mcp_client_config, monkeypatch):
+        """Test that the tools of a server share one catalog fetch"""
+        from mcp.types import ServerNotification, ToolListChangedNotification
+        from just_agents.just_async import run_async_function_synchronously
+
+        fetches = []
+        fetch_tool_info = MCPClient._fetch_tool_info
+
+        async def counting_fetch(self):
+            fetches.append(self.client_key)
+            return await fetch_tool_info(self)
+
+        monkeypatch.setattr(MCPClient, "_fetch_tool_info", counting_fetch)
+        client = MCPClient.get_client_by_inputs(mcp_client_config=mcp_client_config)
+        client.invalidate_tool_catalog()
+
+        tools = JustToolFactory.create_tools_from_mcp(JustMCPServerParameters(mcp_client_config=mcp_client_config))
+        assert len(tools) == 10 and len(fetches) == 1
+        assert tools["add"].description == "Add two numbers"
+
+        # the server notifies that its tools have changed
+        notification = ServerNotification(ToolListChangedNotification(method="notifications/tools/list_changed"))
+        run_async_function_synchronously(client._handle_message, notification)
+        JustMCPTool(name="divide", mcp_client_config=mcp_client_config)
+        assert len(fetches) == 2
+
     def test_create_subset_mcp_tools(self, mcp_server_available, mcp_client_config):
         """Test creating only specific MCP tools"""
         config = JustMCPServerParameters(
@@ -593,4 +636,42 @@ class TestMCPServerReuse:
         assert actual_client_key == expected_client_key, (
             f"Client key should match server command. Expected: {expected_client_key}, "
             f"Got: {actual_client_key}"
-        ) 
\ No newline at end of file
+        ) 
+
+class TestMCPSessionPool:
+    """Tests for pooled MCP sessions"""
+
+    def test_concurrent_calls_scale_up_the_pool(self, mcp_server_available, monkeypatch):
+        """Test that concurrent calls open extra sessions up to max_sessions and idle ones are closed"""
+        import asyncio
+        from just_agents import mcp_client as mcp_client_module
+
+        opened = []
+        session_init = mcp_client_module.MCPSession.__init__
+
+        def counting_init(self, client):
+            opened.append(client)
+            session_init(self, client)
+
+        monkeypatch.setattr(mcp_client_module.MCPSession, "__init__", counting_init)
+        # the command form gets a client of its own, apart from the one shared by the other tests
+        tools = JustToolFactory.create_tools_from_mcp(JustMCPServerParameters(
+            mcp_client_config=f"{sys.executable} {_MCP_SERVER_PATH}",
+            only_include_tools=["add"],
+            max_sessions=3,
+        ))
+        client = tools["add"]._mcp_client
+        assert client.max_sessions == 3
+
+        async def add_many():
+            return await asyncio.gather(*(client.invoke_tool("add", {"a": i, "b": 1}) for i in range(8)))
+
+        results = asyncio.run_coroutine_threadsafe(add_many(), client.get_loop()).result(timeout=120)
+        assert [result.structured_content for result in results] == [i + 1 for i in range(8)]
+        assert len(opened) == 2 and len(client._sessions) == 2
+
+        client.session_idle_seconds = 0.0
+        client.get_loop().call_soon_threadsafe(client._reap_idle_sessions)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), client.get_loop()).result(timeout=10)
+        assert client._sessions == []
+        assert tools["add"].get_callable()(a=2, b=2) == 4
@@ -0,0 +1,60 @@
+from just_agents.base_agent import BaseAgent
+from just_agents.base_memory import BaseMemory
+from just_agents.data_classes import Role
+
+MOCK_OPTIONS = {
+    "model": "gpt-4.1-nano",
+    "temperature": 0.0,
+    "api_key": "sk-mock",
+    "mock_response": "hello world",
+}
+
+def test_system_messages_stay_on_top():
+    memory = BaseMemory(conversation=[
+        {"role": "user", "content": "hi"},
+        {"role": "system", "content": "first"},
+    ])
+    assert [m["content"] for m in memory.prompt_messages] == ["first"]
+    memory.add_message({"role": "assistant", "content": "hello"})
+    memory.add_message({"role": "system", "content": "second"})
+    memory.add_message({"role": "system", "content": [{"type": "text", "text": ""}]})
+    assert [m["role"] for m in memory.messages] == ["system"] * 3 + ["user", "assistant"]
+    assert memory.prompt_messages_count == 3
+
+    memory.clear_system_messages(clear_non_empty=False)
+    assert [m["content"] for m in memory.prompt_messages] == ["first", "second"]
+    memory.clear_system_messages()
+    assert not memory.has_system_messages()
+    assert [m["content"] for m in memory.messages] == ["hi", "hello"]
+
+def test_fork_is_copy_on_write():
+    memory = BaseMemory()
+    memory.add_system_message("prompt")
+    memory.add_user_message("hi")
+    handled = []
+    memory.add_on_user_message(lambda message: handled.append(message["content"]))
+
+    fork = memory.fork()
+    assert fork.messages is memory.messages  # nothing is copied until a change
+    fork.clear_system_messages()
+    fork.add_user_message("from fork")
+    assert handled == ["from fork"]
+    assert [m["content"] for m in memory.messages] == ["prompt", "hi"]
+
+    shared = memory.messages
+    memory.add_user_message("from parent")
+    assert shared is not memory.messages and len(shared) == 2
+    assert [m["content"] for m in fork.messages] == ["hi", "from fork"]
+    assert memory.fork(copy_values=False).messages == []
+
+def test_remembered_query_shares_history():
+    agent = BaseAgent(llm_options=MOCK_OPTIONS, system_prompt="be brief")
+    for i in range(3):
+        agent.query(f"query {i}")
+    roles = [m["role"] for m in agent.memory.messages]
+    assert roles == [Role.system] + [Role.user, Role.assistant] * 3
+    history = agent.memory.messages
+    context = agent._preprocess_input("one more")
+    assert context.base_history_length == 6
+    # the fork reuses the message dicts of the history
+    assert all(a is b for a, b in zip(context.memory.messages[1:7], history[1:7]))
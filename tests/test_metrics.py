@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import pytest
+
+from fastapi.testclient import TestClient
+
+from just_agents.base_agent import BaseAgent
+from just_agents.just_metrics import JustMetrics, MetricsRegistry
+from just_agents.protocols.protocol_factory import StreamingMode
+from just_agents.web.rest_api import AgentRestAPI
+
+ECHO_OPTIONS = {
+    "model": "echo",
+    "echo": {
+        "rules": [
+            {"role": "user", "pattern": "weather", "response": {"tool_calls": [{"name": "get_weather", "arguments": {"city": "Paris"}}]}},
+            {"role": "tool", "response": {"content": "It is sunny in Paris"}},
+        ],
+    },
+}
+
+def get_weather(city: str) -> str:
+    """
+    Gets the weather in a city
+    """
+    return f"sunny in {city}"
+
+@pytest.fixture
+def metrics():
+    metrics = JustMetrics()
+    metrics.reset()
+    metrics.enabled = True
+    yield metrics
+    metrics.enabled = False
+    metrics.reset()
+
+def test_sharded_metrics_render():
+    registry = MetricsRegistry(enabled=True)
+    requests = registry.counter("requests_total", "Requests", ("agent",))
+    latency = registry.histogram("latency_seconds", "Latency", ("agent",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            requests.inc(("a",))
+        latency.observe(("a",), 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    requests.inc(('quo"te',))
+    text = registry.render()
+    assert 'requests_total{agent="a"} 4000.0' in text
+    assert 'requests_total{agent="quo\\"te"} 1.0' in text
+    assert 'latency_seconds_bucket{agent="a",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{agent="a",le="1.0"} 4' in text
+    assert 'latency_seconds_bucket{agent="a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{agent="a"} 4' in text
+    # the shards of the finished threads are folded into one
+    assert len(requests._shards) == 1 and registry.render() == text
+
+def test_agent_metrics(metrics):
+    agent = BaseAgent(
+        shortname="weather_agent",
+        streaming_method=StreamingMode.echo,
+        llm_options=ECHO_OPTIONS,
+        tools=[get_weather],
+    )
+    agent.query("What is the weather?")
+    list(agent.stream("And the weather now?"))
+    asyncio.run(agent.aquery("echo me"))
+    text = TestClient(AgentRestAPI(agents={"weather_agent": agent})).get("/metrics").text
+    assert 'just_agents_completions_total{agent="weather_agent",model="echo",key="",status="ok"} 5.0' in text
+    assert 'just_agents_time_to_first_token_seconds_count{agent="weather_agent",model="echo"} 5' in text
+    assert 'just_agents_tool_seconds_count{agent="weather_agent",tool="get_weather"} 2' in text
+    assert 'just_agents_tokens_total{agent="weather_agent",model="echo",type="completion"}' in text
+
+    agent.llm_options = {**ECHO_OPTIONS, "echo": {"responses": [{"error": 503}]}}
+    with pytest.raises(Exception):
+        agent.query("fail")
+    assert 'key="",status="503"}' in metrics.render()  # every attempt is counted
+
+    metrics.enabled = False
+    metrics.reset()
+    agent.llm_options = ECHO_OPTIONS
+    agent.query("What is the weather?")
+    assert "just_agents_completions_total{" not in metrics.render()
+
+class StreamError(Exception):
+    status_code = 502
+
+def failing_chunks():
+    yield "first"
+    raise StreamError("connection reset")
+
+async def afailing_chunks():
+    yield "first"
+    raise StreamError("connection reset")
+
+def test_failing_stream_is_recorded_as_an_error(metrics):
+    with pytest.raises(StreamError):
+        list(metrics.meter_stream(failing_chunks(), "streamer", "echo", "0", 0.0))
+
+    async def collect():
+        return [chunk async for chunk in metrics.ameter_stream(afailing_chunks(), "streamer", "echo", "0", 0.0)]
+
+    with pytest.raises(StreamError):
+        asyncio.run(collect())
+    text = metrics.render()
+    assert 'just_agents_completions_total{agent="streamer",model="echo",key="0",status="502"} 2.0' in text
+    assert 'status="ok"' not in text
+
+    assert list(metrics.meter_stream(iter(["a", "b"]), "streamer", "echo", "0", 0.0)) == ["a", "b"]
+    assert 'just_agents_completions_total{agent="streamer",model="echo",key="0",status="ok"} 1.0' in metrics.render()
@@ -0,0 +1,66 @@
+from just_agents.base_agent import BaseAgent, PromptCacheStats
+from just_agents.data_classes import Role
+from just_agents.protocols.echo_protocol import EchoProtocolAdapter
+from just_agents.protocols.litellm_protocol import CACHE_CONTROL, LiteLLMAdapter
+from just_agents.protocols.protocol_factory import StreamingMode
+from tests.tools.toy_tools import decypher_using_secret_key, get_secret_key
+
+def get_weather(city: str) -> str:
+    """
+    Gets the weather in a city
+    """
+    return f"sunny in {city}"
+
+def test_cache_breakpoints():
+    adapter = LiteLLMAdapter()
+    tools = [{"type": "function", "function": {"name": name, "parameters": {}}} for name in ("a", "b")]
+    messages = [
+        {"role": "system", "content": "static prompt"},
+        {"role": "system", "content": "prompt tool outputs"},
+        {"role": "user", "content": [{"type": "text", "text": "hi"}]},
+    ]
+    kwargs = {"model": "anthropic/claude-sonnet-4-5", "messages": messages, "tools": tools}
+    adapter.add_cache_breakpoints(kwargs)
+    assert kwargs["tools"][-1]["cache_control"] == CACHE_CONTROL and kwargs["tools"][0] is tools[0]
+    assert kwargs["messages"][0]["content"] == [{"type": "text", "text": "static prompt", "cache_control": CACHE_CONTROL}]
+    assert kwargs["messages"][1] is messages[1]
+    assert kwargs["messages"][2]["content"][-1]["cache_control"] == CACHE_CONTROL
+    # the caller's messages and tools are not changed
+    assert messages[0]["content"] == "static prompt" and "cache_control" not in tools[-1]
+    assert "cache_control" not in messages[2]["content"][-1]
+
+    # providers caching prefixes automatically get the request as is
+    kwargs = {"model": "gpt-4.1-nano", "messages": messages, "tools": tools}
+    adapter.add_cache_breakpoints(kwargs)
+    assert kwargs["messages"] is messages and kwargs["tools"] is tools
+
+def test_agent_keeps_prefix_stable(monkeypatch):
+    sent = []
+    provider_completion = EchoProtocolAdapter._provider_completion
+
+    def recording_completion(self, *args, **kwargs):
+        sent.append(kwargs)
+        return provider_completion(self, *args, **kwargs)
+
+    monkeypatch.setattr(EchoProtocolAdapter, "_provider_completion", recording_completion)
+    agent = BaseAgent(
+        streaming_method=StreamingMode.echo,
+        llm_options={"model": "echo"},
+        system_prompt="You are an echo",
+        prompt_tools=[(get_secret_key, {"secret_word": "banana"})],
+        tools=[get_weather, decypher_using_secret_key],
+        prompt_caching=True,
+    )
+    agent.query("hi")
+    agent.query("hi again")
+    first, second = sent
+    assert first["messages"][0] == {"role": Role.system, "content": "You are an echo"}
+    assert first["messages"][1]["role"] == Role.system and "get_secret_key" in first["messages"][1]["content"]
+    assert [tool["function"]["name"] for tool in first["tools"]] == ["decypher_using_secret_key", "get_weather"]
+    assert first["tools"] == second["tools"] and second["messages"][:3] == first["messages"][:3]
+    assert agent.prompt_cache_stats["completions"] == 2
+
+    stats = PromptCacheStats()
+    stats.record({"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 900}, "cache_creation_input_tokens": 100})
+    stats.record(None)
+    assert stats.summary()["cache_hit_rate"] == 0.9 and stats.cache_write_tokens == 100
@@ -2,7 +2,7 @@ import json
 import litellm
 import pytest
 from just_agents.just_tool import JustTool
-from just_agents.protocols.litellm_protocol import LiteLLMAdapter
+from just_agents.protocols.litellm_protocol import LiteLLMAdapter, model_capabilities
 from dotenv import load_dotenv
 from typing import Optional, List
 from pydantic import BaseModel, Field
@@ -144,3 +144,22 @@ def test_grok_bug_regression(load_env):
     triple_func_call(LLAMA3_3) # works again. Groq is strange
     #fixed - https://github.com/BerriAI/litellm/issues/7621
 
+
+def test_sanitize_args_fast_path():
+    adapter = LiteLLMAdapter()
+    messages = [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello", "thinking_blocks": [{"type": "thinking", "thinking": "...", "signature": "s"}]},
+    ]
+    _, kwargs = adapter.sanitize_args(model="gpt-4.1-nano", messages=messages, tools=[], tool_choice="auto")
+    # every message is copied, changes made to the request do not reach the memory sharing the dicts
+    assert kwargs["messages"][0] == messages[0] and kwargs["messages"][0] is not messages[0]
+    assert "thinking_blocks" not in kwargs["messages"][1] and "thinking_blocks" in messages[1]
+    assert "tool_choice" not in kwargs
+    _, kwargs = adapter.sanitize_args(model="claude-sonnet-4-20250514", messages=messages)
+    assert kwargs["messages"] == messages and kwargs["messages"][1] is not messages[1]
+
+    assert "gpt-4.1-nano" in adapter.model_catalog and "4.1-nano" not in adapter.model_catalog
+    assert adapter.model_catalog.suggest("4.1-NANO").startswith("gpt-4.1-nano")
+    assert adapter.model_catalog.suggest("no-such-model") is None
+    assert model_capabilities("gpt-4.1-nano") is model_capabilities("gpt-4.1-nano")
@@ -7,6 +7,7 @@ from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
 from just_agents.base_agent import BaseAgent, BaseAgentWithLogging
 from just_agents.llm_options import LLMOptions, LLAMA3_3, OPENAI_GPT4_1NANO, OPENAI_GPT4_1MINI
 from just_agents.just_tool import JustToolsBus
+from just_agents.interfaces.protocol_adapter import IProtocolAdapter
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -245,3 +246,57 @@ def test_stream_tool_grok():
     validate_tool_call(agent_call, LLAMA3_3, False)
 
 
+
+def test_stream_accumulator_matches_chunk_builder():
+    from litellm.types.utils import ModelResponseStream
+    from just_agents.protocols.litellm_protocol import LiteLLMAdapter
+
+    def chunk(delta: dict, finish_reason: str = None) -> ModelResponseStream:
+        return ModelResponseStream(
+            id="chatcmpl-mock", model="gpt-4.1-nano", created=1,
+            choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        )
+
+    def tool_call(index: int, arguments: str, **kwargs) -> dict:
+        return {"tool_calls": [{"index": index, "function": {"arguments": arguments, **kwargs.pop("function", {})}, **kwargs}]}
+
+    chunks = [
+        chunk({"role": "assistant", "reasoning_content": "need the "}),
+        chunk({"reasoning_content": "weather"}),
+        chunk(tool_call(0, "", id="call_1", type="function", function={"name": "get_current_weather"})),
+        chunk(tool_call(0, '{"location": ')),
+        chunk(tool_call(1, '{"location": "Paris"}', id="call_2", type="function", function={"name": "get_current_weather"})),
+        chunk(tool_call(0, '"Tokyo"}')),
+        chunk({}, "tool_calls"),
+    ]
+    adapter = LiteLLMAdapter()
+    accumulator = adapter.stream_accumulator()
+    for part in chunks:
+        accumulator.add(part)
+    expected = adapter.message_from_response(adapter.response_from_deltas(chunks))
+    assert accumulator.message() == expected
+    assert [call.arguments for call in adapter.tool_calls_from_message(expected)] == [{"location": "Tokyo"}, {"location": "Paris"}]
+    assert accumulator.response().choices[0].finish_reason == "tool_calls"
+
+    session = BaseAgent(llm_options={"model": "gpt-4.1-nano", "api_key": "sk-mock", "mock_response": "hello world"})
+    assert IProtocolAdapter.content_from_stream(session.stream("hi")) == "hello world"
+    assert session.memory.last_message == {"role": "assistant", "content": "hello world"}
+
+def test_sse_encoder_bytes_and_coalescing():
+    from just_agents.protocols.sse_streaming import SSEStreamEncoder
+    session = BaseAgent(
+        streaming_method="echo",
+        llm_options={"model": "echo", "echo": {"responses": [{"chunks": ["one ", "two ", "three ", "four"]}]}},
+    )
+    plain = list(session.stream("hi"))
+    assert all(isinstance(message, str) for message in plain)
+    assert len(plain) == 6 and IProtocolAdapter.content_from_stream(plain) == "one two three four"
+
+    encoder = SSEStreamEncoder(as_bytes=True, coalesce_bytes=8)
+    coalesced = list(session.stream("hi", sse_encoder=encoder))
+    assert all(isinstance(message, bytes) for message in coalesced)
+    deltas = [SSE.sse_parse(message.decode())["data"] for message in coalesced[:-1]]
+    assert [delta["choices"][0]["delta"]["content"] for delta in deltas[:2]] == ["one two ", "three four"]
+    assert deltas[0]["choices"][0]["delta"]["role"] == "assistant" and deltas[0]["model"] == "echo"
+    assert coalesced[-1] == b"data: [DONE]\n\n"
+    assert IProtocolAdapter.content_from_stream(message.decode() for message in coalesced) == "one two three four"
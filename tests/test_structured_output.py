@@ -0,0 +1,69 @@
+import json
+import pytest
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError
+
+from just_agents.base_agent import BaseAgent
+from just_agents.just_schema import ModelHelper, PartialOutputParser, compile_parser
+from just_agents.protocols.protocol_factory import StreamingMode
+
+class Gene(BaseModel):
+    symbol: str
+    aliases: List[str] = []
+    score: Optional[float] = None
+
+class Pathway(BaseModel):
+    name: str
+    genes: List[Gene]
+    summary: str
+
+def test_structured_output_fast_path_and_fallbacks():
+    assert compile_parser(Gene) is compile_parser(Gene)
+    compiled = compile_parser(Gene)
+    assert compiled.required_model is compiled.required_model
+    assert compiled.response_schema["required"] == ["symbol", "aliases", "score"]
+    assert "title" not in compiled.response_schema
+
+    expected = Gene(symbol="FOXO3", aliases=["FOXO2"], score=0.5)
+    raw = expected.model_dump_json()
+    assert ModelHelper.get_structured_output(raw, Gene) == expected
+    assert ModelHelper.get_structured_output(raw.encode(), Gene) == expected
+    assert ModelHelper.get_structured_output(f"```json\n{raw}\n```", Gene) == expected
+    assert ModelHelper.get_structured_output(str(expected.model_dump()), Gene) == expected
+    assert ModelHelper.get_structured_output(expected.model_dump(), Gene) == expected
+    assert ModelHelper.get_structured_output(raw, dict) == json.loads(raw)
+
+    # valid JSON not matching the model is not sent down the fallbacks
+    with pytest.raises(ValidationError):
+        ModelHelper.get_structured_output('{"aliases": []}', Gene)
+    with pytest.raises(ValueError, match="Failed to parse response"):
+        ModelHelper.get_structured_output("not json at all", Gene)
+
+def test_query_structural_reuses_required_model(monkeypatch):
+    formats = []
+    query = BaseAgent.query
+
+    def recording_query(self, query_input, **kwargs):
+        formats.append(kwargs.get("response_format"))
+        return query(self, query_input, **kwargs)
+
+    monkeypatch.setattr(BaseAgent, "query", recording_query)
+    agent = BaseAgent(streaming_method=StreamingMode.echo, llm_options={"model": "echo"}, remember_query=False)
+    for symbol in ("TP53", "SIRT1"):
+        gene = agent.query_structural(json.dumps({"symbol": symbol}), parser=Gene, enforce_validation=True)
+        assert gene == Gene(symbol=symbol)
+    assert formats[0] is formats[1] is compile_parser(Gene).required_model
+
+def test_stream_structural_yields_completed_fields():
+    chunks = ['```json\n{"name": "Longevity", "genes": [{"symbol": "FOXO3"}, ', '{"symbol": "SIRT', '1", "aliases": ["SIR2L1"]}', '], "summ', 'ary": "Nutrient ', 'sensing"}\n```']
+    options = {"model": "echo", "echo": {"responses": [{"content": "".join(chunks), "chunks": chunks}]}}
+    agent = BaseAgent(streaming_method=StreamingMode.echo, llm_options=options, remember_query=False)
+    results = list(agent.stream_structural("Which genes?", parser=Pathway))
+    assert [result.model_fields_set for result in results] == [{"name"}, {"name", "genes"}, {"name", "genes", "summary"}]
+    assert results[1].genes[1] == Gene(symbol="SIRT1", aliases=["SIR2L1"])
+    assert results[-1] == Pathway(name="Longevity", genes=[Gene(symbol="FOXO3"), Gene(symbol="SIRT1", aliases=["SIR2L1"])], summary="Nutrient sensing")
+
+    partial_parser = PartialOutputParser(dict)
+    updates = [partial_parser.feed(delta) for delta in ('{"a": ', '1, "b": ', '[1, 2', '], "c": ', '"x"}')]
+    assert [update for update in updates if update is not None] == [{"a": 1}, {"a": 1, "b": [1, 2]}]
+    assert partial_parser.result() == {"a": 1, "b": [1, 2], "c": "x"}
@@ -1,8 +1,12 @@
+import asyncio
 import pytest
 from dotenv import load_dotenv
 import sys
 import os
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add the workspace root to sys.path for imports
@@ -12,11 +16,13 @@ sys.path.insert(0, os.path.join(current_dir, '..'))
 from just_agents.just_tool import JustTool, JustGoogleBuiltIn, JustToolFactory, JustImportedTool, JustPromptTool, JustTransientTool
 from just_agents.data_classes import GoogleBuiltInTools, JustMCPServerParameters
 import tests.tools.tool_test_module as tool_test_module
-from just_agents.base_agent import BaseAgentWithLogging
+from just_agents.base_agent import BaseAgent, BaseAgentWithLogging, QueryContext
 from just_agents.llm_options import LLMOptions, OPENAI_GPT4_1MINI, OPENAI_GPT4_1NANO
 from just_agents import llm_options
 from just_agents.just_tool import JustToolsBus, GOOGLE_BUILTIN_SEARCH, GOOGLE_BUILTIN_CODE
 from just_agents.protocols.litellm_protocol import LiteLLMAdapter
+from just_agents.protocols.protocol_factory import StreamingMode
+from just_agents.tool_executors import ToolExecutors
 from pydantic import ValidationError
 
 @pytest.fixture(scope="module", autouse=True)
@@ -1375,3 +1381,191 @@ def test_mcp_server_integration():
     assert "Starship" in response
 
 
+
+
+def test_tools_payload_is_cached(monkeypatch):
+    """Tool schemas are built once and rebuilt only when the tool set or eligibility changes."""
+    built = []
+    original = LiteLLMAdapter.tool_from_function
+    def counting_tool_from_function(self, tool, *args, **kwargs):
+        built.append(tool.__name__)
+        return original(self, tool, *args, **kwargs)
+    monkeypatch.setattr(LiteLLMAdapter, "tool_from_function", counting_tool_from_function)
+
+    limited = JustTransientTool(
+        name="static_method_top", is_transient=True, raw_callable=tool_test_module.TopLevelClass.static_method_top, max_calls_per_query=1
+    )
+    agent = BaseAgentWithLogging(llm_options=OPENAI_GPT4_1NANO, tools=[tool_test_module.regular_function, limited])
+    first = agent._prepare_options(agent.llm_options)
+    second = agent._prepare_options(agent.llm_options)
+    assert sorted(built) == ["regular_function", "static_method_top"]
+    assert first["tools"] == second["tools"]
+    assert first["tools"] is not second["tools"]
+    assert "tools" not in agent.llm_options # options are overlaid, not mutated
+
+    # eligibility change: the limited tool is exhausted in this query context
+    context = QueryContext(memory=agent.memory, tool_calls_made={id(limited): 1})
+    exhausted = agent._prepare_options(agent.llm_options, context)
+    assert [tool["function"]["name"] for tool in exhausted["tools"]] == ["regular_function"]
+    assert len(built) == 2 # per-tool schemas are reused
+
+    # tool set change
+    agent.add_tool(tool_test_module.type_tester_function)
+    extended = agent._prepare_options(agent.llm_options)
+    assert len(extended["tools"]) == 3
+    assert built[2:] == ["type_tester_function"]
+
+
+def test_prompt_tools_cache(monkeypatch):
+    """Prompt tool results are cached between prompts according to the cache options."""
+    clock = [1000.0]
+    monkeypatch.setattr("just_agents.just_tool.time.monotonic", lambda: clock[0])
+    agent = BaseAgentWithLogging(
+        llm_options=OPENAI_GPT4_1NANO,
+        system_prompt="Test agent with prompt tools",
+        prompt_tools=[{
+            "name": "regular_function",
+            "package": "tests.tools.tool_test_module",
+            "call_arguments": {"x": 5, "y": 10},
+            "cache": {"ttl": 60, "stale_while_revalidate": 30},
+        }],
+    )
+    prompt_tool = agent.prompt_tools["regular_function"]
+    calls = []
+    bus = JustToolsBus()
+    topic = f"regular_function.{id(prompt_tool)}.execute"
+    on_execute = lambda event_name, *args, **kwargs: calls.append(clock[0])
+    bus.subscribe(topic, on_execute)
+    try:
+        prompt = agent.dynamic_prompt("")
+        assert "15" in prompt
+        assert agent.dynamic_prompt("") == prompt  # fresh, served from the cache
+        assert len(calls) == 1
+
+        clock[0] += 70 # stale, served while refreshed in the background
+        assert agent.dynamic_prompt("") == prompt
+        for _ in range(100):
+            if len(calls) == 2 and not prompt_tool._revalidating:
+                break
+            time.sleep(0.01)
+        assert len(calls) == 2 and prompt_tool._cached_at == clock[0]
+
+        clock[0] += 100 # past the stale window, called synchronously
+        assert agent.dynamic_prompt("") == prompt
+        assert len(calls) == 3
+    finally:
+        bus.unsubscribe(topic, on_execute)
+
+    # cache options survive serialization
+    dumped = agent.prompt_tools.model_dump()
+    assert dumped[0]["cache"] == {"ttl": 60.0, "stale_while_revalidate": 30.0, "refresh_on_miss": True}
+    restored = JustToolFactory.create_prompt_tools_dict(dumped)["regular_function"]
+    assert restored.cache == prompt_tool.cache
+
+
+def test_tool_results_cache(tmp_path):
+    """Tool results are memoized by the validated arguments, hits are published as cache_hit events."""
+    config_path = tmp_path / "cached_tools.yaml"
+    cache_path = str(tmp_path / "tool_cache.sqlite")
+    agent = BaseAgentWithLogging(
+        llm_options=OPENAI_GPT4_1NANO,
+        tools=[{
+            "name": "static_method_top",
+            "package": "tests.tools.tool_test_module",
+            "static_class": "TopLevelClass",
+            "max_calls_per_query": 2,
+            "cache": {"ttl": 60, "key_fields": ["a"], "backend": "disk", "path": cache_path},
+        }],
+        config_path=config_path,
+    )
+    tool = agent.tools["static_method_top"]
+    events = []
+    on_event = lambda event_name, *args, **kwargs: events.append(event_name.rsplit(".", 1)[-1])
+    bus = JustToolsBus()
+    topic = f"static_method_top.{id(tool)}.*"
+    bus.subscribe(topic, on_event)
+    try:
+        assert tool(a="x") == "x-default"
+        assert tool(a="x", b="default") == "x-default"  # the defaults are part of the validated arguments
+        assert tool(a="x", b="other") == "x-default"  # b is not a key field
+        assert asyncio.run(tool.get_callable_async()(a="x")) == "x-default"
+        assert tool(a="y") == "y-default"
+        assert events == ["execute", "result", "cache_hit", "cache_hit", "cache_hit", "execute", "result"]
+        assert tool.calls_made == 2  # hits are not counted against max_calls_per_query
+    finally:
+        bus.unsubscribe(topic, on_event)
+
+    agent.save_to_yaml("CachedToolsAgent")
+    loaded = BaseAgentWithLogging.from_yaml("CachedToolsAgent", file_path=config_path)
+    restored = loaded.tools["static_method_top"]
+    assert restored.cache == tool.cache
+    assert restored._result_cache is tool._result_cache  # the disk backend is shared by path
+    assert restored._result_cache.stats()["disk_entries"] == 2
+
+    memory_tool = JustImportedTool(
+        name="regular_function", package="tests.tools.tool_test_module", cache={"max_entries": 1}
+    )
+    assert memory_tool(x=1, y=2) == memory_tool(x=1, y=2) == 3
+    assert memory_tool(x=2, y=2) == 4
+    assert memory_tool._result_cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+
+def test_tool_executors_and_timeouts():
+    """Synchronous tools run in the configured executor, a call timing out returns an error to the LLM."""
+    def sleeping_tool(executor: str, timeout_s=None) -> dict:
+        return {"name": "sleeping_function", "package": "tests.tools.tool_test_module", "executor": executor, "timeout_s": timeout_s}
+
+    process_tool = JustToolFactory.create_tool(sleeping_tool("process", 30))
+    assert process_tool(seconds=0) != os.getpid()
+    assert asyncio.run(process_tool.get_callable_async()(seconds=0)) != os.getpid()
+    assert JustToolFactory.create_tool(sleeping_tool("thread"))(seconds=0) == os.getpid()
+
+    echo_options = {
+        "model": "echo",
+        "echo": {"rules": [
+            {"role": "user", "pattern": "sleep", "response": {"tool_calls": [{"name": "sleeping_function", "arguments": {"seconds": 5}}]}},
+            {"role": "tool", "response": {"content": "done"}},
+        ]},
+    }
+    for executor in ("inline", "process"):
+        agent = BaseAgent(streaming_method=StreamingMode.echo, llm_options=echo_options, tools=[sleeping_tool(executor, 0.5)])
+        started = time.perf_counter()
+        assert agent.query("sleep please") == "done"
+        assert asyncio.run(agent.aquery("sleep again")) == "done"
+        assert time.perf_counter() - started < 4
+        tool_messages = [message["content"] for message in agent.memory.messages if message["role"] == "tool"]
+        assert tool_messages == ["Error occurred during call: 'Tool sleeping_function timed out after 0.5 seconds'"] * 2
+        dumped = agent.tools.model_dump()[0]
+        assert (dumped["executor"], dumped["timeout_s"]) == (executor, 0.5)
+
+    # a timed call is killed in a process of its own, the calls in flight in the shared pool carry on
+    untimed_tool = JustToolFactory.create_tool(sleeping_tool("process"))
+    timed_tool = JustToolFactory.create_tool(sleeping_tool("process", 0.5))
+    with ThreadPoolExecutor(1) as caller:
+        in_flight = caller.submit(untimed_tool, seconds=3)
+        time.sleep(0.5)
+        with pytest.raises(TimeoutError):
+            timed_tool(seconds=5)
+        assert in_flight.result() != os.getpid()
+
+
+def test_parallel_tool_calls_share_the_tool_pool():
+    """Parallel calls run in the shared thread pool, bounded by max_parallel, with their results in order."""
+    executors = ToolExecutors()
+    lock, running, peak, threads = threading.Lock(), [0], [0], set()
+
+    def call(item: int) -> int:
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return item * 2
+
+    assert executors.map(call, list(range(8)), max_parallel=3) == [item * 2 for item in range(8)]
+    assert peak[0] == 3
+    assert all(name.startswith("just_tools") for name in threads)
+    # nested on a worker of the pool the calls run one after another instead of waiting on the pool
+    assert executors.pool("thread").submit(executors.map, call, [1, 2], 2).result() == [2, 4]
@@ -1,5 +1,7 @@
 """Test module for JustTool tests."""
 
+import os
+import time
 from typing import List, Union, Dict
 from pydantic import BaseModel
 
@@ -7,6 +9,11 @@ def regular_function(x: int, y: int) -> int:
     """A regular function."""
     return x + y
 
+def sleeping_function(seconds: float) -> int:
+    """Sleeps for the given number of seconds and returns the id of the process it ran in."""
+    time.sleep(seconds)
+    return os.getpid()
+
 class TopLevelClass:
     """A top-level class."""
     @staticmethod
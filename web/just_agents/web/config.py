@@ -102,6 +102,23 @@ class WebAgentConfig(BaseModel):
         description="The security API key to protect the API from unauthorized access",
         examples=["None","security_api_key"]
     )
+    stream_coalesce_ms: float = Field(
+        default_factory=lambda: float(os.getenv("AGENT_STREAM_COALESCE_MS", "0")),
+        description="Milliseconds of content deltas coalesced into one streamed event, 0 to send every delta",
+        ge=0,
+        examples=[0, 20, 50]
+    )
+    stream_coalesce_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("AGENT_STREAM_COALESCE_BYTES", "0")),
+        description="Size of the coalesced content after which the event is sent regardless of the time window, 0 for no limit",
+        ge=0,
+        examples=[0, 256, 1024]
+    )
+    metrics_enabled: bool = Field(
+        default_factory=lambda: os.getenv("AGENT_METRICS_ENABLED", "true").lower() == "true",
+        description="Record the agent metrics and serve them from the /metrics endpoint in the Prometheus text format",
+        examples=[True, False]
+    )
     
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import mimetypes
@@ -7,6 +8,8 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any, Union, Type, ClassVar
 from just_agents.just_bus import JustLogBus
 from just_agents.base_agent import BaseAgent
+from just_agents.just_metrics import JustMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from just_agents.protocols.sse_streaming import SSEStreamEncoder
 from just_agents.web.models import Model, ModelList
 from just_agents.web.web_agent import WebAgent
 from just_agents.web.config import WebAgentConfig
@@ -24,12 +27,19 @@ from dotenv import load_dotenv
 
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from eliot import start_task
 
 
 
 
+def overrides_sync_only(agent: BaseAgent, sync_name: str, async_name: str) -> bool:
+    """True if the class of the agent customizes the sync method, e.g. query, without its async counterpart."""
+    mro = type(agent).__mro__
+    owner = lambda name: next(index for index, cls in enumerate(mro) if name in cls.__dict__)
+    return owner(sync_name) < owner(async_name)
+
+
 class AgentRestAPI(FastAPI):
     """FastAPI implementation providing OpenAI-compatible endpoints for Just-Agents.
     This class extends FastAPI to provide endpoints that mimic OpenAI's API structure,
@@ -206,6 +216,9 @@ class AgentRestAPI(FastAPI):
         self.get("/")(self.default)
         self.get("/v1/models", description="List available models")(self.list_models)
         self.post("/v1/chat/completions", description="OpenAI compatible chat completions")(self.chat_completions)
+        if self.config.metrics_enabled:
+            JustMetrics().enabled = True
+            self.get("/metrics", description="Agent metrics in the Prometheus text format")(self.metrics)
 
 
     def default(self) -> str:
@@ -317,12 +330,20 @@ class AgentRestAPI(FastAPI):
                         input_kwargs["api_key"] = api_key #accept any requests, but if api_key is provided, add it to the input
 
                 if is_streaming:
-                    stream_generator = agent.stream(
+                    # agents are re-entrant, concurrent requests are served natively on the event loop
+                    # an agent customizing only stream is iterated in the thread pool of the server instead
+                    stream_method = agent.stream if overrides_sync_only(agent, "stream", "astream") else agent.astream
+                    stream_generator = stream_method(
                         request.messages,
+                        sse_encoder=SSEStreamEncoder(
+                            as_bytes=True,
+                            coalesce_seconds=self.config.stream_coalesce_ms / 1000,
+                            coalesce_bytes=self.config.stream_coalesce_bytes,
+                        ),
                         **input_kwargs
                     )
                     return StreamingResponse(
-                        async_wrap(stream_generator),
+                        stream_generator,
                         media_type="application/x-ndjson",
                         headers={
                             "Cache-Control": "no-cache",
@@ -342,7 +363,9 @@ class AgentRestAPI(FastAPI):
                     #         total_tokens=0
                     #     )
                     # )
-                    return agent.query(
+                    if overrides_sync_only(agent, "query", "aquery"):
+                        return await asyncio.to_thread(agent.query, request.messages, **input_kwargs)
+                    return await agent.aquery(
                         request.messages,
                         **input_kwargs
                     )
@@ -365,6 +388,10 @@ class AgentRestAPI(FastAPI):
                 )
                 return error_response
 
+    def metrics(self) -> PlainTextResponse:
+        """Latency, token, error and tool metrics of the agents."""
+        return PlainTextResponse(JustMetrics().render(), media_type=METRICS_CONTENT_TYPE)
+
     def list_models(self) -> ModelList:
         """List the available models."""
         models = []
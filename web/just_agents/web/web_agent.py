@@ -3,7 +3,7 @@ import uuid
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import ClassVar, Optional, Dict, Any, Callable, Literal, Type, Generator, Union
+from typing import ClassVar, Optional, Dict, Any, Callable, Literal, Type, Generator, AsyncGenerator, Union
 from just_agents.base_agent import BaseAgent, BaseAgentWithLogging, VariArgs, LogFunction, BaseModelResponse, SupportedMessages
 from just_agents.just_serialization import JustSerializable
 from pydantic import Field,BaseModel,PrivateAttr
@@ -274,3 +274,17 @@ class WebAgent(BaseAgentWithLogging,WebAgentEliotLoggerMixin):
             kwargs['restream_tools'] = self.restream_tool_calls
         
         return super().stream(query_input, **kwargs)
+
+    def astream(
+        self,
+        query_input: SupportedMessages,
+        **kwargs
+    ) -> AsyncGenerator[Union[BaseModelResponse, SupportedMessages],None]:
+        restream_tools = kwargs.pop('restream_tools', None)
+        
+        if restream_tools is not None:
+            kwargs['restream_tools'] = restream_tools or self.restream_tool_calls
+        else:
+            kwargs['restream_tools'] = self.restream_tool_calls
+        
+        return super().astream(query_input, **kwargs)